@@ -0,0 +1,7 @@
+"""Akan transcription app
+
+Run ``python -m banga`` to open the transcription window, or
+``python -m banga --help`` for the headless batch commands. The GUI lives in
+:mod:`banga.app`; everything it persists goes through :mod:`banga.data`,
+which does not depend on tkinter.
+"""
@@ -0,0 +1,375 @@
+"""Command line entry point: ``python -m banga [command]``
+
+Without a command the transcription window opens. The commands below work
+on the same store as the app but never import tkinter, so they can run on
+servers without a display.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from .agreement import CER_REVIEW, WER_REVIEW, compute_agreement, format_agreement
+from .data import (
+    METADATA_DIR,
+    PHRASES_PATH,
+    SHARED_STORE_NAME,
+    PhraseIndex,
+    format_stats,
+    iter_metadata_rows,
+    load_question_bank,
+    load_transcriptions,
+    merge_workbook,
+    open_store,
+    referenced_audio,
+)
+from .export import CHUNK_ROWS, export_format, export_versions
+from .orthography import OrthographyCheck, describe, format_orthography
+from .shared import SharedStore
+from .undo import UNDO_MEMORY_BYTES, EditLog, undo_log_path
+
+
+def warn(message):
+    print(f"warning: {message}", file=sys.stderr)
+
+
+def open_corpus(args, read_only=False):
+    """Load the question bank and the transcription store named on the command line
+
+    Commands that only look at the corpus pass read_only, so the store is
+    not created or changed (see load_transcriptions).
+    """
+    themes, phrases = load_question_bank(args.questions)
+    phrase_data = PhraseIndex.build(themes, phrases)
+    store = open_store(args.metadata_dir)
+    load_transcriptions(store, phrase_data, args.metadata_dir / "transcriptions.xlsx", warn=warn,
+                        read_only=read_only)
+    return themes, phrases, store
+
+
+def report_merge(counts):
+    print(f"{counts['rows']:,} rows: {counts['filled']:,} filled, {counts['overwritten']:,} overwritten, "
+          f"{counts['kept']:,} kept, {counts['unchanged']:,} unchanged, {counts['conflicts']:,} conflicts")
+
+
+def counts_dict(counts):
+    return {field: counts[field] for field in ("originals", "alternatives", "chars")}
+
+
+def cmd_stats(args):
+    themes, phrases, store = open_corpus(args, read_only=True)
+    if args.json:
+        json.dump({
+            "themes": len(themes),
+            "phrases": sum(len(phrases[theme]) for theme in themes),
+            "totals": counts_dict(store.stats.totals),
+            "by_theme": {theme: counts_dict(store.stats.theme_counts(theme)) for theme in themes},
+        }, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print("\n".join(format_stats(themes, phrases, store.stats)))
+
+
+def cmd_import(args):
+    _, _, store = open_corpus(args)
+    report_merge(store.merge_rows(iter_metadata_rows(args.workbook), overwrite=True))
+
+
+def cmd_merge(args):
+    _, _, store = open_corpus(args)
+    if args.theirs:
+        report_merge(store.merge_rows(iter_metadata_rows(args.workbook), overwrite=True))
+        return
+    merged = merge_workbook(store, args.workbook, seen_before=False)
+    if merged is None:
+        print(f"{args.workbook} has not changed since it was last merged")
+        return
+    counts, _ = merged
+    report_merge(counts)
+    if counts["conflicts"]:
+        print(f"conflicting versions were kept as they are here and listed in "
+              f"{store.directory / 'merge-conflicts.jsonl'}; rerun with --theirs to take the workbook's",
+              file=sys.stderr)
+
+
+def cmd_share(args):
+    if (args.metadata_dir / SHARED_STORE_NAME).exists():
+        print(f"error: {args.metadata_dir} already holds a shared store", file=sys.stderr)
+        return 1
+    _, _, store = open_corpus(args)
+    shared = SharedStore(args.metadata_dir)
+    shared.phrase_data = store.phrase_data
+    skipped = shared.compact()
+    shared.close()
+    store.close()
+    for conflict in skipped:
+        warn(f"{' | '.join(map(str, store.phrase_data.key(conflict.phrase_id)))}: {conflict}; kept theirs")
+    print(f"moved {len(shared.revisions):,} versions into {shared.db_path}; "
+          f"every instance using {args.metadata_dir} now shares it")
+
+
+def cmd_export(args):
+    output = args.output or args.metadata_dir / "transcriptions.xlsx"
+    # A manifest only reads the store; transcriptions.xlsx is the store's own export
+    _, _, store = open_corpus(args, read_only=export_format(output) is not None)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    if export_format(output):
+        try:
+            rows, seconds = export_versions(store.phrase_data, output, chunk_rows=args.chunk_rows)
+        except ImportError:
+            print("error: Parquet and Arrow exports need pyarrow (pip install pyarrow)", file=sys.stderr)
+            return 1
+        print(f"wrote {rows:,} versions to {output} in {seconds:.2f}s")
+        return
+    rows = store.export_xlsx_streaming(output)
+    print(f"wrote {rows:,} rows to {output}")
+    if args.output is None:
+        themes, rows, _ = store.write_shards(store.take_dirty_shards())
+        if themes:
+            print(f"rewrote {themes:,} changed theme workbooks ({rows:,} rows) under {store.directory / 'themes'}")
+        store.compact()
+
+
+def cmd_normalize(args):
+    try:
+        from .audio import normalize_corpus
+    except ImportError:
+        print("error: normalizing audio needs numpy (pip install numpy)", file=sys.stderr)
+        return 1
+    _, _, store = open_corpus(args, read_only=True)
+    sources = referenced_audio(store.phrase_data)
+
+    def progress(done, total, source, error):
+        if error is not None:
+            warn(f"{source}: {error}")
+        elif sys.stderr.isatty():
+            print(f"\r[{done}/{total}] {source.name[:60]:<60}", end="", file=sys.stderr, flush=True)
+
+    summary = normalize_corpus(sources, jobs=args.jobs, progress=progress)
+    if sys.stderr.isatty() and sources:
+        print(file=sys.stderr)
+    print(f"{summary['clips']:,} clips: {summary['converted']:,} converted, {summary['cached']:,} cached, "
+          f"{summary['failed']:,} failed in {summary['elapsed']:.1f}s "
+          f"({summary['converted_seconds'] / max(summary['elapsed'], 1e-9):.0f} audio-s/s)")
+    return 1 if summary["failed"] else 0
+
+
+def cmd_segment(args):
+    try:
+        from .audio import load_segments
+    except ImportError:
+        print("error: segmenting audio needs numpy (pip install numpy)", file=sys.stderr)
+        return 1
+    if args.files:
+        sources = args.files
+    else:
+        _, _, store = open_corpus(args, read_only=True)
+        sources = referenced_audio(store.phrase_data)
+
+    found = {}
+    failed = 0
+    for source in sources:
+        try:
+            found[str(source)] = load_segments(source)
+        except (OSError, ValueError) as e:
+            warn(f"{source}: {e}")
+            failed += 1
+    if args.json:
+        json.dump(found, sys.stdout, indent=2)
+        print()
+    else:
+        for source, segments in found.items():
+            speech = sum(end - start for start, end in segments)
+            print(f"{source}: {len(segments):,} segments, {speech:,.1f}s of speech")
+    return 1 if failed else 0
+
+
+def cmd_agreement(args):
+    _, _, store = open_corpus(args, read_only=True)
+    rows = store.phrase_data.snapshot()
+    report = compute_agreement(rows, jobs=args.jobs, cer_review=args.cer, wer_review=args.wer)
+    flagged = [{"theme": rows[row][0][0], "phrase": rows[row][0][1], "occurrence": rows[row][0][2],
+                "alternative": alt_num, "cer": round(cer, 4), "wer": round(wer, 4)}
+               for row, alt_num, cer, wer in report["flagged"]]
+    if args.json:
+        json.dump({**report, "flagged": flagged}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    print("\n".join(format_agreement(report)))
+    if flagged:
+        print("\nFLAGGED FOR REVIEW")
+        for flag in flagged:
+            print(f"{flag['theme']} | {flag['phrase']} | Alternative {flag['alternative']}: "
+                  f"CER {flag['cer']:.1%}, WER {flag['wer']:.1%}")
+
+
+def cmd_duplicates(args):
+    try:
+        from .duplicates import DuplicateIndex, format_duplicates, group_members
+    except ImportError:
+        print("error: finding near duplicates needs numpy (pip install numpy)", file=sys.stderr)
+        return 1
+    _, _, store = open_corpus(args, read_only=True)
+    phrase_data = store.phrase_data
+    report = DuplicateIndex.build(phrase_data).find(args.threshold)
+    groups = []
+    for group in report["groups"]:
+        if args.kind and group["kind"] != args.kind:
+            continue
+        members = []
+        for phrase_id, version, text in group_members(group, phrase_data):
+            theme, phrase, occurrence = phrase_data.key(phrase_id)
+            members.append({"theme": theme, "phrase": phrase, "occurrence": occurrence,
+                            "version": version, "text": text})
+        groups.append({"kind": group["kind"], "similarity": round(group["similarity"], 4), "members": members})
+    if args.json:
+        json.dump({**report, "groups": groups}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    print("\n".join(format_duplicates(report)))
+    for group in groups:
+        print(f"\n{group['kind'].upper()}S, {len(group['members'])} texts, ≥{group['similarity']:.0%} similar")
+        for member in group["members"]:
+            where = f"{member['theme']} | {member['phrase']}"
+            if member["version"] is not None:
+                label = "Original" if member["version"] == "Original" else f"Alternative {member['version']}"
+                where += f" | {label}: {member['text']}"
+            print(f"  {where}")
+
+
+def fix_orthography(store, orthography):
+    """Save the normal form of every version stored otherwise, logged so the app can undo each one
+
+    Returns how many were saved; versions another instance changed meanwhile
+    are left alone and warned about.
+    """
+    phrase_data = store.phrase_data
+    changes = orthography.changes()
+    old_texts = [phrase_data[phrase_id].get(version) for phrase_id, version, _ in changes]
+    skipped = store.record_many(changes)
+    for conflict in skipped:
+        warn(f"{' | '.join(map(str, phrase_data.key(conflict.phrase_id)))}: {conflict}; left as it is")
+    conflicted = {(conflict.phrase_id, conflict.version) for conflict in skipped}
+    edit_log = EditLog(undo_log_path(store.directory, getattr(store, "annotator", None))).load(phrase_data)
+    try:
+        for (phrase_id, version, text), old_text in zip(changes, old_texts):
+            if (phrase_id, version) not in conflicted:
+                edit_log.record(phrase_id, version, old_text, text)
+    except OSError as e:
+        warn(f"undo history not saved: {e}")
+    finally:
+        edit_log.close()
+    for phrase_id in dict.fromkeys(phrase_id for phrase_id, _, _ in changes):
+        orthography.update(phrase_id)
+    return len(changes) - len(skipped)
+
+
+def cmd_orthography(args):
+    # Only --fix writes, and only the normal forms
+    _, _, store = open_corpus(args, read_only=not args.fix)
+    phrase_data = store.phrase_data
+    orthography = OrthographyCheck.build(phrase_data)
+    fixed = fix_orthography(store, orthography) if args.fix else 0
+    problems = []
+    for phrase_id, version, found, unnormalized in orthography.rows():
+        theme, phrase, occurrence = phrase_data.key(phrase_id)
+        problems.append({"theme": theme, "phrase": phrase, "occurrence": occurrence, "version": version,
+                         "text": phrase_data[phrase_id].get(version), "unnormalized": unnormalized,
+                         "problems": [{"kind": kind, "character": char} for kind, char in found]})
+    if args.json:
+        json.dump({"checked": orthography.checked, "unnormalized": orthography.unnormalized_count(),
+                   "fixed": fixed, "problems": problems}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return
+    print("\n".join(format_orthography(orthography)))
+    if args.fix:
+        print(f"Saved in normal form: {fixed:,} (undo them in the app)")
+    elif orthography.unnormalized:
+        print("--fix saves the normal forms; so does \"Normalize All\" on the app's Overview tab")
+    for problem in problems:
+        label = "Original" if problem["version"] == "Original" else f"Alternative {problem['version']}"
+        found = describe([(item["kind"], item["character"]) for item in problem["problems"]], problem["unnormalized"])
+        print(f"{problem['theme']} | {problem['phrase']} | {label}: {found}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m banga",
+        description="Akan transcription app. Opens the window when no command is given.")
+    parser.add_argument("--questions", type=Path, default=PHRASES_PATH,
+                        help="question bank workbook (default: %(default)s)")
+    parser.add_argument("--metadata-dir", type=Path, default=METADATA_DIR,
+                        help="directory holding the transcription store (default: %(default)s)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time the window's operations, shown in a Diagnostics tab (or set BANGA_PROFILE=1)")
+    parser.add_argument("--undo-mb", type=float, default=UNDO_MEMORY_BYTES / (1 << 20),
+                        help="memory the window's undo history may hold, in MB; older saves are "
+                             "forgotten first (default: %(default)s)")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+
+    stats = commands.add_parser("stats", help="print transcription statistics")
+    stats.add_argument("--json", action="store_true", help="machine-readable output")
+    stats.set_defaults(func=cmd_stats)
+
+    import_ = commands.add_parser("import", help="load a transcriptions workbook, overwriting matching versions")
+    import_.add_argument("workbook", type=Path)
+    import_.set_defaults(func=cmd_import)
+
+    merge = commands.add_parser("merge", help="three-way merge another annotator's workbook, "
+                                              "against what it held when last merged")
+    merge.add_argument("workbook", type=Path)
+    merge.add_argument("--theirs", action="store_true", help="take the workbook's text wherever it differs")
+    merge.set_defaults(func=cmd_merge)
+
+    share = commands.add_parser("share", help="move the store into SQLite so several instances can use it at once")
+    share.set_defaults(func=cmd_share)
+
+    export = commands.add_parser("export", help="write the store out as transcriptions.xlsx, "
+                                                 "or one row per version as .jsonl/.parquet/.arrow")
+    export.add_argument("-o", "--output", type=Path, help="output path (default: the metadata workbook)")
+    export.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help="rows buffered per Parquet/Arrow batch (default: %(default)s)")
+    export.set_defaults(func=cmd_export)
+
+    normalize = commands.add_parser("normalize", help="convert linked audio to 16 kHz mono PCM in .cache/")
+    normalize.add_argument("-j", "--jobs", type=int, help="worker processes (default: one per CPU)")
+    normalize.set_defaults(func=cmd_normalize)
+
+    segment = commands.add_parser("segment", help="propose speech segments in linked or given recordings")
+    segment.add_argument("files", type=Path, nargs="*", help="WAV files (default: every linked recording)")
+    segment.add_argument("--json", action="store_true", help="print the segments as JSON")
+    segment.set_defaults(func=cmd_segment)
+
+    agreement = commands.add_parser("agreement", help="character/word error rates of alternatives vs. Originals")
+    agreement.add_argument("-j", "--jobs", type=int, help="worker processes for large batches (default: one per CPU)")
+    agreement.add_argument("--cer", type=float, default=CER_REVIEW, help="flag pairs above this CER (default: %(default)s)")
+    agreement.add_argument("--wer", type=float, default=WER_REVIEW, help="flag pairs above this WER (default: %(default)s)")
+    agreement.add_argument("--json", action="store_true", help="machine-readable output")
+    agreement.set_defaults(func=cmd_agreement)
+
+    duplicates = commands.add_parser("duplicates", help="near-duplicate question phrases and transcriptions")
+    duplicates.add_argument("--threshold", type=float, default=0.6,
+                            help="least Jaccard similarity of character 4-grams to report (default: %(default)s)")
+    duplicates.add_argument("--kind", choices=("phrase", "transcription"), help="only report this kind")
+    duplicates.add_argument("--json", action="store_true", help="machine-readable output")
+    duplicates.set_defaults(func=cmd_duplicates)
+
+    orthography = commands.add_parser("orthography", help="transcriptions not in normal form or with "
+                                                          "characters outside Akan orthography")
+    orthography.add_argument("--fix", action="store_true", help="save the normal form of every transcription")
+    orthography.add_argument("--json", action="store_true", help="machine-readable output")
+    orthography.set_defaults(func=cmd_orthography)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        from .app import main as run_app
+        return run_app(phrases_path=args.questions, metadata_dir=args.metadata_dir, profile=args.profile,
+                       undo_memory_bytes=int(args.undo_mb * (1 << 20)))
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Agreement between each phrase's Original and its alternatives (CER and WER)
+
+Edit distances use the bit-parallel algorithm of Myers (1999), in Hyyrö's
+formulation for Levenshtein distance. A whole column of the DP matrix is
+packed into one Python integer, so comparing two texts costs one pass over
+the second with a handful of integer operations per element, whatever
+their length. Words are compared with the same code by treating each word
+as one symbol.
+
+Results are cached by the content of each pair, so recomputing the report
+after a few edits only compares the versions that changed. Large batches
+of new pairs are spread over a process pool.
+"""
+import concurrent.futures
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import unicodedata
+
+from .data import CACHE_DIR, write_json
+
+AGREEMENT_CACHE_PATH = CACHE_DIR / "agreement-v1.json"
+CER_REVIEW = 0.30     # alternatives disagreeing with the Original more than this get flagged
+WER_REVIEW = 0.50
+POOL_MIN_PAIRS = 4000  # below this, starting worker processes costs more than it saves
+POOL_CHUNK = 1000
+WORD = re.compile(r"[\w\u0300-\u036f]+")  # tone marks stay part of their word
+
+
+def normalize(text):
+    """Comparison form: NFC, casefolded, whitespace collapsed; diacritics are kept"""
+    return " ".join(unicodedata.normalize("NFC", text).casefold().split())
+
+
+def edit_distance(a, b):
+    """Levenshtein distance between two sequences of hashable symbols"""
+    if len(a) < len(b):
+        # The shorter one becomes the bit pattern, keeping the integers small
+        a, b = b, a
+    if not b:
+        return len(a)
+    m = len(b)
+    peq = {}
+    for i, symbol in enumerate(b):
+        peq[symbol] = peq.get(symbol, 0) | (1 << i)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for symbol in a:
+        eq = peq.get(symbol, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def compare(original, alternative):
+    """(char edits, Original chars, word edits, Original words) for one pair"""
+    reference, hypothesis = normalize(original), normalize(alternative)
+    reference_words, hypothesis_words = WORD.findall(reference), WORD.findall(hypothesis)
+    return (edit_distance(reference, hypothesis), len(reference),
+            edit_distance(reference_words, hypothesis_words), len(reference_words))
+
+
+def compare_batch(pairs):
+    return [compare(original, alternative) for original, alternative in pairs]
+
+
+def pair_key(original, alternative):
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(original.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(alternative.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def rate(edits, length):
+    return edits / length if length else float(edits > 0)
+
+
+class AgreementCache:
+    """Pair digest -> compare() result, saved under .cache between runs"""
+
+    def __init__(self, path=AGREEMENT_CACHE_PATH):
+        self.path = path
+        self.dirty = False
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.results = {key: tuple(value) for key, value in json.load(f).items()}
+        except (OSError, ValueError):
+            self.results = {}
+
+    def prune(self, keep):
+        """Forget pairs that no longer exist, so the cache tracks the corpus"""
+        stale = self.results.keys() - keep
+        for key in stale:
+            del self.results[key]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        if self.dirty:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_json(self.path, self.results)
+            self.dirty = False
+
+
+def compute_agreement(rows, cache=None, jobs=None, cer_review=CER_REVIEW, wer_review=WER_REVIEW):
+    """Agreement report for snapshot rows, as from PhraseIndex.snapshot()
+
+    Returns a dict with corpus and per-theme totals, the phrases flagged for
+    review (worst first) as (row index, alternative, cer, wer), and how many
+    pairs were computed rather than taken from the cache.
+    """
+    cache = cache if cache is not None else AgreementCache()
+    pairs = []      # (row index, alternative number, key)
+    todo = {}       # key -> (original, alternative) still to compute
+    for row_index, ((theme, _, _), original, alternatives) in enumerate(rows):
+        if not original.strip():
+            continue
+        for alt_num, text in sorted(alternatives.items()):
+            if not text.strip():
+                continue
+            key = pair_key(original, text)
+            pairs.append((row_index, alt_num, key))
+            if key not in cache.results:
+                todo[key] = (original, text)
+
+    keys = list(todo)
+    work = [todo[key] for key in keys]
+    if len(work) >= POOL_MIN_PAIRS and (jobs or os.cpu_count() or 1) > 1:
+        chunks = [work[i:i + POOL_CHUNK] for i in range(0, len(work), POOL_CHUNK)]
+        # Spawned, not forked: the app calls this from a worker thread of a Tk process
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs,
+                                                    mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = [result for batch in pool.map(compare_batch, chunks) for result in batch]
+    else:
+        results = compare_batch(work)
+    cache.results.update(zip(keys, results))
+    cache.dirty = cache.dirty or bool(keys)
+    cache.prune({key for _, _, key in pairs})
+    try:
+        cache.save()
+    except OSError:
+        # Only costs a recomputation next time
+        pass
+
+    totals = [0, 0, 0, 0]
+    by_theme = {}
+    flagged = []
+    for row_index, alt_num, key in pairs:
+        result = cache.results[key]
+        theme = rows[row_index][0][0]
+        theme_totals = by_theme.setdefault(theme, [0, 0, 0, 0, 0])
+        for i, value in enumerate(result):
+            totals[i] += value
+            theme_totals[i] += value
+        theme_totals[4] += 1
+        cer, wer = rate(result[0], result[1]), rate(result[2], result[3])
+        if cer > cer_review or wer > wer_review:
+            flagged.append((row_index, alt_num, cer, wer))
+    flagged.sort(key=lambda flag: (-flag[2], -flag[3]))
+
+    return {
+        "pairs": len(pairs),
+        "computed": len(keys),
+        "cer": rate(totals[0], totals[1]),
+        "wer": rate(totals[2], totals[3]),
+        "by_theme": {theme: {"pairs": values[4], "cer": rate(values[0], values[1]),
+                             "wer": rate(values[2], values[3])}
+                     for theme, values in by_theme.items()},
+        "flagged": flagged,
+    }
+
+
+def format_agreement(report):
+    """Render an agreement report's totals as a list of lines"""
+    lines = [f"Pairs compared: {report['pairs']:,} ({report['computed']:,} recomputed)",
+             f"Corpus CER: {report['cer']:.1%}   WER: {report['wer']:.1%}",
+             f"Flagged for review: {len(report['flagged']):,}"]
+    for theme, values in report["by_theme"].items():
+        lines.append(f"{theme}: {values['pairs']} pairs, CER {values['cer']:.1%}, WER {values['wer']:.1%}")
+    return lines
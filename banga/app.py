@@ -0,0 +1,2004 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import collections
+import functools
+import os
+import queue
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from .data import (
+    DEFAULT_PHRASES,
+    DEFAULT_THEMES,
+    MAX_ALTERNATIVES,
+    METADATA_DIR,
+    PHRASES_PATH,
+    PhraseIndex,
+    audio_ref,
+    finish_question_bank,
+    format_stats,
+    load_transcriptions,
+    open_question_bank,
+    open_store,
+    parse_audio_ref,
+)
+from .agreement import compute_agreement, format_agreement
+from .export import export_format, export_versions
+from .instrument import PROFILE_DIR, Profiler, profile_path, profiling_requested
+from .navigation import IncompleteQueue
+from .orthography import OrthographyCheck, check, describe, format_orthography
+from .search import SearchIndex
+from .shared import EditConflict, SharedStore
+from .undo import UNDO_MEMORY_BYTES, EditLog, undo_log_path
+
+AUTOSAVE_DELAY_MS = 3000
+SEARCH_DELAY_MS = 150  # wait for a pause in typing before searching
+SHARED_POLL_MS = 2000  # how often other annotators' edits are picked up from a shared store
+PEAKS_MEMORY_SLOTS = 16  # waveforms and segment lists kept in memory for quick back-and-forth
+PREFETCH_AHEAD = 5  # phrases the navigation keys may reach next whose waveforms are loaded early
+THEME_ROWS_SLOTS = 4  # themes whose History rows are kept built
+DIAGNOSTICS_REFRESH_MS = 1000
+# Trivial accessors called in loops (and the diagnostics redraw itself) are left out of profiles
+UNTIMED_METHODS = {"current_record", "current_version_key", "phrase_history_rows", "refresh_diagnostics"}
+
+
+class BackgroundWorker:
+    """Run blocking I/O off the Tk thread and hand results back through root.after
+
+    Jobs run one at a time on a single thread, so two writes to the same file
+    can never overlap. Submitting a job under a key that is still queued
+    replaces the queued one, which folds bursts of save requests into one.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, root, profiler=None):
+        self.root = root
+        self.profiler = profiler  # times each job as worker.<key>, and its wait as worker.<key>.queued
+        self._pending = collections.OrderedDict()
+        self._cond = threading.Condition()
+        self._results = queue.SimpleQueue()
+        self._busy = False
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="banga-worker", daemon=True)
+        self._thread.start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def submit(self, key, func, *args, on_done=None, on_error=None, on_progress=None):
+        """Queue func(*args); callbacks run on the Tk thread
+
+        When on_progress is given, func is called with a progress keyword
+        argument it can use to post status messages from the worker.
+        Returns True if the job replaced one already queued under key.
+        """
+        with self._cond:
+            coalesced = key in self._pending
+            self._pending.pop(key, None)
+            self._pending[key] = (func, args, on_done, on_error, on_progress, time.perf_counter())
+            self._cond.notify()
+        return coalesced
+
+    def is_idle(self):
+        with self._cond:
+            return not self._pending and not self._busy
+
+    def shutdown(self, timeout=None):
+        """Finish queued jobs, then stop the worker thread"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                key, (func, args, on_done, on_error, on_progress, submitted) = self._pending.popitem(last=False)
+                self._busy = True
+            if self.profiler:
+                self.profiler.record(f"worker.{key}.queued", time.perf_counter() - submitted)
+                func = self.profiler.wrap(f"worker.{key}", func)
+            kwargs = {}
+            if on_progress:
+                kwargs["progress"] = lambda message: self._results.put((on_progress, message))
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                self._results.put((on_error, e))
+            else:
+                self._results.put((on_done, result))
+            finally:
+                with self._cond:
+                    self._busy = False
+
+    def _poll(self):
+        while True:
+            try:
+                callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if callback:
+                callback(value)
+        self.root.after(self.POLL_MS, self._poll)
+
+
+@functools.lru_cache(maxsize=8192)
+def history_display(text, width=50):
+    """Truncated History text for a version; cached so redraws do not re-slice"""
+    display = text if text else "No transcription"
+    return display[:width] + "..." if len(display) > width else display
+
+
+class VirtualTreeRows:
+    """Show a window of a row list in a Treeview, touching only rows that changed
+
+    Rows are (key, values) pairs. Only as many rows as fit in the widget are
+    ever inserted, and each one is rewritten only when its values differ from
+    what is already on screen, so a list of thousands of rows costs the same
+    to redraw as a handful. The scrollbar is driven from the row offset
+    instead of by Tk.
+    """
+
+    ROW_HEIGHT = 20
+    HEADING_HEIGHT = 24
+
+    def __init__(self, tree, scrollbar):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.rows = []
+        self.keys = []
+        self.offset = 0
+        self.shown = []
+        scrollbar.configure(command=self.yview)
+        tree.configure(yscrollcommand="")
+        tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        tree.bind("<Button-4>", lambda e: self.scroll(-1))
+        tree.bind("<Button-5>", lambda e: self.scroll(1))
+        tree.bind("<Configure>", lambda e: self.render())
+
+    def visible_count(self):
+        fitted = (self.tree.winfo_height() - self.HEADING_HEIGHT) // self.ROW_HEIGHT
+        return max(int(self.tree.cget("height")), fitted)
+
+    def set_rows(self, rows, show_index=None):
+        """Replace the row list, optionally scrolling so rows[show_index] is visible"""
+        self.rows = rows
+        visible = self.visible_count()
+        if show_index is not None and not self.offset <= show_index < self.offset + visible:
+            self.offset = show_index
+        self.offset = max(0, min(self.offset, len(rows) - visible))
+        self.render()
+
+    def key_for(self, item):
+        return self.keys[self.tree.index(item)]
+
+    def scroll(self, units):
+        self.set_offset(self.offset + units)
+
+    def set_offset(self, offset):
+        offset = max(0, min(int(offset), len(self.rows) - self.visible_count()))
+        if offset != self.offset:
+            self.offset = offset
+            # Selection belongs to a slot, not a row, so it would point at the wrong row
+            self.tree.selection_set(())
+            self.render()
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.set_offset(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = self.visible_count() if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def render(self):
+        window = self.rows[self.offset:self.offset + self.visible_count()]
+        items = self.tree.get_children()
+        for slot, (_, values) in enumerate(window):
+            if slot >= len(items):
+                self.tree.insert("", "end", values=values)
+                self.shown.append(values)
+            elif self.shown[slot] != values:
+                self.tree.item(items[slot], values=values)
+                self.shown[slot] = values
+        if len(items) > len(window):
+            self.tree.delete(*items[len(window):])
+            del self.shown[len(window):]
+        self.keys = [key for key, _ in window]
+
+        if self.rows:
+            self.scrollbar.set(self.offset / len(self.rows),
+                               (self.offset + len(window)) / len(self.rows))
+        else:
+            self.scrollbar.set(0, 1)
+
+
+def remember(cache, key, value, slots=PEAKS_MEMORY_SLOTS):
+    """Insert into an OrderedDict used as an LRU, evicting the oldest entries"""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > slots:
+        cache.popitem(last=False)
+
+
+def format_seconds(seconds):
+    return f"{int(seconds // 60)}:{seconds % 60:04.1f}"
+
+
+class TranscriptionApp:
+    def __init__(self, root, autosave_delay_ms=AUTOSAVE_DELAY_MS, phrases_path=PHRASES_PATH,
+                 metadata_dir=METADATA_DIR, phrases_cache_path=None, profiler=None,
+                 undo_memory_bytes=UNDO_MEMORY_BYTES):
+        self.root = root
+        self.root.title("Akan Transcription App")
+        self.root.geometry("1000x700")
+        self.root.minsize(800, 600)
+        
+        # Configure main window grid
+        self.root.grid_rowconfigure(0, weight=1)
+        self.root.grid_columnconfigure(0, weight=1)
+
+        self.init_state(BackgroundWorker(self.root, profiler), autosave_delay_ms, phrases_path, metadata_dir,
+                        phrases_cache_path, profiler, undo_memory_bytes)
+        if profiler:
+            # Before any widget is bound to a method, so event handlers are timed too
+            profiler.instrument(self, "app", skip=UNTIMED_METHODS)
+            profiler.instrument(self.store, "store")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Apply modern styling
+        self.setup_styles()
+        
+        # Create UI
+        self.create_ui()
+        
+        # Load data on the worker; selections are initialized once it is in
+        self.status_label.config(text="⏳ Loading...")
+        self.worker.submit("load", self.load_data, on_done=self.on_data_loaded,
+                           on_error=self.on_data_load_failed, on_progress=self.show_progress)
+
+    def init_state(self, worker, autosave_delay_ms=AUTOSAVE_DELAY_MS, phrases_path=PHRASES_PATH,
+                   metadata_dir=METADATA_DIR, phrases_cache_path=None, profiler=None,
+                   undo_memory_bytes=UNDO_MEMORY_BYTES):
+        """Set up everything but the widgets; the benchmarks drive the app with just this
+
+        phrases_cache_path is where the parsed question bank is cached, by
+        default the shared one under .cache/. profiler, when given, has
+        already been handed to the worker.
+        """
+        self.theme_index = 0
+        self.phrase_index = 0
+        self.current_version = "Original"  # Changed from alt_phrase_index
+        self.phrase_data = PhraseIndex()  # Changed from alt_phrase_data
+        self.current_phrase_id = None
+        self.themes = []
+        self.phrases = {}
+        self.remaining_themes = []  # themes whose sheets are still being parsed
+        self.pending_theme_index = None
+        self.phrases_path = phrases_path
+        self.phrases_cache_path = phrases_cache_path
+        self.metadata_dir = metadata_dir
+        self.excel_path = metadata_dir / "transcriptions.xlsx"
+        self.store = open_store(metadata_dir)
+        # Saves that can be undone; each shared-store annotator keeps their own
+        self.edit_log = EditLog(undo_log_path(metadata_dir, getattr(self.store, "annotator", None)),
+                                undo_memory_bytes)
+        self.data_loaded = False
+        self.load_messages = []
+        self.profiler = profiler
+        self.worker = worker
+        # Export to Excel once edits have been quiet this long; 0 disables autosave
+        self.autosave_delay_ms = autosave_delay_ms
+        self.autosave_job = None
+        self.flush_times = collections.deque(maxlen=50)
+        self.queued_shards = {}  # theme -> snapshot rows handed to the worker and not written yet
+        self.workbook_stale = False  # transcriptions.xlsx lags behind the shards
+        self.peaks_memory = collections.OrderedDict()  # audio path -> WaveformPeaks, LRU
+        self.segments_memory = collections.OrderedDict()  # audio path -> [(start, end)], LRU
+        self.shown_audio = None
+        self.shown_span = None
+        # Recording whose segments are offered; stays put while moving to unlinked phrases
+        self.segment_source = None
+        self.segment_cursor = {}  # audio path -> index of the segment attached last
+        self.search_index = None  # built on the worker once the data is in
+        self.search_backlog = []  # phrases saved before the index was ready
+        self.search_hits = []
+        self.search_job = None
+        self.stats_dirty = True  # stats are only redrawn while the Overview tab is showing
+        self.agreement_report = None
+        self.agreement_dirty = False
+        self.incomplete = None  # IncompleteQueue, built with the data
+        self.orthography = None  # OrthographyCheck, built with the data
+        self.orthography_dirty = False
+        self.theme_history = collections.OrderedDict()  # theme -> (History rows, first row of each phrase), LRU
+        self.prefetch_job = None
+        self.duplicate_index = None  # built on the worker on first use, then kept current edit by edit
+        self.duplicates_report = None
+        self.duplicates_busy = False  # the worker is using the index; edits wait in the backlog
+        self.duplicates_backlog = []
+        self.duplicates_dirty = False
+        self.duplicates_cursor = {}  # group -> member opened last
+
+    def setup_styles(self):
+        """Configure modern styling for the application"""
+        style = ttk.Style()
+        
+        # Configure notebook style for tabs
+        style.configure('TNotebook', tabposition='n')
+        style.configure('TNotebook.Tab', padding=[12, 8])
+        
+        # Configure frame styles
+        style.configure('Card.TFrame', relief='raised', borderwidth=1)
+        style.configure('Header.TLabelframe', font=('Segoe UI', 10, 'bold'))
+        
+        # Configure button styles
+        style.configure('Primary.TButton', font=('Segoe UI', 9, 'bold'))
+        style.configure('Success.TButton', foreground='white')
+        
+    def create_ui(self):
+        """Create the main user interface"""
+        # Main container with padding
+        self.main_container = ttk.Frame(self.root, padding="20")
+        self.main_container.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.main_container.grid_rowconfigure(1, weight=1)
+        self.main_container.grid_columnconfigure(0, weight=1)
+
+        # Header section
+        self.create_header()
+        
+        # Main content using notebook for better organization
+        self.create_notebook()
+        
+        # Status bar at bottom
+        self.create_status_bar()
+
+    def create_header(self):
+        """Create application header with title and controls"""
+        header_frame = ttk.Frame(self.main_container)
+        header_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 20))
+        header_frame.grid_columnconfigure(1, weight=1)
+        
+        # App title
+        title_label = ttk.Label(header_frame, text="Akan Transcription App", 
+                               font=('Segoe UI', 16, 'bold'))
+        title_label.grid(row=0, column=0, sticky=tk.W)
+        
+        # Quick save button in header
+        save_button = ttk.Button(header_frame, text="💾 Save to Excel", 
+                                style='Primary.TButton', command=self.save_to_excel)
+        save_button.grid(row=0, column=2, sticky=tk.E, padx=(10, 0))
+
+        ttk.Button(header_frame, text="📤 Export…",
+                   command=self.export_manifest).grid(row=0, column=3, sticky=tk.E, padx=(10, 0))
+
+    def create_notebook(self):
+        """Create notebook with tabs for better organization"""
+        self.notebook = ttk.Notebook(self.main_container)
+        self.notebook.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # Main transcription tab
+        self.main_tab = ttk.Frame(self.notebook, padding="15")
+        self.notebook.add(self.main_tab, text="📝 Transcription")
+        
+        # Data overview tab
+        self.overview_tab = ttk.Frame(self.notebook, padding="15")
+        self.notebook.add(self.overview_tab, text="📊 Overview")
+        
+        # Setup main tab content
+        self.setup_main_tab()
+        self.setup_overview_tab()
+        if self.profiler:
+            self.create_diagnostics_tab()
+
+    def setup_main_tab(self):
+        """Setup the main transcription tab"""
+        self.main_tab.grid_rowconfigure(2, weight=1)
+        self.main_tab.grid_columnconfigure(0, weight=1)
+        
+        # Selection panel
+        self.create_selection_panel()
+        
+        # Transcription panel
+        self.create_transcription_panel()
+        
+        # History panel
+        self.create_history_panel()
+
+    def create_selection_panel(self):
+        """Create the theme/phrase selection panel"""
+        selection_frame = ttk.LabelFrame(self.main_tab, text="📂 Selection", 
+                                       style='Header.TLabelframe', padding="15")
+        selection_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 15))
+        selection_frame.grid_columnconfigure(1, weight=1)
+        selection_frame.grid_columnconfigure(3, weight=3)  # Give phrase column more weight
+        selection_frame.grid_columnconfigure(5, weight=1)
+        
+        # Theme selection
+        ttk.Label(selection_frame, text="Theme:", font=('Segoe UI', 9, 'bold')).grid(
+            row=0, column=0, sticky=tk.W, padx=(0, 10))
+        
+        self.theme_var = tk.StringVar(value=self.themes[0] if self.themes else "No Themes")
+        self.theme_combo = ttk.Combobox(selection_frame, textvariable=self.theme_var, 
+                                       state="readonly", width=15)
+        self.theme_combo['values'] = self.themes
+        self.theme_combo.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(0, 20))
+        self.theme_combo.bind('<<ComboboxSelected>>', self.update_theme)
+        
+        # Phrase selection
+        ttk.Label(selection_frame, text="Phrase:", font=('Segoe UI', 9, 'bold')).grid(
+            row=0, column=2, sticky=tk.W, padx=(0, 10))
+        
+        self.phrase_var = tk.StringVar()
+        self.phrase_combo = ttk.Combobox(selection_frame, textvariable=self.phrase_var, 
+                                        state="readonly", width=50)
+        self.phrase_combo.grid(row=0, column=3, sticky=(tk.W, tk.E), padx=(0, 20))
+        self.phrase_combo.bind('<<ComboboxSelected>>', self.update_phrase)
+        
+        # Version selection (Original + Alternatives)
+        ttk.Label(selection_frame, text="Version:", font=('Segoe UI', 9, 'bold')).grid(
+            row=0, column=4, sticky=tk.W, padx=(0, 10))
+        
+        self.version_var = tk.StringVar()
+        self.version_combo = ttk.Combobox(selection_frame, textvariable=self.version_var, 
+                                         state="readonly", width=12)
+        self.version_combo.grid(row=0, column=5, sticky=(tk.W, tk.E))
+        self.version_combo.bind('<<ComboboxSelected>>', self.update_version)
+
+        # Search across every theme's phrases and transcriptions
+        ttk.Label(selection_frame, text="Search:", font=('Segoe UI', 9, 'bold')).grid(
+            row=1, column=0, sticky=tk.W, padx=(0, 10), pady=(10, 0))
+
+        self.search_var = tk.StringVar()
+        self.search_combo = ttk.Combobox(selection_frame, textvariable=self.search_var)
+        self.search_combo.grid(row=1, column=1, columnspan=5, sticky=(tk.W, tk.E), pady=(10, 0))
+        self.search_combo.bind('<KeyRelease>', self.schedule_search)
+        self.search_combo.bind('<Return>', self.show_search_results)
+        self.search_combo.bind('<<ComboboxSelected>>', self.jump_to_search_hit)
+
+        self.queue_label = ttk.Label(selection_frame, text="", foreground='gray')
+        self.queue_label.grid(row=2, column=0, columnspan=6, sticky=tk.W, pady=(8, 0))
+        self.bind_navigation_keys()
+
+    def bind_navigation_keys(self):
+        """Alt+key navigation; Text and Entry widgets ignore Alt combinations, so these work while typing"""
+        bindings = {
+            '<Alt-n>': lambda e: self.step_phrase(1),
+            '<Alt-p>': lambda e: self.step_phrase(-1),
+            '<Alt-u>': lambda e: self.next_incomplete(),
+            '<Alt-U>': lambda e: self.next_incomplete(backwards=True),
+            '<Alt-v>': lambda e: self.step_version(1),
+            '<Alt-V>': lambda e: self.step_version(-1),
+            '<Alt-Key-0>': lambda e: self.select_version("Original"),
+        }
+        for alt_num in range(1, MAX_ALTERNATIVES + 1):
+            bindings[f'<Alt-Key-{alt_num}>'] = lambda e, alt_num=alt_num: self.select_version(f"Alternative {alt_num}")
+        for sequence, handler in bindings.items():
+            self.root.bind(sequence, handler)
+
+    def create_transcription_panel(self):
+        """Create the transcription input panel"""
+        trans_frame = ttk.LabelFrame(self.main_tab, text="✏️ Transcription", 
+                                   style='Header.TLabelframe', padding="15")
+        trans_frame.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 15))
+        trans_frame.grid_rowconfigure(1, weight=1)
+        trans_frame.grid_columnconfigure(0, weight=1)
+        
+        # Current phrase display
+        self.current_phrase_label = ttk.Label(trans_frame, text="Current Phrase: ", 
+                                            font=('Segoe UI', 9, 'italic'),
+                                            foreground='gray')
+        self.current_phrase_label.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        
+        # Text input with frame
+        input_frame = ttk.Frame(trans_frame)
+        input_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        input_frame.grid_rowconfigure(0, weight=1)
+        input_frame.grid_columnconfigure(0, weight=1)
+        
+        self.transcription_text = tk.Text(input_frame, height=4, font=('Segoe UI', 10),
+                                        wrap=tk.WORD, relief='solid', borderwidth=1)
+        self.transcription_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        # Scrollbar for text area
+        scrollbar = ttk.Scrollbar(input_frame, orient="vertical", command=self.transcription_text.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.transcription_text.configure(yscrollcommand=scrollbar.set)
+        
+        # Button frame - only save button now
+        button_frame = ttk.Frame(trans_frame)
+        button_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        ttk.Button(button_frame, text="💾 Save Transcription", 
+                  style='Primary.TButton',
+                  command=self.save_transcription).grid(row=0, column=0, sticky=tk.E)
+        ttk.Button(button_frame, text="↶ Undo", command=self.undo_edit).grid(row=0, column=1, padx=(10, 0))
+        ttk.Button(button_frame, text="↷ Redo", command=self.redo_edit).grid(row=0, column=2, padx=(5, 0))
+        # Tk's platform shortcuts: Ctrl+Z and Ctrl+Shift+Z (Ctrl+Y on Windows)
+        self.root.bind('<<Undo>>', self.undo_edit)
+        self.root.bind('<<Redo>>', self.redo_edit)
+
+        # Audio clip linked to the current version
+        audio_frame = ttk.Frame(trans_frame)
+        audio_frame.grid(row=3, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        audio_frame.grid_columnconfigure(2, weight=1)
+
+        ttk.Button(audio_frame, text="🔊 Link Audio…",
+                   command=self.link_audio).grid(row=0, column=0, sticky=tk.W)
+        ttk.Button(audio_frame, text="Unlink",
+                   command=self.unlink_audio).grid(row=0, column=1, sticky=tk.W, padx=(5, 0))
+        self.audio_label = ttk.Label(audio_frame, text="No audio linked",
+                                     font=('Segoe UI', 9), foreground='gray')
+        self.audio_label.grid(row=0, column=2, sticky=tk.W, padx=(10, 0))
+
+        self.waveform_canvas = tk.Canvas(audio_frame, height=48, background='white',
+                                         highlightthickness=1, highlightbackground='#cccccc')
+        self.waveform_canvas.grid(row=1, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(5, 0))
+        self.waveform_canvas.bind('<Configure>', lambda e: self.draw_waveform())
+
+        # Speech segments proposed for the recording, to attach phrase by phrase
+        segment_frame = ttk.Frame(audio_frame)
+        segment_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(5, 0))
+        ttk.Label(segment_frame, text="Segment:").grid(row=0, column=0, sticky=tk.W)
+        self.segment_combo = ttk.Combobox(segment_frame, state="readonly", width=28)
+        self.segment_combo.grid(row=0, column=1, sticky=tk.W, padx=(5, 0))
+        self.segment_combo.bind('<<ComboboxSelected>>', lambda e: self.draw_waveform())
+        ttk.Button(segment_frame, text="📌 Use Segment",
+                   command=self.attach_segment).grid(row=0, column=2, sticky=tk.W, padx=(5, 0))
+
+    def create_history_panel(self):
+        """Create the transcription history panel"""
+        history_frame = ttk.LabelFrame(self.main_tab, text="📜 History", 
+                                     style='Header.TLabelframe', padding="15")
+        history_frame.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        history_frame.grid_rowconfigure(1, weight=1)
+        history_frame.grid_columnconfigure(0, weight=1)
+        
+        # Header with button
+        history_header = ttk.Frame(history_frame)
+        history_header.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        history_header.grid_columnconfigure(0, weight=1)
+        
+        self.history_all_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(history_header, text="All phrases in theme", variable=self.history_all_var,
+                        command=self.toggle_history_scope).grid(row=0, column=0, sticky=tk.W)
+        
+        ttk.Button(history_header, text="+ New Alternative", 
+                  command=self.add_alternative).grid(row=0, column=1, sticky=tk.E)
+        
+        # Treeview for better display
+        columns = ('Phrase', 'Version', 'Transcription', 'Length')
+        self.history_tree = ttk.Treeview(history_frame, columns=columns, show='headings', height=8,
+                                         displaycolumns=columns[1:])
+        
+        # Configure columns
+        self.history_tree.heading('Phrase', text='Phrase')
+        self.history_tree.heading('Version', text='Version')
+        self.history_tree.heading('Transcription', text='Transcription')
+        self.history_tree.heading('Length', text='Length')
+        
+        self.history_tree.column('Phrase', width=220, minwidth=120)
+        self.history_tree.column('Version', width=80, minwidth=80)
+        self.history_tree.column('Transcription', width=450, minwidth=200)
+        self.history_tree.column('Length', width=60, minwidth=50)
+        
+        self.history_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.history_tree.bind('<<TreeviewSelect>>', self.on_history_select)
+        
+        # Scrollbar for treeview, driven by the virtual row window
+        tree_scrollbar = ttk.Scrollbar(history_frame, orient="vertical")
+        tree_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.history_rows = VirtualTreeRows(self.history_tree, tree_scrollbar)
+
+    def setup_overview_tab(self):
+        """Setup the overview tab"""
+        self.overview_tab.grid_rowconfigure(0, weight=1)
+        self.overview_tab.grid_columnconfigure(0, weight=1)
+        
+        # Stats frame
+        stats_frame = ttk.LabelFrame(self.overview_tab, text="📈 Statistics", 
+                                   style='Header.TLabelframe', padding="15")
+        stats_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        self.stats_text = tk.Text(stats_frame, height=12, font=('Segoe UI', 10),
+                                state='disabled', wrap=tk.WORD)
+        self.stats_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        self.notebook.bind('<<NotebookTabChanged>>', self.on_tab_changed)
+
+        self.create_agreement_panel()
+        self.create_duplicates_panel()
+        self.create_orthography_panel()
+
+    def create_diagnostics_tab(self):
+        """Per-operation latency percentiles and event-loop stalls (only when profiling)"""
+        self.diagnostics_tab = ttk.Frame(self.notebook, padding="15")
+        self.notebook.add(self.diagnostics_tab, text="🩺 Diagnostics")
+        self.diagnostics_tab.grid_rowconfigure(1, weight=1)
+        self.diagnostics_tab.grid_columnconfigure(0, weight=1)
+
+        header = ttk.Frame(self.diagnostics_tab)
+        header.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        header.grid_columnconfigure(2, weight=1)
+        ttk.Button(header, text="🔄 Reset", command=self.reset_diagnostics).grid(row=0, column=0, sticky=tk.W)
+        ttk.Button(header, text="💾 Export JSON…",
+                   command=self.export_diagnostics).grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+        self.diagnostics_label = ttk.Label(header, text="", foreground='gray')
+        self.diagnostics_label.grid(row=0, column=2, sticky=tk.W, padx=(10, 0))
+
+        # Slowest in total first
+        columns = ('Operation', 'Calls', 'p50 ms', 'p95 ms', 'p99 ms', 'Max ms', 'Total ms')
+        diagnostics_tree = ttk.Treeview(self.diagnostics_tab, columns=columns, show='headings', height=14)
+        for column, width in zip(columns, (300, 70, 70, 70, 70, 80, 90)):
+            diagnostics_tree.heading(column, text=column)
+            diagnostics_tree.column(column, width=width, minwidth=50,
+                                    anchor=tk.W if column == 'Operation' else tk.E)
+        diagnostics_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        diagnostics_scrollbar = ttk.Scrollbar(self.diagnostics_tab, orient="vertical")
+        diagnostics_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.diagnostics_rows = VirtualTreeRows(diagnostics_tree, diagnostics_scrollbar)
+
+        stalls_frame = ttk.LabelFrame(self.diagnostics_tab, text=f"🐢 Stalls over {self.profiler.stall_ms} ms",
+                                      style='Header.TLabelframe', padding="10")
+        stalls_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        stalls_frame.grid_columnconfigure(0, weight=1)
+        self.stalls_text = tk.Text(stalls_frame, height=6, font=('Consolas', 9), state='disabled', wrap=tk.NONE)
+        self.stalls_text.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        self.shown_stalls = None
+        self.root.after(DIAGNOSTICS_REFRESH_MS, self.refresh_diagnostics)
+
+    def refresh_diagnostics(self):
+        """Redraw the diagnostics tab while it is showing; reschedules itself"""
+        self.root.after(DIAGNOSTICS_REFRESH_MS, self.refresh_diagnostics)
+        if self.notebook.select() != str(self.diagnostics_tab):
+            return
+        ms = lambda seconds: f"{seconds * 1000:.2f}"
+        rows = [(name, (name, histogram.count, ms(histogram.percentile(0.50)), ms(histogram.percentile(0.95)),
+                        ms(histogram.percentile(0.99)), ms(histogram.max), f"{histogram.total * 1000:.0f}"))
+                for name, histogram in self.profiler.operations()]
+        self.diagnostics_rows.set_rows(rows)
+        stalls = list(self.profiler.stalls)
+        self.diagnostics_label.config(text=f"{len(rows)} operations · {len(stalls)} stalls · "
+                                           f"since {time.strftime('%H:%M:%S', time.localtime(self.profiler.started))}")
+        if stalls == self.shown_stalls:
+            return
+        self.shown_stalls = stalls
+        lines = []
+        for stall in reversed(stalls):
+            line = f"{time.strftime('%H:%M:%S', time.localtime(stall['at']))}  {stall['ms']:>7.0f} ms"
+            if stall["slowest_call"]:
+                line += f"  slowest call: {stall['slowest_call']} ({stall['slowest_call_ms']:.0f} ms)"
+            lines.append(line)
+        self.stalls_text.config(state='normal')
+        self.stalls_text.delete("1.0", tk.END)
+        self.stalls_text.insert("1.0", "\n".join(lines) or "No stalls so far")
+        self.stalls_text.config(state='disabled')
+
+    def reset_diagnostics(self):
+        self.profiler.reset()
+        self.shown_stalls = None
+        self.refresh_diagnostics()
+
+    def export_diagnostics(self):
+        path = filedialog.asksaveasfilename(
+            title="Export diagnostics", initialdir=PROFILE_DIR, initialfile=profile_path().name,
+            defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        try:
+            self.profiler.save(Path(path))
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export diagnostics: {e}")
+            return
+        self.status_label.config(text=f"✅ Exported diagnostics to {Path(path).name}")
+
+    def create_agreement_panel(self):
+        """Create the Original-vs-alternatives agreement report"""
+        agreement_frame = ttk.LabelFrame(self.overview_tab, text="🤝 Agreement",
+                                         style='Header.TLabelframe', padding="15")
+        agreement_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(15, 0))
+        self.overview_tab.grid_rowconfigure(1, weight=1)
+        agreement_frame.grid_rowconfigure(2, weight=1)
+        agreement_frame.grid_columnconfigure(0, weight=1)
+
+        header = ttk.Frame(agreement_frame)
+        header.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        header.grid_columnconfigure(1, weight=1)
+        ttk.Button(header, text="🤝 Compute Agreement",
+                   command=self.compute_agreement).grid(row=0, column=0, sticky=tk.W)
+        self.agreement_label = ttk.Label(header, text="CER/WER of each alternative against its Original",
+                                         foreground='gray')
+        self.agreement_label.grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+
+        self.agreement_summary = ttk.Label(agreement_frame, text="", font=('Segoe UI', 9))
+        self.agreement_summary.grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=(0, 5))
+
+        # Phrases flagged for review, worst first; double-click opens one
+        columns = ('Theme', 'Phrase', 'Version', 'CER', 'WER')
+        self.agreement_tree = ttk.Treeview(agreement_frame, columns=columns, show='headings', height=6)
+        for column, width in zip(columns, (120, 380, 90, 60, 60)):
+            self.agreement_tree.heading(column, text=column)
+            self.agreement_tree.column(column, width=width, minwidth=50)
+        self.agreement_tree.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.agreement_tree.bind('<Double-1>', self.on_agreement_open)
+
+        agreement_scrollbar = ttk.Scrollbar(agreement_frame, orient="vertical")
+        agreement_scrollbar.grid(row=2, column=1, sticky=(tk.N, tk.S))
+        self.agreement_rows = VirtualTreeRows(self.agreement_tree, agreement_scrollbar)
+
+    def create_duplicates_panel(self):
+        """Create the near-duplicate phrases and transcriptions report"""
+        duplicates_frame = ttk.LabelFrame(self.overview_tab, text="🪞 Near Duplicates",
+                                          style='Header.TLabelframe', padding="15")
+        duplicates_frame.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(15, 0))
+        self.overview_tab.grid_rowconfigure(2, weight=1)
+        duplicates_frame.grid_rowconfigure(1, weight=1)
+        duplicates_frame.grid_columnconfigure(0, weight=1)
+
+        header = ttk.Frame(duplicates_frame)
+        header.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        header.grid_columnconfigure(1, weight=1)
+        ttk.Button(header, text="🪞 Find Near Duplicates",
+                   command=self.compute_duplicates).grid(row=0, column=0, sticky=tk.W)
+        self.duplicates_label = ttk.Label(header, text="Similar phrases and transcriptions across themes",
+                                          foreground='gray')
+        self.duplicates_label.grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+
+        # Largest groups first; double-click opens the group's members in turn
+        columns = ('Kind', 'Similar', 'Texts', 'Example', 'Themes')
+        self.duplicates_tree = ttk.Treeview(duplicates_frame, columns=columns, show='headings', height=6)
+        for column, width in zip(columns, (90, 60, 50, 380, 160)):
+            self.duplicates_tree.heading(column, text=column)
+            self.duplicates_tree.column(column, width=width, minwidth=50)
+        self.duplicates_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.duplicates_tree.bind('<Double-1>', self.on_duplicate_open)
+
+        duplicates_scrollbar = ttk.Scrollbar(duplicates_frame, orient="vertical")
+        duplicates_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.duplicates_rows = VirtualTreeRows(self.duplicates_tree, duplicates_scrollbar)
+
+    def create_orthography_panel(self):
+        """Create the list of transcriptions with orthography problems"""
+        orthography_frame = ttk.LabelFrame(self.overview_tab, text="🔤 Orthography",
+                                           style='Header.TLabelframe', padding="15")
+        orthography_frame.grid(row=3, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(15, 0))
+        self.overview_tab.grid_rowconfigure(3, weight=1)
+        orthography_frame.grid_rowconfigure(1, weight=1)
+        orthography_frame.grid_columnconfigure(0, weight=1)
+
+        header = ttk.Frame(orthography_frame)
+        header.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 10))
+        header.grid_columnconfigure(1, weight=1)
+        ttk.Button(header, text="🔤 Normalize All",
+                   command=self.normalize_transcriptions).grid(row=0, column=0, sticky=tk.W)
+        self.orthography_label = ttk.Label(header, text="Checked when the transcriptions are loaded",
+                                           foreground='gray')
+        self.orthography_label.grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+
+        # Kept current on every save; double-click opens a version to fix it
+        columns = ('Theme', 'Phrase', 'Version', 'Problems')
+        self.orthography_tree = ttk.Treeview(orthography_frame, columns=columns, show='headings', height=6)
+        for column, width in zip(columns, (120, 300, 90, 300)):
+            self.orthography_tree.heading(column, text=column)
+            self.orthography_tree.column(column, width=width, minwidth=50)
+        self.orthography_tree.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.orthography_tree.bind('<Double-1>', self.on_orthography_open)
+
+        orthography_scrollbar = ttk.Scrollbar(orthography_frame, orient="vertical")
+        orthography_scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.orthography_rows = VirtualTreeRows(self.orthography_tree, orthography_scrollbar)
+
+    def on_tab_changed(self, event):
+        """Redraw the overview lazily when it becomes visible"""
+        if self.stats_dirty:
+            self.update_stats()
+        if self.notebook.select() != str(self.overview_tab):
+            return
+        if self.agreement_dirty and self.agreement_report is not None:
+            # Only the edited pairs are recomputed, the rest come from the cache
+            self.compute_agreement()
+        if self.duplicates_dirty and self.duplicates_report is not None and not self.duplicates_busy:
+            # Edits have already been indexed; this only regroups
+            self.compute_duplicates()
+
+    def create_status_bar(self):
+        """Create status bar at bottom"""
+        status_frame = ttk.Frame(self.main_container)
+        status_frame.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        status_frame.grid_columnconfigure(1, weight=1)
+        
+        ttk.Label(status_frame, text="Status:").grid(row=0, column=0, sticky=tk.W)
+        
+        self.status_label = ttk.Label(status_frame, text="Ready to transcribe", 
+                                    relief='sunken', padding="5")
+        self.status_label.grid(row=0, column=1, sticky=(tk.W, tk.E), padx=(10, 0))
+
+    def load_themes_and_phrases(self):
+        """Load the theme names and the first theme's phrases from Excel file
+
+        Any other themes not served from the cache are left in
+        remaining_themes for load_remaining_themes.
+        """
+        try:
+            self.themes, self.phrases, self.remaining_themes = open_question_bank(self.phrases_path,
+                                                                                  self.phrases_cache_path)
+        except Exception as e:
+            self.load_messages.append(("error", f"Error loading themes and phrases: {e}"))
+            self.themes = list(DEFAULT_THEMES)
+            self.phrases = dict(DEFAULT_PHRASES)
+
+    def initialize_phrase_data(self):
+        """Index every loaded question-bank phrase with an empty Original transcription"""
+        self.phrase_data = PhraseIndex.build(self.themes, self.phrases)
+
+    def load_existing_metadata(self):
+        """Load existing transcription data from the store, seeding it from Excel once"""
+        load_transcriptions(self.store, self.phrase_data, self.excel_path,
+                            warn=lambda message: self.load_messages.append(("warning", message)))
+        self.check_orthography()
+
+    def check_orthography(self):
+        """Note which loaded transcriptions are not in normal form or still look wrong; writes nothing"""
+        self.orthography = OrthographyCheck.build(self.phrase_data)
+        self.orthography_dirty = True
+
+    def normalize_transcriptions(self):
+        """Save the normal form of every version stored otherwise, each an undoable edit"""
+        if not self.data_loaded or self.orthography is None:
+            return
+        changes = self.orthography.changes()
+        if not changes:
+            self.status_label.config(text="🔤 Every transcription is already in normal form")
+            return
+        if not messagebox.askyesno("Normalize", f"Save {len(changes):,} transcriptions in normal form?\n\n"
+                                                "Each can be undone like a save."):
+            return
+        old_texts = {(phrase_id, version): self.phrase_data[phrase_id].get(version)
+                     for phrase_id, version, _ in changes}
+        try:
+            skipped = self.store.record_many(changes)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to persist transcriptions: {e}")
+            return
+        conflicted = {(conflict.phrase_id, conflict.version) for conflict in skipped}
+        written = [change for change in changes if change[:2] not in conflicted]
+        for phrase_id, version, text in written:
+            if not self.log_edit(self.edit_log.record, phrase_id, version, old_texts[phrase_id, version], text):
+                break
+        self.agreement_dirty = True
+        for phrase_id in dict.fromkeys(phrase_id for phrase_id, _, _ in written):
+            self.phrase_changed(phrase_id)
+            if self.search_index is not None:
+                self.search_index.index_phrase(self.phrase_data, phrase_id)
+            else:
+                self.search_backlog.append(phrase_id)
+        if skipped:
+            # Versions other annotators saved meanwhile: bring in their text, rechecked
+            self.poll_shared_store(reschedule=False)
+        # The text box is left alone: it may hold unsaved typing, and saving it normalizes anyway
+        self.update_version_combo()
+        self.update_history()
+        self.update_stats()
+        self.schedule_autosave()
+        message = f"🔤 Normalized {len(written):,} transcriptions"
+        if skipped:
+            message += f" · {len(skipped):,} changed by others meanwhile, left as they are"
+        self.status_label.config(text=message)
+
+    def load_data(self, progress):
+        """Load the question bank and transcriptions (runs on the worker thread)"""
+        progress("⏳ Loading question bank...")
+        self.load_themes_and_phrases()
+        self.initialize_phrase_data()
+        progress("⏳ Loading transcriptions...")
+        self.load_existing_metadata()
+        self.incomplete = IncompleteQueue.build(self.phrase_data, self.themes)
+        try:
+            self.edit_log.load(self.phrase_data)
+        except (OSError, ValueError, KeyError) as e:
+            self.load_messages.append(("warning", f"Undo history could not be read and starts empty: {e}"))
+            self.edit_log = EditLog(self.edit_log.path, self.edit_log.memory_bytes).load(self.phrase_data)
+
+    def on_data_loaded(self, _result):
+        """Populate the UI once the worker has finished loading"""
+        self.data_loaded = True
+        self.theme_combo['values'] = self.themes
+        self.initialize_selections()
+        self.update_stats()
+        self.status_label.config(text="Ready to transcribe")
+        # Edits the shards have not caught up with have not reached the combined workbook either
+        self.workbook_stale = bool(self.store.dirty_themes)
+        if self.remaining_themes:
+            self.worker.submit("load-themes", finish_question_bank, self.phrases_path, self.themes,
+                               self.phrases, self.remaining_themes, self.phrases_cache_path,
+                               on_done=self.on_themes_loaded, on_error=self.on_themes_load_failed)
+        self.worker.submit("search-index", SearchIndex.build, self.phrase_data.copy(),
+                           on_done=self.on_search_index_built)
+        if isinstance(self.store, SharedStore):
+            self.root.after(SHARED_POLL_MS, self.poll_shared_store)
+        self.show_load_messages()
+
+    def on_search_index_built(self, index):
+        # Catch up with transcriptions saved while the index was being built
+        for phrase_id in self.search_backlog:
+            index.index_phrase(self.phrase_data, phrase_id)
+        self.search_backlog = []
+        if self.profiler:
+            self.profiler.instrument(index, "search", names=("search", "update", "index_phrase"))
+        self.search_index = index
+        if self.search_var.get().strip():
+            self.run_search()
+
+    def on_themes_loaded(self, parsed):
+        """List the themes parsed in the background and open one the user is waiting for"""
+        for theme, phrases in parsed.items():
+            self.phrases[theme] = phrases
+            self.phrase_data.list_theme(theme, phrases)
+            self.incomplete.add_theme(theme)
+            self.theme_history.pop(theme, None)
+        self.remaining_themes = []
+        self.update_stats()
+        if self.pending_theme_index is not None:
+            self.theme_combo.current(self.pending_theme_index)
+            self.pending_theme_index = None
+            self.update_theme()
+
+    def on_themes_load_failed(self, error):
+        self.load_messages.append(("error", f"Error loading themes and phrases: {error}"))
+        self.on_themes_loaded({theme: list(DEFAULT_PHRASES[DEFAULT_THEMES[0]])
+                               for theme in self.remaining_themes})
+        self.show_load_messages()
+
+    def show_load_messages(self):
+        for kind, message in self.load_messages:
+            if kind == "error":
+                messagebox.showerror("Error", message)
+            else:
+                messagebox.showwarning("Warning", message)
+        self.load_messages = []
+
+    def on_data_load_failed(self, error):
+        self.status_label.config(text=f"❌ Failed to load data: {error}")
+        messagebox.showerror("Error", f"Failed to load data: {error}")
+
+    def show_progress(self, message):
+        self.status_label.config(text=message)
+
+    def on_close(self):
+        """Let queued saves finish before the window goes away"""
+        if self.data_loaded and (self.autosave_job is not None or self.workbook_stale or self.store.dirty_themes):
+            self.save_to_excel(quiet=True, combined=True)
+        if not self.worker.is_idle():
+            self.status_label.config(text="⏳ Finishing pending saves...")
+            self.root.update_idletasks()
+        self.worker.shutdown()
+        self.store.close()
+        self.edit_log.close()
+        if self.profiler:
+            try:
+                self.profiler.save(profile_path())
+            except OSError:
+                pass
+        self.root.destroy()
+
+    def initialize_selections(self):
+        """Initialize UI selections"""
+        if self.themes:
+            self.theme_combo.current(0)
+            self.update_phrase_combo()
+            if self.phrases[self.themes[0]]:
+                self.select_phrase(0)
+                self.update_version_combo()
+                self.version_var.set("Original")
+                self.current_version = "Original"
+                self.update_current_phrase_display()
+                self.update_history()
+                self.update_transcription_field()
+
+    def update_phrase_combo(self):
+        """Update phrase combobox values"""
+        if not self.themes:
+            return
+        current_theme = self.themes[self.theme_index]
+        phrases = self.phrases[current_theme]
+        self.phrase_combo['values'] = phrases
+
+    def select_phrase(self, position):
+        """Make the phrase at position in the current theme the active one"""
+        self.phrase_index = position
+        self.current_phrase_id = self.phrase_data.phrase_id(self.themes[self.theme_index], position)
+        self.phrase_combo.current(position)
+
+    def current_record(self):
+        return self.phrase_data[self.current_phrase_id]
+
+    def update_version_combo(self):
+        """Update version combobox values (Original + Alternatives)"""
+        if not self.themes:
+            return
+        
+        versions = ["Original"]
+        for alt_num in self.current_record().alternative_numbers():
+            versions.append(f"Alternative {alt_num}")
+        
+        self.version_combo['values'] = versions
+
+    def update_current_phrase_display(self):
+        """Update the current phrase display"""
+        if self.themes and self.phrase_index < len(self.phrases[self.themes[self.theme_index]]):
+            current_phrase = self.phrases[self.themes[self.theme_index]][self.phrase_index]
+            self.current_phrase_label.config(text=f"Current Phrase: {current_phrase}")
+        self.update_queue_label()
+
+    def update_theme(self, *args):
+        """Handle theme selection change"""
+        if not self.themes:
+            return
+        # The combobox tracks the selected position, so no search is needed
+        theme_index = self.theme_combo.current()
+        if self.themes[theme_index] not in self.phrases:
+            # Still being parsed in the background; on_themes_loaded opens it
+            self.pending_theme_index = theme_index
+            self.current_phrase_id = None
+            self.phrase_combo['values'] = []
+            self.phrase_var.set("")
+            self.version_combo['values'] = []
+            self.transcription_text.delete("1.0", tk.END)
+            self.history_rows.set_rows([])
+            self.status_label.config(text=f"⏳ Loading {self.themes[theme_index]}...")
+            return
+        self.pending_theme_index = None
+        self.theme_index = theme_index
+        self.update_phrase_combo()
+        self.show_phrase(theme_index, 0)
+
+    def update_phrase(self, *args):
+        """Handle phrase selection change"""
+        if not self.themes:
+            return
+        # current() is the selected position, so repeated phrase texts stay distinct
+        self.show_phrase(self.theme_index, self.phrase_combo.current())
+
+    def update_version(self, *args):
+        """Handle version selection change"""
+        selected = self.version_var.get()
+        self.current_version = selected
+        self.update_transcription_field()
+
+    def show_phrase(self, theme_index, position):
+        """Make a phrase's Original the current version and redraw what depends on it
+
+        The History rows of recent themes are kept built, and the waveforms of
+        the phrases the navigation keys lead to next are loaded while idle, so
+        stepping through phrases costs a few widget updates per key press.
+        """
+        if theme_index != self.theme_index:
+            self.theme_index = theme_index
+            self.theme_combo.current(theme_index)
+            self.update_phrase_combo()
+        self.select_phrase(position)
+        self.update_version_combo()
+        self.current_version = "Original"
+        self.version_var.set("Original")
+        self.update_current_phrase_display()
+        self.update_history()
+        self.update_transcription_field()
+        self.schedule_prefetch()
+
+    def neighbour(self, theme_index, position, step):
+        """(theme index, position) step phrases away, across loaded themes; None past either end"""
+        position += step
+        while not 0 <= position < len(self.phrases.get(self.themes[theme_index], ())):
+            if position < 0:
+                theme_index -= 1
+                if theme_index < 0:
+                    return None
+                position += len(self.phrases.get(self.themes[theme_index], ()))
+            else:
+                position -= len(self.phrases.get(self.themes[theme_index], ()))
+                theme_index += 1
+                if theme_index >= len(self.themes):
+                    return None
+        return theme_index, position
+
+    def step_phrase(self, step):
+        """Go to the next (1) or previous (-1) phrase, moving on to the neighbouring theme at either end"""
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        target = self.neighbour(self.theme_index, self.phrase_index, step)
+        if target is None:
+            self.status_label.config(text="Already at the last phrase" if step > 0 else "Already at the first phrase")
+            return
+        self.show_phrase(*target)
+
+    def next_incomplete(self, backwards=False):
+        """Go to the next (or previous) phrase with an empty Original or alternative"""
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        target = self.incomplete.next(self.themes, self.theme_index, self.phrase_index, backwards)
+        if target is None:
+            self.status_label.config(text="🎉 Every phrase is transcribed")
+            return
+        self.show_phrase(*target)
+
+    def select_version(self, version):
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        if version not in self.version_combo['values']:
+            self.status_label.config(text=f"This phrase has no {version}")
+            return
+        self.current_version = version
+        self.version_var.set(version)
+        self.update_transcription_field()
+
+    def step_version(self, step):
+        """Cycle through the current phrase's Original and alternatives"""
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        versions = list(self.version_combo['values'])
+        index = versions.index(self.current_version) if self.current_version in versions else 0
+        self.select_version(versions[(index + step) % len(versions)])
+
+    def upcoming_phrases(self):
+        """(theme index, position) of the phrases the navigation keys lead to next"""
+        here = (self.theme_index, self.phrase_index)
+        upcoming = []
+        target = here
+        for _ in range(PREFETCH_AHEAD):
+            target = self.neighbour(*target, 1)
+            if target is None:
+                break
+            upcoming.append(target)
+        target = here
+        for _ in range(PREFETCH_AHEAD):
+            target = self.incomplete.next(self.themes, *target)
+            if target is None or target == here or target in upcoming:
+                break
+            upcoming.append(target)
+        previous = self.neighbour(*here, -1)
+        if previous is not None:
+            upcoming.append(previous)
+        return upcoming
+
+    def schedule_prefetch(self):
+        if self.prefetch_job is not None:
+            self.root.after_cancel(self.prefetch_job)
+        # After the keypress has been drawn; a burst of keypresses only prefetches once
+        self.prefetch_job = self.root.after_idle(self.prefetch)
+
+    def prefetch(self):
+        """Build the History rows and load the waveforms of the phrases reached next"""
+        self.prefetch_job = None
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        current_theme = self.themes[self.theme_index]
+        paths = []
+        for theme_index, position in self.upcoming_phrases():
+            theme = self.themes[theme_index]
+            if theme != current_theme and self.history_all_var.get():
+                self.theme_history_rows(theme)
+            ref = self.phrase_data[self.phrase_data.phrase_id(theme, position)].audio_for("Original")
+            if ref is not None:
+                path = parse_audio_ref(ref)[0]
+                if path not in self.peaks_memory and path not in paths:
+                    paths.append(path)
+        # The current theme's rows were used last, so prefetching never pushes them out
+        if current_theme in self.theme_history:
+            self.theme_history.move_to_end(current_theme)
+        if not paths:
+            return
+        try:
+            from .audio import load_peaks_many
+        except ImportError:
+            return
+        self.worker.submit("prefetch", load_peaks_many, paths[:PREFETCH_AHEAD],
+                           on_done=self.on_peaks_prefetched, on_error=lambda e: None)
+
+    def on_peaks_prefetched(self, loaded):
+        for path, peaks in loaded.items():
+            remember(self.peaks_memory, path, peaks)
+        if self.shown_audio in loaded:
+            self.show_audio_info()
+
+    def phrase_changed(self, phrase_id):
+        """Forget what was prepared for a phrase whose transcriptions changed"""
+        self.theme_history.pop(self.phrase_data.theme_of(phrase_id), None)
+        if self.incomplete is not None:
+            self.incomplete.update(phrase_id)
+        if self.orthography is not None:
+            self.orthography.update(phrase_id)
+            self.orthography_dirty = True
+        if self.duplicates_busy:
+            self.duplicates_backlog.append(phrase_id)
+        elif self.duplicate_index is not None:
+            self.duplicate_index.index_phrase(self.phrase_data, phrase_id)
+            self.duplicates_dirty = True
+
+    def update_queue_label(self):
+        if self.incomplete is None or not self.themes:
+            return
+        theme = self.themes[self.theme_index]
+        self.queue_label.config(
+            text=f"{len(self.incomplete)} phrases to transcribe, {self.incomplete.remaining(theme)} in {theme} · "
+                 "Alt+N/Alt+P next/previous phrase · Alt+U next untranscribed · Alt+V or Alt+0–"
+                 f"{MAX_ALTERNATIVES} version")
+
+    def update_transcription_field(self):
+        """Update transcription text field"""
+        self.transcription_text.delete("1.0", tk.END)
+        record = self.current_record()
+        
+        if self.current_version == "Original":
+            transcription = record.original
+        else:
+            # Extract alternative number
+            alt_num = int(self.current_version.split()[1])
+            transcription = record.get(alt_num)
+        
+        if transcription:
+            self.transcription_text.insert("1.0", transcription)
+        self.update_audio_panel()
+
+    def current_version_key(self):
+        """The current version as the store addresses it: "Original" or an alternative number"""
+        if self.current_version == "Original":
+            return "Original"
+        return int(self.current_version.split()[1])
+
+    def link_audio(self):
+        """Link a WAV recording to the current version of the current phrase"""
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        path = filedialog.askopenfilename(title="Link audio",
+                                          filetypes=[("WAV audio", "*.wav"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            from .audio import WavClip
+        except ImportError:
+            messagebox.showerror("Error", "Audio support needs numpy: pip install numpy")
+            return
+        try:
+            WavClip(path).close()
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Cannot use this audio file: {e}")
+            return
+        try:
+            self.store.link_audio(self.current_phrase_id, self.current_version_key(), audio_ref(path))
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to persist audio link: {e}")
+            return
+        self.status_label.config(text=f"🔊 Linked audio to {self.current_version}")
+        self.update_audio_panel()
+
+    def unlink_audio(self):
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        record = self.current_record()
+        version = self.current_version_key()
+        if not record.audio or version not in record.audio:
+            return
+        try:
+            self.store.link_audio(self.current_phrase_id, version, None)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to persist audio link: {e}")
+            return
+        self.status_label.config(text=f"Unlinked audio from {self.current_version}")
+        self.update_audio_panel()
+
+    def update_audio_panel(self):
+        """Show the clip linked to the current version; peaks and segments load on the worker"""
+        ref = self.current_record().audio_for(self.current_version_key())
+        if ref is None:
+            self.shown_span = None
+        else:
+            self.segment_source, self.shown_span = parse_audio_ref(ref)
+        self.shown_audio = self.segment_source
+        self.update_segment_combo()
+        path = self.shown_audio
+        if path is None:
+            self.show_audio_info()
+            return
+        if path in self.peaks_memory:
+            self.peaks_memory.move_to_end(path)
+            self.show_audio_info()
+            return
+        self.audio_label.config(text=f"{path.name} · loading waveform…")
+        self.draw_waveform()
+        try:
+            from .audio import load_peaks
+        except ImportError:
+            self.audio_label.config(text=f"{path.name} · install numpy to show the waveform")
+            return
+        # Keyed, so flicking through phrases only computes the last one asked for
+        self.worker.submit("peaks", load_peaks, path,
+                           on_done=lambda peaks: self.on_peaks_loaded(path, peaks),
+                           on_error=lambda e: self.on_audio_failed(path, e))
+
+    def on_peaks_loaded(self, path, peaks):
+        remember(self.peaks_memory, path, peaks)
+        if path == self.shown_audio:
+            self.show_audio_info()
+
+    def on_audio_failed(self, path, error):
+        if path == self.shown_audio:
+            self.audio_label.config(text=f"{path.name} · unavailable ({error})")
+            self.segment_combo.set("")
+            self.draw_waveform()
+
+    def show_audio_info(self):
+        path = self.shown_audio
+        if path is None:
+            self.audio_label.config(text="No audio linked")
+        elif self.current_record().audio_for(self.current_version_key()) is None:
+            self.audio_label.config(text=f"No audio linked · segments from {path.name}")
+        else:
+            text = path.name
+            if path in self.peaks_memory:
+                text += f" · {format_seconds(self.peaks_memory[path].duration)}"
+            if self.shown_span:
+                text += f" · {format_seconds(self.shown_span[0])}–{format_seconds(self.shown_span[1])}"
+            self.audio_label.config(text=text)
+        self.draw_waveform()
+
+    def update_segment_combo(self):
+        """Offer the segments of the current recording, preselecting the next unused one"""
+        path = self.segment_source
+        segments = self.segments_memory.get(path) if path is not None else None
+        if segments is None:
+            self.segment_combo['values'] = []
+            self.segment_combo.set("")
+            if path is None:
+                return
+            try:
+                from .audio import load_segments
+            except ImportError:
+                return
+            self.segment_combo.set("detecting speech…")
+            self.worker.submit("segments", load_segments, path,
+                               on_done=lambda found: self.on_segments_loaded(path, found),
+                               on_error=lambda e: self.on_audio_failed(path, e))
+            return
+        self.segments_memory.move_to_end(path)
+        self.segment_combo['values'] = [f"{i + 1}. {format_seconds(start)}–{format_seconds(end)}"
+                                        for i, (start, end) in enumerate(segments)]
+        if not segments:
+            self.segment_combo.set("no speech found")
+        elif self.shown_span in segments:
+            self.segment_combo.current(segments.index(self.shown_span))
+        else:
+            self.segment_combo.current(min(self.segment_cursor.get(path, -1) + 1, len(segments) - 1))
+
+    def on_segments_loaded(self, path, segments):
+        remember(self.segments_memory, path, segments)
+        if path == self.segment_source:
+            self.update_segment_combo()
+            self.draw_waveform()
+
+    def attach_segment(self):
+        """Link the chosen segment of the recording to the current version"""
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        path = self.segment_source
+        segments = self.segments_memory.get(path)
+        index = self.segment_combo.current()
+        if not segments or index < 0:
+            return
+        try:
+            self.store.link_audio(self.current_phrase_id, self.current_version_key(),
+                                  audio_ref(path, segments[index]))
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to persist audio link: {e}")
+            return
+        self.segment_cursor[path] = index
+        self.status_label.config(text=f"📌 Attached segment {index + 1} to {self.current_version}")
+        self.update_audio_panel()
+
+    def draw_waveform(self):
+        """Draw the shown clip's envelope as one polygon, one point pair per column"""
+        canvas = self.waveform_canvas
+        canvas.delete('all')
+        peaks = self.peaks_memory.get(self.shown_audio)
+        if peaks is None:
+            return
+        width = max(canvas.winfo_width(), 1)
+        height = max(canvas.winfo_height(), 1)
+        mins, maxs = peaks.overview(width)
+        if not len(mins):
+            return
+        middle = height / 2
+        scale = width / len(mins)
+        top = [(i * scale, middle - high * middle) for i, high in enumerate(maxs.tolist())]
+        bottom = [(i * scale, middle - low * middle) for i, low in enumerate(mins.tolist())]
+        points = top + bottom[::-1]
+        canvas.create_polygon(*[c for point in points for c in point],
+                              fill='#4a7ebb', outline='#4a7ebb')
+
+        # The linked span, and the candidate segment when it is a different one
+        duration = peaks.duration or 1
+        if self.shown_span:
+            start, end = self.shown_span
+            canvas.create_rectangle(start / duration * width, 0, end / duration * width, height,
+                                    fill='#f0a030', stipple='gray25', outline='#f0a030')
+        segments = self.segments_memory.get(self.shown_audio)
+        index = self.segment_combo.current()
+        if segments and 0 <= index < len(segments) and segments[index] != self.shown_span:
+            start, end = segments[index]
+            canvas.create_rectangle(start / duration * width, 1, end / duration * width, height - 1,
+                                    outline='#d04040', dash=(3, 2))
+
+    def compute_agreement(self):
+        """Score every Original/alternative pair on the worker"""
+        if not self.data_loaded:
+            return
+        self.agreement_dirty = False
+        self.agreement_label.config(text="⏳ Comparing versions...")
+        rows = self.phrase_data.snapshot()
+        self.worker.submit("agreement", compute_agreement, rows,
+                           on_done=lambda report: self.on_agreement_computed(rows, report),
+                           on_error=self.on_agreement_failed)
+
+    def on_agreement_computed(self, rows, report):
+        self.agreement_report = report
+        lines = format_agreement(report)
+        self.agreement_label.config(text=lines[0])
+        self.agreement_summary.config(text="   ".join(lines[1:3]))
+        self.agreement_rows.set_rows([
+            ((phrase_id, alt_num),
+             (rows[phrase_id][0][0], history_display(rows[phrase_id][0][1], 60),
+              f"Alternative {alt_num}", f"{cer:.0%}", f"{wer:.0%}"))
+            for phrase_id, alt_num, cer, wer in report["flagged"]])
+
+    def on_agreement_failed(self, error):
+        self.agreement_label.config(text=f"❌ Agreement failed: {error}")
+
+    def compute_duplicates(self):
+        """Find near-duplicate groups on the worker, building the index the first time"""
+        if not self.data_loaded or self.duplicates_busy:
+            return
+        try:
+            from .duplicates import find_duplicates
+        except ImportError:
+            self.duplicates_label.config(text="Finding near duplicates needs numpy: pip install numpy")
+            return
+        self.duplicates_busy = True
+        self.duplicates_dirty = False
+        self.duplicates_label.config(text="⏳ Looking for near duplicates...")
+        # The worker reads a copy: edits made meanwhile reach the index through the backlog
+        self.worker.submit("duplicates", find_duplicates, self.duplicate_index, self.phrase_data.copy(),
+                           on_done=self.on_duplicates_found, on_error=self.on_duplicates_failed)
+
+    def on_duplicates_found(self, result):
+        from .duplicates import format_duplicates, group_members
+
+        index, report = result
+        self.duplicate_index = index
+        self.duplicates_busy = False
+        # Catch up with edits made while the worker had the index
+        for phrase_id in self.duplicates_backlog:
+            index.index_phrase(self.phrase_data, phrase_id)
+        self.duplicates_dirty = bool(self.duplicates_backlog)
+        self.duplicates_backlog = []
+        self.duplicates_report = report
+        self.duplicates_cursor = {}
+        self.duplicates_label.config(text="   ".join(format_duplicates(report)))
+        rows = []
+        for group_index, group in enumerate(report["groups"]):
+            members = group_members(group, self.phrase_data)
+            themes = sorted({self.phrase_data.theme_of(phrase_id) for phrase_id, _, _ in members})
+            rows.append((group_index, (group["kind"].capitalize(), f"{group['similarity']:.0%}", len(members),
+                                       history_display(members[0][2], 80), history_display(", ".join(themes), 40))))
+        self.duplicates_rows.set_rows(rows)
+
+    def on_duplicates_failed(self, error):
+        self.duplicates_busy = False
+        self.duplicates_backlog = []
+        # The index may be half updated: start over next time
+        self.duplicate_index = None
+        self.duplicates_label.config(text=f"❌ Near-duplicate search failed: {error}")
+
+    def on_duplicate_open(self, event):
+        """Open the next member of the double-clicked group"""
+        from .duplicates import doc_location
+
+        item = self.duplicates_tree.identify_row(event.y)
+        if not item or self.duplicates_report is None:
+            return
+        group_index = self.duplicates_rows.key_for(item)
+        docs = self.duplicates_report["groups"][group_index]["docs"]
+        member = (self.duplicates_cursor.get(group_index, -1) + 1) % len(docs)
+        self.duplicates_cursor[group_index] = member
+        phrase_id, version = doc_location(docs[member])
+        self.notebook.select(self.main_tab)
+        self.jump_to(phrase_id, version)
+        self.status_label.config(text=f"🪞 Near duplicate {member + 1} of {len(docs)}")
+
+    def on_agreement_open(self, event):
+        item = self.agreement_tree.identify_row(event.y)
+        if not item:
+            return
+        phrase_id, alt_num = self.agreement_rows.key_for(item)
+        self.notebook.select(self.main_tab)
+        self.jump_to(phrase_id, alt_num)
+
+    def on_history_select(self, event):
+        """Handle history selection"""
+        selection = self.history_tree.selection()
+        if not selection:
+            return
+        key = self.history_rows.key_for(selection[0])
+        if isinstance(key, tuple):
+            # Theme-wide view: jump to the phrase the row belongs to
+            position, version_text = key
+            if position != self.phrase_index:
+                self.select_phrase(position)
+                self.update_version_combo()
+                self.update_current_phrase_display()
+        else:
+            version_text = key
+        self.current_version = version_text
+        self.version_var.set(version_text)
+        self.update_transcription_field()
+        self.status_label.config(text=f"Selected {version_text}")
+
+    def add_alternative(self):
+        """Add new alternative version"""
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        # Find next available alternative number
+        alternatives = self.current_record().alternative_numbers()
+
+        if len(alternatives) >= MAX_ALTERNATIVES:
+            messagebox.showwarning("Warning", f"Maximum of {MAX_ALTERNATIVES} alternatives allowed")
+            return
+    
+        max_alt = max(alternatives) if alternatives else 0
+        new_alt_num = max_alt + 1
+        if new_alt_num > MAX_ALTERNATIVES:
+            # Only a sparse set imported from Excel gets here; reuse the lowest free slot
+            new_alt_num = min(set(range(1, MAX_ALTERNATIVES + 1)) - set(alternatives))
+        
+        # Add empty alternative
+        try:
+            self.store.record(self.current_phrase_id, new_alt_num, "")
+        except EditConflict as conflict:
+            # Someone else created it first; show theirs instead of blanking it
+            self.poll_shared_store(reschedule=False)
+            self.status_label.config(text=f"⚠️ {conflict}")
+            return
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to persist transcription: {e}")
+            return
+        
+        self.phrase_changed(self.current_phrase_id)
+        self.update_queue_label()
+        self.update_version_combo()
+        new_version = f"Alternative {new_alt_num}"
+        self.version_var.set(new_version)
+        self.current_version = new_version
+        self.update_transcription_field()
+        self.update_history()
+        self.schedule_autosave()
+        self.status_label.config(text=f"Created {new_version}")
+
+    def save_transcription(self):
+        """Save current transcription"""
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        typed = self.transcription_text.get("1.0", tk.END)
+        transcription, problems = check(typed)
+        if not transcription:
+            messagebox.showwarning("Warning", "Transcription cannot be empty")
+            return
+        
+        version = self.current_version_key()
+        old_text = self.current_record().get(version)
+        if not self.write_transcription(self.current_phrase_id, version, transcription):
+            return
+        self.log_edit(self.edit_log.record, self.current_phrase_id, version, old_text, transcription)
+        if transcription != typed.strip():
+            # Show the text as it was saved
+            self.update_transcription_field()
+        if problems:
+            self.status_label.config(text=f"✅ Saved {self.current_version} · ⚠️ {describe(problems)}")
+        else:
+            self.status_label.config(text=f"✅ Saved {self.current_version}")
+        #removed to allow editing unless a new alternative is created or another transcription is selected: 
+        # makes it less likely to mistakenly 
+        # override current trancription with new one with the intention of transcribing a new one
+        # self.transcription_text.delete("1.0", tk.END) 
+        self.update_history()
+        self.update_stats()
+        self.schedule_autosave()
+
+    def write_transcription(self, phrase_id, version, text):
+        """Persist one version's text, asking before overwriting another annotator's change
+
+        Returns whether it was written.
+        """
+        try:
+            try:
+                self.store.record(phrase_id, version, text)
+            except EditConflict as conflict:
+                if not messagebox.askyesno("Edit conflict", f"{conflict}:\n\n{conflict.text}\n\n"
+                                                            "Replace it with your transcription?"):
+                    self.poll_shared_store(reschedule=False)
+                    self.update_transcription_field()
+                    label = "Original" if version == "Original" else f"Alternative {version}"
+                    self.status_label.config(text=f"Kept {conflict.modified_by}'s {label}")
+                    return False
+                self.store.record(phrase_id, version, text, force=True)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to persist transcription: {e}")
+            return False
+
+        self.agreement_dirty = True
+        self.phrase_changed(phrase_id)
+        if self.search_index is not None:
+            self.search_index.update(phrase_id, version, text)
+        else:
+            self.search_backlog.append(phrase_id)
+        return True
+
+    def log_edit(self, step, *args):
+        """Run an edit log step; the transcription itself is already saved if writing the log fails"""
+        try:
+            step(*args)
+        except OSError as e:
+            self.status_label.config(text=f"⚠️ Undo history not saved: {e}")
+            return False
+        return True
+
+    def undo_edit(self, event=None):
+        """Put back the text the last saved transcription replaced"""
+        self.replay_edit(undo=True)
+        return "break"
+
+    def redo_edit(self, event=None):
+        """Save again the transcription the last undo took back"""
+        self.replay_edit(undo=False)
+        return "break"
+
+    def replay_edit(self, undo):
+        if not self.data_loaded or self.current_phrase_id is None:
+            return
+        action = "Undo" if undo else "Redo"
+        entry = self.edit_log.next_undo() if undo else self.edit_log.next_redo()
+        if entry is None:
+            self.status_label.config(text=f"Nothing to {action.lower()}")
+            return
+        phrase_id, version, old_text, new_text = entry
+        text, expected = (old_text, new_text) if undo else (new_text, old_text)
+        label = "Original" if version == "Original" else f"Alternative {version}"
+
+        typed = self.transcription_text.get("1.0", tk.END).strip()
+        if typed != self.current_record().get(self.current_version_key()) and not messagebox.askyesno(
+                action, f"Discard the unsaved text in the box and {action.lower()} the last save?"):
+            return
+        current = self.phrase_data[phrase_id].get(version)
+        if current != expected and not messagebox.askyesno(
+                action, f"{label} has changed since:\n\n{current}\n\n{action} anyway?"):
+            return
+        if not self.write_transcription(phrase_id, version, text):
+            return
+        self.log_edit(self.edit_log.undone if undo else self.edit_log.redone)
+        self.jump_to(phrase_id, version)
+        self.update_stats()
+        self.schedule_autosave()
+        self.status_label.config(text=f"↶ Undid the save of {label}" if undo else f"↷ Redid the save of {label}")
+
+    def poll_shared_store(self, reschedule=True):
+        """Show edits other instances committed to the shared store"""
+        try:
+            changed = self.store.poll()
+        except OSError as e:
+            self.status_label.config(text=f"❌ Could not read the shared store: {e}")
+            changed = []
+        if changed:
+            self.agreement_dirty = True
+            for phrase_id in changed:
+                self.phrase_changed(phrase_id)
+                if self.search_index is not None:
+                    self.search_index.index_phrase(self.phrase_data, phrase_id)
+                else:
+                    self.search_backlog.append(phrase_id)
+            if self.current_phrase_id in changed:
+                # The text box is left alone: the user may be typing in it
+                self.update_version_combo()
+                self.update_history()
+            self.update_stats()
+        if reschedule:
+            self.root.after(SHARED_POLL_MS, self.poll_shared_store)
+
+    def schedule_search(self, event=None):
+        if event is not None and event.keysym in ('Return', 'Up', 'Down', 'Escape'):
+            return
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        """Fill the search box's dropdown with hits for what has been typed"""
+        self.search_job = None
+        query = self.search_var.get().strip()
+        if self.search_index is None:
+            self.search_combo['values'] = []
+            if query:
+                self.status_label.config(text="⏳ Search index is still being built...")
+            return
+        self.search_index.sync(self.phrase_data)
+        self.search_hits = self.search_index.search(query) if query else []
+        values = []
+        for phrase_id, version in self.search_hits:
+            theme, phrase, _ = self.phrase_data.key(phrase_id)
+            if version is None:
+                values.append(f"{theme} › {history_display(phrase, 70)}")
+            else:
+                label = "Original" if version == "Original" else f"Alternative {version}"
+                text = self.phrase_data[phrase_id].get(version)
+                values.append(f"{theme} › {history_display(phrase, 30)} › {label}: {history_display(text, 40)}")
+        self.search_combo['values'] = values
+        if query:
+            self.status_label.config(text=f"🔍 {len(values)} match{'es' if len(values) != 1 else ''}")
+
+    def show_search_results(self, event=None):
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.run_search()
+        if self.search_hits:
+            # Open the dropdown so a hit can be picked with the arrow keys
+            self.search_combo.event_generate('<Down>')
+
+    def jump_to_search_hit(self, event=None):
+        """Select the theme, phrase and version of the chosen search hit"""
+        index = self.search_combo.current()
+        if not 0 <= index < len(self.search_hits) or not self.data_loaded:
+            return
+        self.jump_to(*self.search_hits[index])
+
+    def jump_to(self, phrase_id, version):
+        """Select the theme, phrase and version (None for the Original) of a phrase ID"""
+        theme = self.phrase_data.theme_of(phrase_id)
+        if theme not in self.phrases:
+            self.status_label.config(text=f"⏳ {theme} is still loading")
+            return
+        try:
+            position = self.phrase_data.theme_phrases(theme).index(phrase_id)
+        except ValueError:
+            self.status_label.config(text="That transcription's phrase is not in the question bank")
+            return
+        theme_index = self.themes.index(theme)
+        if theme_index != self.theme_index:
+            self.theme_combo.current(theme_index)
+            self.update_theme()
+        self.select_phrase(position)
+        self.update_version_combo()
+        self.current_version = f"Alternative {version}" if isinstance(version, int) else "Original"
+        self.version_var.set(self.current_version)
+        self.update_current_phrase_display()
+        self.update_history()
+        self.update_transcription_field()
+        self.status_label.config(text=f"Jumped to {theme} › {self.current_version}")
+
+    def toggle_history_scope(self):
+        """Switch the History panel between this phrase and the whole theme"""
+        if self.history_all_var.get():
+            self.history_tree.configure(displaycolumns=('Phrase', 'Version', 'Transcription', 'Length'))
+        else:
+            self.history_tree.configure(displaycolumns=('Version', 'Transcription', 'Length'))
+        self.update_history()
+
+    def phrase_history_rows(self, record, phrase_text="", key_prefix=None):
+        """History rows for the Original and each alternative of one record"""
+        rows = []
+        for alt_num in [None] + record.alternative_numbers():
+            version = "Original" if alt_num is None else f"Alternative {alt_num}"
+            transcription = record.get(alt_num or "Original")
+            key = version if key_prefix is None else (key_prefix, version)
+            rows.append((key, (phrase_text, version, history_display(transcription), len(transcription))))
+        return rows
+
+    def update_history(self):
+        """Update history display, redrawing only rows that changed"""
+        if not self.history_all_var.get():
+            self.history_rows.set_rows(self.phrase_history_rows(self.current_record()))
+            return
+
+        rows, first_rows = self.theme_history_rows(self.themes[self.theme_index])
+        self.history_rows.set_rows(rows, show_index=first_rows[self.phrase_index])
+
+    def theme_history_rows(self, theme):
+        """History rows of every phrase in a theme and the index of each phrase's first row
+
+        Kept for the last few themes until one of their phrases is edited.
+        """
+        built = self.theme_history.get(theme)
+        if built is None:
+            rows = []
+            first_rows = array("l")
+            phrase_data = self.phrase_data
+            for position, phrase_id in enumerate(phrase_data.theme_phrases(theme)):
+                first_rows.append(len(rows))
+                rows.extend(self.phrase_history_rows(phrase_data[phrase_id],
+                                                     history_display(phrase_data.phrase_text[phrase_id]),
+                                                     key_prefix=position))
+            built = (rows, first_rows)
+        remember(self.theme_history, theme, built, THEME_ROWS_SLOTS)
+        return built
+
+    def update_stats(self):
+        """Update statistics display from the running counters"""
+        self.update_queue_label()
+        if self.notebook.select() != str(self.overview_tab):
+            self.stats_dirty = True
+            return
+        self.stats_dirty = False
+
+        self.stats_text.config(state='normal')
+        self.stats_text.delete("1.0", tk.END)
+        stats = format_stats(self.themes, self.phrases, self.store.stats)
+        self.stats_text.insert("1.0", "\n".join(stats))
+        self.stats_text.config(state='disabled')
+        if self.orthography_dirty and self.orthography is not None:
+            self.update_orthography_panel()
+
+    def update_orthography_panel(self):
+        self.orthography_dirty = False
+        lines = format_orthography(self.orthography)
+        self.orthography_label.config(text="   ".join(lines))
+        self.orthography_rows.set_rows([
+            ((phrase_id, version),
+             (self.phrase_data.theme_of(phrase_id), history_display(self.phrase_data.phrase_text[phrase_id], 50),
+              "Original" if version == "Original" else f"Alternative {version}", describe(problems, unnormalized)))
+            for phrase_id, version, problems, unnormalized in self.orthography.rows()])
+
+    def on_orthography_open(self, event):
+        item = self.orthography_tree.identify_row(event.y)
+        if not item:
+            return
+        phrase_id, version = self.orthography_rows.key_for(item)
+        self.notebook.select(self.main_tab)
+        self.jump_to(phrase_id, version)
+
+    def schedule_autosave(self):
+        """Restart the autosave countdown after an edit"""
+        if not self.autosave_delay_ms:
+            return
+        if self.autosave_job is not None:
+            self.root.after_cancel(self.autosave_job)
+        self.autosave_job = self.root.after(self.autosave_delay_ms, self.autosave)
+
+    def autosave(self):
+        self.autosave_job = None
+        self.save_to_excel(quiet=True)
+
+    def save_to_excel(self, quiet=False, combined=None):
+        """Export what changed to Excel on the background worker
+
+        Only the per-theme shards of themes edited since the last save are
+        rewritten, so a save costs what was edited, not the whole corpus.
+        The combined transcriptions.xlsx is rebuilt lazily: on explicit
+        saves (combined defaults to not quiet) and on close, and only if
+        something changed since it was last written.
+        """
+        if not self.data_loaded:
+            self.status_label.config(text="⏳ Still loading, try again shortly")
+            return
+        if self.autosave_job is not None:
+            # This export covers whatever the pending autosave would have written
+            self.root.after_cancel(self.autosave_job)
+            self.autosave_job = None
+        combined = not quiet if combined is None else combined
+        excel_path = self.excel_path
+        try:
+            self.metadata_dir.mkdir(exist_ok=True)
+        except OSError as e:
+            self.on_excel_save_failed(e)
+            return
+
+        shards = self.store.take_dirty_shards()
+        if shards:
+            self.workbook_stale = True
+            # A queued shard job is replaced by this one, so it carries the themes still waiting too
+            self.queued_shards.update(shards)
+            submitted = dict(self.queued_shards)
+            self.worker.submit("shard-export", self.store.write_shards, submitted,
+                               on_done=lambda result: self.on_shards_saved(submitted, result),
+                               on_error=lambda error: self.on_shards_save_failed(submitted, error))
+            self.status_label.config(text=f"⏳ Saving {len(submitted)} changed theme(s)...")
+        if not combined:
+            return
+        if not self.workbook_stale and excel_path.exists():
+            if not shards:
+                self.status_label.config(text=f"✅ {excel_path.name} is already up to date")
+            return
+        self.workbook_stale = False
+        coalesced = self.worker.submit("excel-export", self.store.export_excel, excel_path,
+                                       self.store.snapshot(),
+                                       on_done=lambda result: self.on_excel_saved(result, quiet),
+                                       on_error=self.on_excel_save_failed,
+                                       on_progress=self.show_progress)
+        if coalesced:
+            self.status_label.config(text="⏳ Save already queued, updated with latest changes")
+        else:
+            self.status_label.config(text="⏳ Saving to Excel...")
+
+    def settle_shards(self, submitted):
+        """Forget queued shards a finished job wrote, unless a newer snapshot replaced them"""
+        settled = [theme for theme, rows in submitted.items() if self.queued_shards.get(theme) is rows]
+        for theme in settled:
+            del self.queued_shards[theme]
+        return settled
+
+    def on_shards_saved(self, submitted, result):
+        self.settle_shards(submitted)
+        themes, rows, seconds = result
+        self.flush_times.append((rows, seconds))
+        self.status_label.config(text=f"✅ Saved {themes} theme(s), {rows:,} phrases in {seconds * 1000:.0f} ms")
+
+    def on_shards_save_failed(self, submitted, error):
+        self.store.mark_dirty(self.settle_shards(submitted))
+        self.on_excel_save_failed(error)
+
+    def on_excel_saved(self, result, quiet=False):
+        excel_path, rows, seconds = result
+        self.flush_times.append((rows, seconds))
+        verb = "Autosaved" if quiet else "Saved"
+        self.status_label.config(text=f"✅ {verb} {rows:,} phrases to {excel_path} in {seconds * 1000:.0f} ms")
+        self.update_stats()  # Refresh stats after save
+        if not quiet:
+            messagebox.showinfo("Success", f"Data successfully saved to:\n{excel_path}")
+
+    def on_excel_save_failed(self, error):
+        self.workbook_stale = True
+        error_msg = f"Failed to save Excel file: {error}"
+        self.status_label.config(text=f"❌ {error_msg}")
+        messagebox.showerror("Error", error_msg)
+
+    def export_manifest(self):
+        """Export one row per transcribed version for training pipelines"""
+        if not self.data_loaded:
+            self.status_label.config(text="⏳ Still loading, try again shortly")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Export transcriptions", initialdir=self.metadata_dir, initialfile="transcriptions.jsonl",
+            defaultextension=".jsonl",
+            filetypes=[("JSONL manifest", "*.jsonl"), ("Parquet", "*.parquet"), ("Arrow IPC", "*.arrow")])
+        if not path:
+            return
+        path = Path(path)
+        if not export_format(path):
+            messagebox.showerror("Error", "Export to a .jsonl, .parquet or .arrow file")
+            return
+        self.status_label.config(text=f"⏳ Exporting to {path.name}...")
+        self.worker.submit("export", export_versions, self.phrase_data.copy(), path,
+                           on_done=lambda result: self.on_versions_exported(path, result),
+                           on_error=self.on_export_failed)
+
+    def on_versions_exported(self, path, result):
+        rows, seconds = result
+        self.status_label.config(text=f"✅ Exported {rows:,} versions to {path.name} in {seconds:.1f}s")
+
+    def on_export_failed(self, error):
+        if isinstance(error, ImportError):
+            error = "Parquet and Arrow exports need pyarrow (pip install pyarrow)"
+        self.status_label.config(text=f"❌ Export failed: {error}")
+        messagebox.showerror("Error", f"Export failed: {error}")
+
+
+def main(phrases_path=PHRASES_PATH, metadata_dir=METADATA_DIR, profile=False, undo_memory_bytes=UNDO_MEMORY_BYTES):
+    os.environ["TK_SILENCE_DEPRECATION"] = "1"
+    root = tk.Tk()
+    profiler = Profiler() if profile or profiling_requested() else None
+    app = TranscriptionApp(root, phrases_path=phrases_path, metadata_dir=metadata_dir, profiler=profiler,
+                           undo_memory_bytes=undo_memory_bytes)
+    if profiler:
+        profiler.watch(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
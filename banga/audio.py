@@ -0,0 +1,619 @@
+"""Audio clips linked to phrases: memory-mapped WAV access and waveform peaks
+
+Samples are never read into memory as a whole. WavClip maps the data chunk
+with numpy.memmap, and the waveform overview is drawn from a min/max peak
+pyramid that is computed once per file, block by block, and cached on disk.
+Moving between phrases that point at hour-long recordings therefore only
+loads a few hundred kilobytes of peaks.
+
+normalize_corpus converts recordings to 16 kHz mono 16-bit PCM in a process
+pool. Results live in a content-addressed cache keyed by the source's
+sha256, so unchanged recordings are never converted twice, and the
+waveform is drawn from the converted copy once it exists.
+
+detect_segments proposes speech segments in long session recordings from
+frame energies, which are also computed in streaming blocks.
+"""
+import concurrent.futures
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import wave
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import numpy as np
+
+from .data import CACHE_DIR, atomic_write, file_fingerprint, write_json
+
+PEAKS_CACHE_DIR = CACHE_DIR / "peaks"
+PEAKS_VERSION = 1
+PEAK_BLOCK = 256        # samples per bin at the finest level
+PEAK_FACTOR = 4         # bins merged into one at each coarser level
+PEAK_MIN_BINS = 512     # stop building levels once a level is this small
+READ_BLOCK_FRAMES = PEAK_BLOCK * 4096
+
+NORMALIZED_DIR = CACHE_DIR / "normalized"
+NORMALIZE_VERSION = 1   # bump when the conversion changes, to invalidate old output
+TARGET_RATE = 16000
+LOWPASS_TAPS = 129      # anti-aliasing filter length when downsampling
+
+SEGMENTS_CACHE_DIR = CACHE_DIR / "segments"
+SEGMENTS_VERSION = 1
+VAD_FRAME_SECONDS = 0.02
+VAD_FLOOR_PERCENTILE = 10   # frames this quiet or quieter are taken as the noise floor
+VAD_START_DB = 10.0         # speech starts this far above the floor...
+VAD_STOP_DB = 6.0           # ...and lasts until it drops below this
+VAD_MIN_DBFS = -55.0        # never call anything quieter than this speech
+VAD_MIN_GAP = 0.4           # pauses shorter than this stay inside a segment
+VAD_MIN_SPEECH = 0.3        # shorter bursts are dropped
+VAD_PAD = 0.1               # context kept on both sides of a segment
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavClip:
+    """A WAV file whose samples are memory-mapped rather than loaded"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._parse_header()
+        if self.sample_width == 3:
+            # No 24-bit dtype exists, so map raw bytes and widen block by block
+            dtype, shape = np.uint8, (self.frames, self.channels, 3)
+        else:
+            dtype, shape = self.dtype, (self.frames, self.channels)
+        self.samples = np.memmap(self.path, dtype=dtype, mode="r", offset=self.data_offset, shape=shape)
+
+    def _parse_header(self):
+        try:
+            self._read_header()
+        except struct.error:
+            raise ValueError(f"{self.path.name} has a truncated header") from None
+
+    def _read_header(self):
+        with open(self.path, "rb") as f:
+            riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+            if riff != b"RIFF" or wave != b"WAVE":
+                raise ValueError(f"{self.path.name} is not a RIFF/WAVE file")
+            fmt = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    raise ValueError(f"{self.path.name} has no data chunk")
+                chunk_id, size = struct.unpack("<4sI", header)
+                if chunk_id == b"data":
+                    self.data_offset = f.tell()
+                    declared_size = size
+                    break
+                if chunk_id == b"fmt ":
+                    fmt = f.read(size)
+                else:
+                    f.seek(size, 1)
+                if size % 2:
+                    # Chunks are word aligned
+                    f.seek(1, 1)
+        if fmt is None:
+            raise ValueError(f"{self.path.name} has no fmt chunk")
+
+        format_tag, self.channels, self.sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+        if format_tag == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+            format_tag = struct.unpack("<H", fmt[24:26])[0]
+        self.sample_width = bits // 8
+        if format_tag == WAVE_FORMAT_PCM and self.sample_width in (1, 2, 3, 4):
+            self.dtype = {1: np.uint8, 2: np.dtype("<i2"), 3: None, 4: np.dtype("<i4")}[self.sample_width]
+        elif format_tag == WAVE_FORMAT_IEEE_FLOAT and self.sample_width in (4, 8):
+            self.dtype = np.dtype("<f4") if self.sample_width == 4 else np.dtype("<f8")
+        else:
+            raise ValueError(f"{self.path.name}: unsupported WAV encoding "
+                             f"(format {format_tag:#06x}, {bits} bits)")
+        self.is_float = format_tag == WAVE_FORMAT_IEEE_FLOAT
+
+        # Chunks after the audio (LIST, id3) are not samples, so the declared size bounds the data.
+        # Streaming writers leave it at 0 or 0xFFFFFFFF, and truncated files claim more than
+        # they hold; then the rest of the file is all there is.
+        data_size = self.path.stat().st_size - self.data_offset
+        if 0 < declared_size < 0xFFFFFFFF:
+            data_size = min(declared_size, data_size)
+        self.frames = data_size // block_align
+        if not self.frames:
+            raise ValueError(f"{self.path.name} contains no audio")
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    def read(self, start=0, stop=None):
+        """Frames [start, stop) as float32 in [-1, 1], shaped (frames, channels)"""
+        raw = self.samples[start:stop]
+        if self.sample_width == 3:
+            widened = (raw[..., 0].astype(np.int32) | (raw[..., 1].astype(np.int32) << 8) |
+                       (raw[..., 2].astype(np.int32) << 16))
+            # Sign-extend from 24 bits
+            return ((widened << 8) >> 8).astype(np.float32) / float(1 << 23)
+        if self.is_float:
+            return raw.astype(np.float32)
+        if self.sample_width == 1:
+            return (raw.astype(np.float32) - 128.0) / 128.0
+        return raw.astype(np.float32) / float(1 << (8 * self.sample_width - 1))
+
+    def iter_blocks(self, block_frames=READ_BLOCK_FRAMES):
+        """Yield (start frame, float32 block) pairs covering the whole clip"""
+        for start in range(0, self.frames, block_frames):
+            yield start, self.read(start, min(start + block_frames, self.frames))
+
+    def close(self):
+        mmap = getattr(self.samples, "_mmap", None)
+        self.samples = None
+        if mmap is not None:
+            mmap.close()
+
+
+class WaveformPeaks:
+    """Multi-resolution min/max envelope of a clip, all channels folded together
+
+    Level 0 holds one (min, max) pair per PEAK_BLOCK samples; every further
+    level merges PEAK_FACTOR bins of the previous one.
+    """
+
+    def __init__(self, levels, frames, sample_rate):
+        self.levels = levels
+        self.frames = frames
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self):
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    @classmethod
+    def compute(cls, clip):
+        """Scan the clip once in fixed-size blocks, so memory does not grow with its length"""
+        bins = -(-clip.frames // PEAK_BLOCK)
+        mins = np.zeros(bins, dtype=np.float32)
+        maxs = np.zeros(bins, dtype=np.float32)
+        for start, block in clip.iter_blocks():
+            low = block.min(axis=1)
+            high = block.max(axis=1)
+            edges = np.arange(0, len(low), PEAK_BLOCK)
+            first = start // PEAK_BLOCK
+            mins[first:first + len(edges)] = np.minimum.reduceat(low, edges)
+            maxs[first:first + len(edges)] = np.maximum.reduceat(high, edges)
+
+        levels = [(mins, maxs)]
+        while len(levels[-1][0]) > PEAK_MIN_BINS:
+            low, high = levels[-1]
+            edges = np.arange(0, len(low), PEAK_FACTOR)
+            levels.append((np.minimum.reduceat(low, edges), np.maximum.reduceat(high, edges)))
+        return cls(levels, clip.frames, clip.sample_rate)
+
+    def save(self, path):
+        arrays = {"meta": np.array([PEAKS_VERSION, self.frames, self.sample_rate], dtype=np.int64)}
+        for level, (mins, maxs) in enumerate(self.levels):
+            arrays[f"min{level}"] = mins
+            arrays[f"max{level}"] = maxs
+        path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(path, lambda tmp_path: np.savez(tmp_path, **arrays))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            version, frames, sample_rate = data["meta"].tolist()
+            if version != PEAKS_VERSION:
+                raise ValueError("stale peak cache")
+            levels = []
+            while f"min{len(levels)}" in data:
+                levels.append((data[f"min{len(levels)}"], data[f"max{len(levels)}"]))
+        return cls(levels, frames, sample_rate)
+
+    def overview(self, width):
+        """(mins, maxs) of at most width columns spanning the whole clip"""
+        width = max(1, int(width))
+        # Coarsest level that still has at least one bin per column
+        mins, maxs = self.levels[0]
+        for low, high in self.levels:
+            if len(low) < width:
+                break
+            mins, maxs = low, high
+        if len(mins) <= width:
+            return mins, maxs
+        edges = np.linspace(0, len(mins), width, endpoint=False).astype(np.int64)
+        return np.minimum.reduceat(mins, edges), np.maximum.reduceat(maxs, edges)
+
+
+def derived_cache_path(directory, path, suffix, *params):
+    """Cache file for data derived from path, keyed by its path, size, mtime and params"""
+    stat = path.stat()
+    key = "|".join(map(str, (path.resolve(), stat.st_size, stat.st_mtime_ns) + params))
+    return directory / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}{suffix}"
+
+
+def peaks_cache_path(path):
+    return derived_cache_path(PEAKS_CACHE_DIR, path, ".npz", PEAK_BLOCK, PEAK_FACTOR)
+
+
+def load_peaks(path, normalized_dir=None):
+    """Peaks of a WAV file, computed and cached on first use
+
+    A recording already converted by normalize_corpus is scanned from its
+    16 kHz mono copy: a fraction of the bytes, and the mixdown and the
+    anti-aliasing filter do not show at waveform resolution.
+    """
+    path = NormalizedIndex(normalized_dir or NORMALIZED_DIR).lookup(path) or Path(path)
+    cache_path = peaks_cache_path(path)
+    if cache_path.exists():
+        try:
+            return WaveformPeaks.load(cache_path)
+        except (OSError, ValueError, KeyError):
+            pass
+    clip = WavClip(path)
+    try:
+        peaks = WaveformPeaks.compute(clip)
+    finally:
+        clip.close()
+    try:
+        peaks.save(cache_path)
+    except OSError:
+        # Still usable this session, just recomputed next time
+        pass
+    return peaks
+
+
+def load_peaks_many(paths):
+    """{path: peaks} of each readable file; unreadable ones are left out, to fail when shown"""
+    loaded = {}
+    for path in paths:
+        try:
+            loaded[path] = load_peaks(path)
+        except (OSError, ValueError):
+            continue
+    return loaded
+
+
+def lowpass_taps(cutoff, taps=LOWPASS_TAPS):
+    """Hamming-windowed sinc low-pass; cutoff is a fraction of the input rate"""
+    n = np.arange(taps) - (taps - 1) / 2
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hamming(taps)
+    return (h / h.sum()).astype(np.float32)
+
+
+class StreamResampler:
+    """Resample a mono signal block by block with constant memory
+
+    Downsampling first runs the anti-aliasing filter, carrying its history
+    across blocks; the filtered signal is then linearly interpolated at the
+    output rate. Feeding a clip in any block sizes gives the same output as
+    feeding it whole.
+    """
+
+    def __init__(self, in_rate, out_rate):
+        self.in_rate, self.out_rate = in_rate, out_rate
+        self.step = in_rate / out_rate
+        self.taps = lowpass_taps(0.5 / self.step) if in_rate > out_rate else None
+        if self.taps is not None:
+            self.history = np.zeros(len(self.taps) - 1, dtype=np.float32)
+            # Filter outputs still to drop to undo the filter's group delay
+            self.delay = (len(self.taps) - 1) // 2
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.offset = 0     # input index of pending[0]
+        self.produced = 0   # output samples emitted so far
+        self.consumed = 0   # input samples fed so far
+
+    def _filter(self, block):
+        if self.taps is None:
+            return block
+        padded = np.concatenate([self.history, block])
+        self.history = padded[len(padded) - len(self.history):]
+        filtered = np.convolve(padded, self.taps, mode="valid").astype(np.float32)
+        skip = min(self.delay, len(filtered))
+        self.delay -= skip
+        return filtered[skip:]
+
+    def _interpolate(self, final=False):
+        last = self.offset + len(self.pending) - 1
+        if final:
+            # Stop where the input stops: ceil(consumed / step) samples in total
+            count = -(-self.consumed * self.out_rate // self.in_rate) - self.produced
+        else:
+            count = int(last // self.step) + 1 - self.produced if last >= 0 else 0
+        if count <= 0 or not len(self.pending):
+            return np.zeros(0, dtype=np.float32)
+        positions = (self.produced + np.arange(count)) * self.step - self.offset
+        out = np.interp(positions, np.arange(len(self.pending)), self.pending).astype(np.float32)
+        self.produced += count
+        # Keep only what the next output sample still needs
+        keep_from = max(0, min(int(self.produced * self.step) - self.offset, len(self.pending) - 1))
+        self.pending = self.pending[keep_from:]
+        self.offset += keep_from
+        return out
+
+    def feed(self, block):
+        self.consumed += len(block)
+        self.pending = np.concatenate([self.pending, self._filter(block)])
+        return self._interpolate()
+
+    def flush(self):
+        if self.taps is not None:
+            tail = np.zeros((len(self.taps) - 1) // 2, dtype=np.float32)
+            self.pending = np.concatenate([self.pending, self._filter(tail)])
+        return self._interpolate(final=True)
+
+
+def normalized_path(digest, cache_dir=NORMALIZED_DIR):
+    return Path(cache_dir) / f"v{NORMALIZE_VERSION}-{TARGET_RATE}" / digest[:2] / f"{digest}.wav"
+
+
+def normalize_clip(source, cache_dir=NORMALIZED_DIR, block_frames=READ_BLOCK_FRAMES):
+    """Convert one WAV file to 16 kHz mono 16-bit PCM in the cache
+
+    Runs in a worker process. Only block_frames of input are held at a
+    time, whatever the length of the recording. Returns (fingerprint,
+    output path, seconds of audio, whether a conversion was needed).
+    """
+    source = Path(source)
+    fingerprint = file_fingerprint(source)
+    output = normalized_path(fingerprint["sha256"], cache_dir)
+    if output.exists():
+        # Same bytes already converted, perhaps under another name
+        with wave.open(str(output), "rb") as w:
+            return fingerprint, output, w.getnframes() / TARGET_RATE, False
+
+    clip = WavClip(source)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(tmp_path):
+        resampler = StreamResampler(clip.sample_rate, TARGET_RATE)
+        with wave.open(str(tmp_path), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(TARGET_RATE)
+            for _, block in clip.iter_blocks(block_frames):
+                w.writeframes(to_pcm16(resampler.feed(block.mean(axis=1))))
+            w.writeframes(to_pcm16(resampler.flush()))
+
+    try:
+        atomic_write(output, write)
+        return fingerprint, output, clip.duration, True
+    finally:
+        clip.close()
+
+
+def to_pcm16(samples):
+    return (np.clip(samples, -1.0, 1.0) * 32767).round().astype("<i2").tobytes()
+
+
+class NormalizedIndex:
+    """Maps source paths to the digest of their last seen content
+
+    Lets a rerun skip hashing files whose size and mtime have not changed;
+    the cache itself is addressed by content, not by this index.
+    """
+
+    def __init__(self, cache_dir=NORMALIZED_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.path = self.cache_dir / f"index-v{NORMALIZE_VERSION}-{TARGET_RATE}.json"
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def lookup(self, source):
+        """Cached output for source if it is unchanged since it was converted"""
+        entry = self.entries.get(str(Path(source).resolve()))
+        if entry is None:
+            return None
+        try:
+            stat = Path(source).stat()
+        except OSError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) != (entry["mtime_ns"], entry["size"]):
+            return None
+        output = normalized_path(entry["sha256"], self.cache_dir)
+        return output if output.exists() else None
+
+    def add(self, source, fingerprint):
+        self.entries[str(Path(source).resolve())] = fingerprint
+
+    def save(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        write_json(self.path, self.entries)
+
+
+def normalize_corpus(sources, jobs=None, cache_dir=NORMALIZED_DIR, progress=None):
+    """Normalize every source into the cache, converting only new or changed files
+
+    progress, if given, is called as progress(done, total, source, error)
+    after every file. Returns a summary dict with counts and throughput.
+
+    A worker that dies (killed for memory, or crashed in a decoder) breaks
+    the whole pool. The files it left unfinished are then converted one at
+    a time in a fresh worker, so only the clip that kills it is reported as
+    failed and everything converted so far is kept.
+    """
+    started = time.perf_counter()
+    index = NormalizedIndex(cache_dir)
+    summary = {"clips": 0, "converted": 0, "cached": 0, "failed": 0,
+               "audio_seconds": 0.0, "converted_seconds": 0.0}
+    todo = []
+    for source in dict.fromkeys(Path(source) for source in sources):
+        if index.lookup(source) is not None:
+            summary["cached"] += 1
+        else:
+            todo.append(source)
+    summary["clips"] = summary["cached"] + len(todo)
+    done = summary["cached"]
+
+    def finish(source, result, error):
+        nonlocal done
+        done += 1
+        if error is not None:
+            summary["failed"] += 1
+        else:
+            fingerprint, _, seconds, converted = result
+            index.add(source, fingerprint)
+            summary["audio_seconds"] += seconds
+            if converted:
+                summary["converted"] += 1
+                summary["converted_seconds"] += seconds
+            else:
+                summary["cached"] += 1
+        if progress:
+            progress(done, summary["clips"], source, error)
+
+    jobs = jobs or os.cpu_count() or 1
+    unfinished = []
+    try:
+        with new_pool(max(1, min(jobs, len(todo) or 1))) as pool:
+            futures = {pool.submit(normalize_clip, source, cache_dir): source for source in todo}
+            try:
+                for future in concurrent.futures.as_completed(futures):
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        unfinished.append(futures[future])
+                        continue
+                    except (OSError, ValueError) as e:
+                        finish(futures[future], None, e)
+                        continue
+                    finish(futures[future], result, None)
+            finally:
+                for future in futures:
+                    future.cancel()
+        for source, result, error in convert_one_at_a_time(unfinished, cache_dir):
+            finish(source, result, error)
+    finally:
+        index.save()
+    summary["elapsed"] = time.perf_counter() - started
+    summary["jobs"] = jobs
+    return summary
+
+
+def new_pool(workers):
+    options = {}
+    if sys.version_info >= (3, 11):
+        # Recycling workers returns whatever a large clip made the allocator keep (3.11+ only)
+        options["max_tasks_per_child"] = 64
+    return concurrent.futures.ProcessPoolExecutor(max_workers=workers, **options)
+
+
+def convert_one_at_a_time(sources, cache_dir):
+    """Yield (source, result, error), replacing the single worker whenever one dies"""
+    pool = None
+    try:
+        for source in sources:
+            if pool is None:
+                pool = new_pool(1)
+            try:
+                yield source, pool.submit(normalize_clip, source, cache_dir).result(), None
+            except BrokenProcessPool as e:
+                pool.shutdown()
+                pool = None
+                yield source, None, e
+            except (OSError, ValueError) as e:
+                yield source, None, e
+    finally:
+        if pool is not None:
+            pool.shutdown()
+def frame_energies(clip, frame_seconds=VAD_FRAME_SECONDS, frames_per_block=4096):
+    """Log energy (dBFS) of every frame of the clip's mono mix, read block by block
+
+    Returns the energies and the frame length in seconds. The energies take
+    50 floats per second of audio, so even a day-long recording fits easily.
+    """
+    frame_len = max(1, round(clip.sample_rate * frame_seconds))
+    energies = np.empty(-(-clip.frames // frame_len), dtype=np.float32)
+    for start, block in clip.iter_blocks(frame_len * frames_per_block):
+        mono = block.mean(axis=1)
+        count = len(mono) // frame_len
+        first = start // frame_len
+        power = np.square(mono[:count * frame_len].reshape(count, frame_len)).mean(axis=1)
+        if len(mono) > count * frame_len:
+            # Short final frame
+            power = np.append(power, np.square(mono[count * frame_len:]).mean())
+        energies[first:first + len(power)] = 10 * np.log10(power + 1e-10)
+    return energies, frame_len / clip.sample_rate
+
+
+def detect_segments(energies, frame_seconds, duration=None):
+    """Speech segments as (start, end) seconds, from per-frame energies
+
+    The threshold adapts to the recording's own noise floor. Hysteresis
+    between the start and stop levels is resolved without a Python loop:
+    every frame above the start level switches speech on, every frame below
+    the stop level switches it off, and frames in between carry forward the
+    last switch.
+    """
+    if not len(energies):
+        return []
+    floor = float(np.percentile(energies, VAD_FLOOR_PERCENTILE))
+    start_level = max(floor + VAD_START_DB, VAD_MIN_DBFS)
+    stop_level = start_level - (VAD_START_DB - VAD_STOP_DB)
+
+    switches = np.full(len(energies), -1, dtype=np.int8)
+    switches[energies < stop_level] = 0
+    switches[energies >= start_level] = 1
+    last_switch = np.where(switches >= 0, np.arange(len(switches)), -1)
+    np.maximum.accumulate(last_switch, out=last_switch)
+    active = np.where(last_switch >= 0, switches[last_switch], 0).astype(np.int8)
+
+    edges = np.diff(np.concatenate(([0], active, [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if not len(starts):
+        return []
+
+    # Close short pauses, then drop what is still too short to be speech
+    keep = (starts[1:] - ends[:-1]) * frame_seconds >= VAD_MIN_GAP
+    starts = np.concatenate((starts[:1], starts[1:][keep]))
+    ends = np.concatenate((ends[:-1][keep], ends[-1:]))
+    long_enough = (ends - starts) * frame_seconds >= VAD_MIN_SPEECH
+    starts, ends = starts[long_enough], ends[long_enough]
+
+    if duration is None:
+        duration = len(energies) * frame_seconds
+    begin = np.maximum(starts * frame_seconds - VAD_PAD, 0.0)
+    finish = np.minimum(ends * frame_seconds + VAD_PAD, duration)
+    return [(round(float(a), 3), round(float(b), 3)) for a, b in zip(begin, finish)]
+
+
+def segment_clip(path):
+    """Propose speech segments for a WAV file without caching"""
+    clip = WavClip(path)
+    try:
+        energies, frame_seconds = frame_energies(clip)
+        return detect_segments(energies, frame_seconds, clip.duration)
+    finally:
+        clip.close()
+
+
+def segments_cache_path(path):
+    return derived_cache_path(SEGMENTS_CACHE_DIR, path, ".json", SEGMENTS_VERSION, VAD_FRAME_SECONDS,
+                              VAD_FLOOR_PERCENTILE, VAD_START_DB, VAD_STOP_DB, VAD_MIN_DBFS,
+                              VAD_MIN_GAP, VAD_MIN_SPEECH, VAD_PAD)
+
+
+def load_segments(path, normalized_dir=None):
+    """Speech segments of a WAV file, detected and cached on first use
+
+    Like load_peaks, this reads the normalized copy when there is one;
+    speech energy lies well below its 8 kHz band limit.
+    """
+    path = NormalizedIndex(normalized_dir or NORMALIZED_DIR).lookup(path) or Path(path)
+    cache_path = segments_cache_path(path)
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            return [tuple(segment) for segment in json.load(f)]
+    except (OSError, ValueError):
+        pass
+    segments = segment_clip(path)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(cache_path, segments)
+    except OSError:
+        pass
+    return segments
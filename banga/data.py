@@ -0,0 +1,1156 @@
+"""Data layer of the transcription app: question bank, transcriptions and persistence
+
+Nothing in here imports tkinter, so it can be used headlessly (see
+``python -m banga --help``). pandas and openpyxl are imported inside the
+functions that need them, so importing this module stays cheap and a
+cached question bank never loads them at all.
+"""
+import collections
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from array import array
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PHRASES_PATH = BASE_DIR / "FocusGroup_questions_v1.xlsx"
+METADATA_DIR = BASE_DIR / "metadata"
+EXCEL_PATH = METADATA_DIR / "transcriptions.xlsx"
+CACHE_DIR = BASE_DIR / ".cache"
+PHRASES_CACHE_PATH = CACHE_DIR / "phrases.json"
+PHRASES_CACHE_VERSION = 1
+STORE_COMPACT_MIN_EDITS = 500
+MAX_ALTERNATIVES = 3
+SHARED_STORE_NAME = "transcriptions.sqlite"
+
+
+def atomic_write(path, write):
+    """Write path through a temp file that is fsynced and then renamed into place
+
+    write is called with the temp path. A crash at any point leaves either the
+    old file or the complete new one, never a partially written target.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.stem}.{uuid.uuid4().hex}.tmp{path.suffix}")
+    try:
+        write(tmp_path)
+        with open(tmp_path, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        # Persist the rename itself on POSIX filesystems
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def write_json(path, data):
+    atomic_write(path, lambda tmp_path: tmp_path.write_text(
+        json.dumps(data, ensure_ascii=False), encoding="utf-8"))
+
+
+def file_fingerprint(path, digest=True):
+    """Return the (mtime_ns, size, sha256) fingerprint of a file"""
+    stat = path.stat()
+    sha = None
+    if digest:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        sha = h.hexdigest()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha}
+
+
+def sheet_phrases(df):
+    """Non-blank phrases from the first column of a question sheet"""
+    phrases = [str(row[0]).strip() for row in df.values if str(row[0]).strip()]
+    return phrases or ["Default Phrase"]
+
+
+def read_sheet_names(phrases_path):
+    """List the themes (sheet names) of the question bank without parsing any sheet"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(phrases_path, read_only=True)
+    try:
+        return list(workbook.sheetnames)
+    finally:
+        workbook.close()
+
+
+def parse_phrase_sheets(phrases_path, sheet_names=None):
+    """Parse the given sheets (all when None) in a single pass over the workbook"""
+    import pandas as pd
+
+    # One read_excel call opens the zip and parses the shared strings once for all sheets
+    sheets = pd.read_excel(phrases_path, sheet_name=None if sheet_names is None else list(sheet_names))
+    return {theme: sheet_phrases(df) for theme, df in sheets.items()}
+
+
+def parse_phrase_workbook(phrases_path):
+    """Read every sheet of the question bank in a single pass over the workbook"""
+    phrases = parse_phrase_sheets(phrases_path)
+    return list(phrases.keys()), phrases
+
+
+def read_phrases_cache(phrases_path, cache_path=None):
+    """Return the cached (themes, phrases) if the workbook is unchanged, else None
+
+    The cache is keyed by the workbook's mtime/size and SHA-256. A matching
+    mtime and size is trusted without hashing; if only the mtime moved (e.g. the
+    file was copied or touched) the hash decides whether the cache still holds.
+    """
+    cache_path = cache_path or PHRASES_CACHE_PATH
+    try:
+        with open(cache_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") != PHRASES_CACHE_VERSION or cached.get("source") != str(phrases_path):
+            return None
+        key = cached["key"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+    fingerprint = file_fingerprint(phrases_path, digest=False)
+    if key["mtime_ns"] == fingerprint["mtime_ns"] and key["size"] == fingerprint["size"]:
+        return cached["themes"], cached["phrases"]
+    fingerprint = file_fingerprint(phrases_path)
+    if key["sha256"] != fingerprint["sha256"]:
+        return None
+    write_phrases_cache(phrases_path, cached["themes"], cached["phrases"], fingerprint, cache_path)
+    return cached["themes"], cached["phrases"]
+
+
+def write_phrases_cache(phrases_path, themes, phrases, fingerprint=None, cache_path=None):
+    cache_path = cache_path or PHRASES_CACHE_PATH
+    try:
+        fingerprint = fingerprint or file_fingerprint(phrases_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(cache_path, {"version": PHRASES_CACHE_VERSION, "source": str(phrases_path),
+                                "key": fingerprint, "themes": themes, "phrases": phrases})
+    except OSError:
+        # The cache is only an accelerator; a read-only checkout still works
+        pass
+
+
+def load_phrases_cached(phrases_path, cache_path=None):
+    """Load themes and phrases, reusing the parsed cache when the workbook is unchanged"""
+    cached = read_phrases_cache(phrases_path, cache_path)
+    if cached:
+        return cached
+    fingerprint = file_fingerprint(phrases_path)
+    themes, phrases = parse_phrase_workbook(phrases_path)
+    write_phrases_cache(phrases_path, themes, phrases, fingerprint, cache_path)
+    return themes, phrases
+
+
+DEFAULT_THEMES = ["Default Theme"]
+DEFAULT_PHRASES = {"Default Theme": ["Default Phrase"]}
+
+
+def load_question_bank(phrases_path=PHRASES_PATH):
+    """Return (themes, phrases) from the question bank, or the default theme if it is missing"""
+    if not phrases_path.exists():
+        return list(DEFAULT_THEMES), dict(DEFAULT_PHRASES)
+    return load_phrases_cached(phrases_path)
+
+
+def open_question_bank(phrases_path=PHRASES_PATH, cache_path=None):
+    """Load just enough of the question bank to show the first theme
+
+    Returns (themes, phrases, remaining): every theme name, the phrases
+    parsed so far and the themes still to be parsed with
+    finish_question_bank. An unchanged workbook is served whole from the
+    cache, leaving nothing remaining.
+    """
+    if not phrases_path.exists():
+        return list(DEFAULT_THEMES), dict(DEFAULT_PHRASES), []
+    cached = read_phrases_cache(phrases_path, cache_path)
+    if cached:
+        themes, phrases = cached
+        return themes, phrases, []
+    themes = read_sheet_names(phrases_path)
+    phrases = parse_phrase_sheets(phrases_path, themes[:1])
+    return themes, phrases, themes[1:]
+
+
+def finish_question_bank(phrases_path, themes, phrases, remaining, cache_path=None):
+    """Parse the themes open_question_bank left out and refresh the cache
+
+    Returns the newly parsed {theme: phrases}; phrases is not modified so the
+    caller can merge the result on its own thread.
+    """
+    fingerprint = file_fingerprint(phrases_path)
+    parsed = parse_phrase_sheets(phrases_path, remaining)
+    write_phrases_cache(phrases_path, themes, {**phrases, **parsed}, fingerprint, cache_path)
+    return parsed
+
+
+def resolve_metadata_schema(columns):
+    """Resolve the transcription columns of a metadata sheet once per file
+
+    Returns the Original column name (or None) and a list of
+    (alternative number, column name) pairs in sheet order.
+    """
+    original_col = "Original_Transcription" if "Original_Transcription" in columns else None
+    alt_cols = []
+    for col in columns:
+        name = str(col)
+        if name.startswith("Alternative_") and name.endswith("_Transcription"):
+            alt_num = name.split("_")[1]
+            if alt_num.isdigit() and 1 <= int(alt_num) <= MAX_ALTERNATIVES:
+                alt_cols.append((int(alt_num), col))
+    return original_col, alt_cols
+
+
+def _nonempty_cells(column):
+    """Yield (row position, text) for the filled cells of a metadata column"""
+    values = column.astype(str)
+    mask = ((values != "") & (values != "nan")).to_numpy()
+    return zip(mask.nonzero()[0].tolist(), values[mask].tolist())
+
+
+def merge_metadata_frame(df, phrase_data):
+    """Merge a transcriptions sheet into a PhraseIndex using column-wise operations
+
+    Rows repeating a Theme/Phrase pair map to successive occurrences of that
+    phrase, matching how duplicate questions are exported.
+    """
+    df = df.fillna("")
+    themes = df["Theme"].astype(str).str.strip()
+    phrases = df["Phrase"].astype(str).str.strip()
+    occurrences = df.groupby([themes, phrases], sort=False).cumcount().tolist()
+    ids = [phrase_data.lookup(theme, phrase, occurrence)
+           for theme, phrase, occurrence in zip(themes.tolist(), phrases.tolist(), occurrences)]
+
+    original_col, alt_cols = resolve_metadata_schema(df.columns)
+    if original_col is not None:
+        for pos, transcription in _nonempty_cells(df[original_col]):
+            phrase_data.edit(ids[pos]).original = transcription
+    for alt_num, trans_col in alt_cols:
+        for pos, transcription in _nonempty_cells(df[trans_col]):
+            phrase_data.edit(ids[pos]).set(alt_num, transcription)
+    return phrase_data
+
+
+def merge_metadata_frame_iterrows(df, phrase_data):
+    """Row-by-row reference implementation of merge_metadata_frame
+
+    This is the original loader, kept to check the vectorized path against.
+    Only its phrase_data accesses are ported to PhraseIndex: a repeated
+    Theme/Phrase row still lands on the first occurrence, as it always did,
+    and a filled Alternative column past MAX_ALTERNATIVES raises ValueError.
+    """
+    df = df.fillna("")
+    for _, row in df.iterrows():
+        theme = str(row["Theme"]).strip()
+        phrase = str(row["Phrase"]).strip()
+        phrase_id = phrase_data.lookup(theme, phrase)
+
+        # Load Original transcription
+        if "Original_Transcription" in df.columns:
+            original_trans = str(row.get("Original_Transcription", ""))
+            if original_trans and original_trans != "nan":
+                phrase_data.edit(phrase_id).original = original_trans
+
+        # Load alternative transcriptions
+        alt_phrase_cols = [col for col in df.columns if col.startswith("Alternative_") and col.endswith("_Transcription")]
+        for trans_col in alt_phrase_cols:
+            alt_num = int(trans_col.split("_")[1])
+            transcription = str(row.get(trans_col, ""))
+            if transcription and transcription != "nan":
+                phrase_data.edit(phrase_id).set(alt_num, transcription)
+    return phrase_data
+
+
+def phrase_data_to_frame(rows):
+    """Build the transcriptions.xlsx sheet layout from PhraseIndex.snapshot() rows"""
+    all_data = []
+    max_alternatives = 0
+
+    # Find maximum number of alternatives
+    for _, _, alternatives in rows:
+        if alternatives:
+            max_alternatives = min(3, max(max_alternatives, max(alternatives.keys())))
+
+    for (theme, phrase, _), original, alternatives in sorted(rows, key=lambda row: row[0]):
+        row_data = {
+            "Theme": theme,
+            "Phrase": phrase,
+            "Original_Transcription": original
+        }
+
+        # Add alternative transcriptions
+        for alt_num in range(1, max_alternatives + 1):
+            row_data[f"Alternative_{alt_num}_Transcription"] = alternatives.get(alt_num, "")
+
+        all_data.append(row_data)
+
+    import pandas as pd
+
+    df = pd.DataFrame(all_data, columns=["Theme", "Phrase", "Original_Transcription"] +
+                      [f"Alternative_{alt_num}_Transcription" for alt_num in range(1, max_alternatives + 1)])
+    return df
+
+
+def audio_ref(path, span=None):
+    """Reference to store for an audio file: relative to the app folder when inside it
+
+    span, a (start, end) pair in seconds, narrows the reference to part of
+    the recording and is written as a media fragment: ``clip.wav#t=1.250,3.500``.
+    """
+    path = Path(path).resolve()
+    try:
+        ref = path.relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        ref = str(path)
+    if span is not None:
+        ref += f"#t={span[0]:.3f},{span[1]:.3f}"
+    return ref
+
+
+def parse_audio_ref(ref):
+    """Split an audio reference into its file path and its (start, end) span or None"""
+    ref, _, fragment = ref.partition("#t=")
+    span = None
+    if fragment:
+        start, _, end = fragment.partition(",")
+        span = (float(start), float(end))
+    path = Path(ref)
+    return (path if path.is_absolute() else BASE_DIR / path), span
+
+
+def resolve_audio_path(ref):
+    return parse_audio_ref(ref)[0]
+
+
+def referenced_audio(phrase_data):
+    """Every distinct audio file linked to any phrase version, in phrase order"""
+    paths = {}
+    for record in phrase_data.records:
+        if record is not None and record.audio:
+            for ref in record.audio.values():
+                paths.setdefault(resolve_audio_path(ref), None)
+    return list(paths)
+
+
+def iter_metadata_rows(excel_path):
+    """Stream (theme, phrase, occurrence, {version: text}) rows from a transcriptions workbook
+
+    Uses openpyxl's read-only mode so rows are parsed one at a time instead
+    of materialising the whole sheet. Cell handling matches
+    merge_metadata_frame: empty cells and the literal "nan" are skipped.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(excel_path, read_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = ["" if name is None else str(name) for name in header]
+        theme_col = header.index("Theme")
+        phrase_col = header.index("Phrase")
+        original_col, alt_cols = resolve_metadata_schema(header)
+        versions = [(header.index(original_col), "Original")] if original_col else []
+        versions += [(header.index(col), alt_num) for alt_num, col in alt_cols]
+
+        seen = collections.Counter()
+        for row in rows:
+            theme = "" if row[theme_col] is None else str(row[theme_col]).strip()
+            phrase = "" if row[phrase_col] is None else str(row[phrase_col]).strip()
+            occurrence = seen[(theme, phrase)]
+            seen[(theme, phrase)] += 1
+            texts = {}
+            for col, version in versions:
+                value = row[col] if col < len(row) else None
+                if value is not None and str(value) and str(value) != "nan":
+                    texts[version] = str(value)
+            yield theme, phrase, occurrence, texts
+    finally:
+        workbook.close()
+
+
+def write_metadata_xlsx(excel_path, rows, max_alternatives):
+    """Atomically write the transcriptions.xlsx layout one row at a time
+
+    rows yields (theme, phrase, original, {alt_num: text}). openpyxl's
+    write-only mode streams each row to disk, so memory stays flat however
+    many rows are written. Returns the number of rows written.
+    """
+    from openpyxl import Workbook
+
+    written = 0
+
+    def write(tmp_path):
+        nonlocal written
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Sheet1")
+        sheet.append(["Theme", "Phrase", "Original_Transcription"] +
+                     [f"Alternative_{alt_num}_Transcription" for alt_num in range(1, max_alternatives + 1)])
+        for theme, phrase, original, alternatives in rows:
+            sheet.append([theme, phrase, original] +
+                         [alternatives.get(alt_num, "") for alt_num in range(1, max_alternatives + 1)])
+            written += 1
+        workbook.save(tmp_path)
+
+    atomic_write(excel_path, write)
+    return written
+
+
+def shard_path(directory, theme):
+    """Workbook holding one theme's transcriptions in a store directory"""
+    slug = re.sub(r"[^\w-]+", "_", theme).strip("_")[:60] or "theme"
+    digest = hashlib.sha256(theme.encode("utf-8")).hexdigest()[:8]
+    return Path(directory) / "themes" / f"{slug}-{digest}.xlsx"
+
+
+def write_theme_shards(directory, shards):
+    """Write one workbook per theme from {theme: snapshot rows}
+
+    Returns (themes written, rows written, seconds taken).
+    """
+    start = time.perf_counter()
+    written = 0
+    for theme, rows in shards.items():
+        max_alternatives = max((max(alternatives, default=0) for _, _, alternatives in rows), default=0)
+        path = shard_path(directory, theme)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written += write_metadata_xlsx(path, ((theme, phrase, original, alternatives)
+                                              for (_, phrase, _), original, alternatives in rows),
+                                       max_alternatives)
+    return len(shards), written, time.perf_counter() - start
+
+
+def merge_base_path(directory, workbook):
+    """Where the base for three-way merges of a workbook is kept in a store directory"""
+    workbook = Path(workbook).resolve()
+    digest = hashlib.sha256(str(workbook).encode("utf-8")).hexdigest()[:12]
+    return Path(directory) / "merge-bases" / f"{workbook.stem}-{digest}.json"
+
+
+def read_merge_base(path):
+    """Return (workbook fingerprint, {(theme, phrase, occurrence, version): text})
+
+    The fingerprint is None when no base was recorded yet.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None, {}
+    return data["fingerprint"], {(theme, phrase, occurrence, version): text
+                                 for theme, phrase, occurrence, version, text in data["texts"]}
+
+
+def write_merge_base(path, workbook, texts):
+    """Record texts as what workbook holds now, the base of its next merge"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, {"fingerprint": file_fingerprint(Path(workbook), digest=False),
+                      "texts": [[*key, text] for key, text in texts.items()]})
+
+
+def snapshot_texts(rows):
+    """Non-empty texts of snapshot rows, keyed like a merge base"""
+    texts = {}
+    for (theme, phrase, occurrence), original, alternatives in rows:
+        if original:
+            texts[(theme, phrase, occurrence, "Original")] = original
+        for alt_num, text in alternatives.items():
+            if text:
+                texts[(theme, phrase, occurrence, alt_num)] = text
+    return texts
+
+
+class PhraseRecord:
+    """Transcriptions of one phrase: the Original plus fixed alternative slots
+
+    An alternative slot is None until the alternative is created and "" while
+    it exists but has not been transcribed yet. audio stays None until a clip
+    is linked, then maps versions to audio references (see audio_ref).
+    """
+
+    ALT_SLOTS = tuple(f"alt{alt_num}" for alt_num in range(1, MAX_ALTERNATIVES + 1))
+    __slots__ = ("original", "audio") + ALT_SLOTS
+
+    def __init__(self):
+        self.original = ""
+        self.audio = None
+        for slot in self.ALT_SLOTS:
+            setattr(self, slot, None)
+
+    def get(self, version):
+        """Text of "Original" or an alternative number, "" when unset"""
+        if version == "Original":
+            return self.original
+        return getattr(self, self.ALT_SLOTS[int(version) - 1]) or ""
+
+    def set(self, version, text):
+        if version == "Original":
+            self.original = text
+        elif 1 <= int(version) <= MAX_ALTERNATIVES:
+            setattr(self, self.ALT_SLOTS[int(version) - 1], text)
+        else:
+            raise ValueError(f"Alternative {version} is out of range (max {MAX_ALTERNATIVES})")
+
+    def alternative_numbers(self):
+        return [alt_num for alt_num, slot in enumerate(self.ALT_SLOTS, 1)
+                if getattr(self, slot) is not None]
+
+    def alternatives(self):
+        return {alt_num: getattr(self, self.ALT_SLOTS[alt_num - 1])
+                for alt_num in self.alternative_numbers()}
+
+    def audio_for(self, version):
+        """Audio reference linked to a version, falling back to the Original's clip"""
+        if not self.audio:
+            return None
+        return self.audio.get(version) or self.audio.get("Original")
+
+    def set_audio(self, version, ref):
+        if ref is None:
+            if self.audio:
+                self.audio.pop(version, None)
+            return
+        if self.audio is None:
+            self.audio = {}
+        self.audio[version] = ref
+
+    def is_empty(self):
+        return not self.original and not self.alternative_numbers() and not self.audio
+
+    def copy(self):
+        record = PhraseRecord.__new__(PhraseRecord)
+        for slot in self.__slots__:
+            setattr(record, slot, getattr(self, slot))
+        if self.audio:
+            record.audio = dict(self.audio)
+        return record
+
+
+# Returned for phrases nobody has touched yet; never mutate it, use PhraseIndex.edit
+EMPTY_RECORD = PhraseRecord()
+
+
+class PhraseIndex:
+    """Stable integer IDs for every phrase, backed by flat per-ID arrays
+
+    IDs are handed out in question-bank order. Each theme keeps the IDs of
+    its phrases in display order, so the phrase at a combobox position is a
+    single array lookup. A phrase text repeated inside a theme gets one ID
+    per occurrence; the occurrence number is what keeps duplicates apart on
+    disk. Phrases found only in saved transcriptions are indexed too, but
+    are not listed under their theme until the question bank lists them, so
+    transcriptions can be loaded before (or without) their theme's sheet.
+    """
+
+    def __init__(self):
+        self.themes = []                     # theme id -> theme name
+        self.theme_ids = {}                  # theme name -> theme id
+        self.theme_phrase_ids = []           # theme id -> phrase ids in display order
+        self.text_ids = []                   # theme id -> {phrase text: [phrase ids]}
+        self.phrase_theme = array("l")       # phrase id -> theme id
+        self.phrase_occurrence = array("l")  # phrase id -> repeat number of its text in the theme
+        self.phrase_text = []                # phrase id -> phrase text
+        self.records = []                    # phrase id -> PhraseRecord, None until first edited
+
+    @classmethod
+    def build(cls, themes, phrases):
+        """Index the themes in order, listing the phrases of those already parsed"""
+        index = cls()
+        for theme in themes:
+            index.add_theme(theme)
+            if theme in phrases:
+                index.list_theme(theme, phrases[theme])
+        return index
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, phrase_id):
+        """Read-only view of a record; untouched phrases share EMPTY_RECORD"""
+        return self.records[phrase_id] or EMPTY_RECORD
+
+    def edit(self, phrase_id):
+        """Return the record of a phrase for writing, creating it on first use"""
+        record = self.records[phrase_id]
+        if record is None:
+            record = self.records[phrase_id] = PhraseRecord()
+        return record
+
+    def add_theme(self, theme):
+        if theme not in self.theme_ids:
+            self.theme_ids[theme] = len(self.themes)
+            self.themes.append(theme)
+            self.theme_phrase_ids.append(array("l"))
+            self.text_ids.append({})
+        return self.theme_ids[theme]
+
+    def add_phrase(self, theme, phrase):
+        """Index one more occurrence of a phrase without listing it"""
+        theme_id = self.add_theme(theme)
+        same_text = self.text_ids[theme_id].setdefault(phrase, [])
+        phrase_id = len(self.records)
+        self.phrase_theme.append(theme_id)
+        self.phrase_occurrence.append(len(same_text))
+        self.phrase_text.append(phrase)
+        self.records.append(None)
+        same_text.append(phrase_id)
+        return phrase_id
+
+    def list_theme(self, theme, phrases):
+        """List a theme's question-bank phrases, reusing IDs already indexed for them"""
+        theme_id = self.add_theme(theme)
+        listed = self.theme_phrase_ids[theme_id] = array("l")
+        seen = collections.Counter()
+        for phrase in phrases:
+            listed.append(self.lookup(theme, phrase, seen[phrase]))
+            seen[phrase] += 1
+        return listed
+
+    def is_listed(self, theme):
+        theme_id = self.theme_ids.get(theme)
+        return theme_id is not None and len(self.theme_phrase_ids[theme_id]) > 0
+
+    def lookup(self, theme, phrase, occurrence=0, create=True):
+        """Return the ID of a phrase, indexing it (unlisted) if it is new"""
+        theme_id = self.theme_ids.get(theme)
+        same_text = self.text_ids[theme_id].get(phrase, ()) if theme_id is not None else ()
+        if occurrence < len(same_text):
+            return same_text[occurrence]
+        if not create:
+            return None
+        phrase_id = None
+        for _ in range(occurrence + 1 - len(same_text)):
+            phrase_id = self.add_phrase(theme, phrase)
+        return phrase_id
+
+    def theme_phrases(self, theme):
+        """IDs of a theme's listed phrases in display order"""
+        return self.theme_phrase_ids[self.theme_ids[theme]]
+
+    def phrase_id(self, theme, position):
+        return self.theme_phrases(theme)[position]
+
+    def key(self, phrase_id):
+        """Return (theme, phrase, occurrence) for a phrase ID"""
+        return (self.themes[self.phrase_theme[phrase_id]], self.phrase_text[phrase_id],
+                self.phrase_occurrence[phrase_id])
+
+    def theme_of(self, phrase_id):
+        return self.themes[self.phrase_theme[phrase_id]]
+
+    def copy(self):
+        """An independent copy, safe to hand to another thread while this one keeps changing"""
+        index = PhraseIndex()
+        index.themes = list(self.themes)
+        index.theme_ids = dict(self.theme_ids)
+        index.theme_phrase_ids = [array("l", listed) for listed in self.theme_phrase_ids]
+        index.text_ids = [{phrase: list(ids) for phrase, ids in same_text.items()} for same_text in self.text_ids]
+        index.phrase_theme = array("l", self.phrase_theme)
+        index.phrase_occurrence = array("l", self.phrase_occurrence)
+        index.phrase_text = list(self.phrase_text)
+        index.records = [record and record.copy() for record in self.records]
+        return index
+
+    def theme_snapshot(self, theme):
+        """snapshot() rows of one theme's phrases, listed or not, in key order"""
+        same_text = self.text_ids[self.theme_ids[theme]]
+        return [((theme, phrase, occurrence), record.original, record.alternatives()) if record else
+                ((theme, phrase, occurrence), "", {})
+                for phrase in sorted(same_text)
+                for occurrence, record in enumerate(self.records[phrase_id] for phrase_id in same_text[phrase])]
+
+    def snapshot(self):
+        """Return plain (key, original, alternatives) rows, safe to hand to another thread"""
+        return [(self.key(phrase_id), record.original, record.alternatives()) if record else
+                (self.key(phrase_id), "", {})
+                for phrase_id, record in enumerate(self.records)]
+
+
+class TranscriptionStats:
+    """Running transcription counters, kept per theme and updated on every edit
+
+    Counts only change by the difference between the old and new text of a
+    single version, so keeping them current costs O(1) per edit.
+    """
+
+    def __init__(self):
+        self.by_theme = collections.defaultdict(collections.Counter)
+        self.totals = collections.Counter()
+
+    def rebuild(self, phrase_data):
+        """Recount everything from scratch (only needed after a bulk load)"""
+        self.by_theme.clear()
+        self.totals.clear()
+        for phrase_id, record in enumerate(phrase_data.records):
+            if record is None:
+                continue
+            theme = phrase_data.theme_of(phrase_id)
+            self.update(theme, "Original", "", record.original)
+            for alt_trans in record.alternatives().values():
+                self.update(theme, "alternative", "", alt_trans)
+
+    def update(self, theme, version, old_text, new_text):
+        """Account for one version of a phrase changing from old_text to new_text"""
+        field = "originals" if version == "Original" else "alternatives"
+        filled = bool(new_text) - bool(old_text)
+        chars = len(new_text) - len(old_text)
+        for counts in (self.by_theme[theme], self.totals):
+            counts[field] += filled
+            counts["chars"] += chars
+
+    def theme_counts(self, theme):
+        return self.by_theme.get(theme, collections.Counter())
+
+
+def ends_mid_line(path):
+    """Whether a file ends in a line an interrupted append left without its newline"""
+    try:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+    except OSError:
+        # Missing or empty
+        return False
+
+
+class TranscriptionStore:
+    """Append-only journal of transcription edits on top of a compacted snapshot
+
+    Each edit is a single appended JSON line, so persisting it costs the same
+    however large the corpus is. When the journal grows past the snapshot it
+    is folded into a fresh snapshot and truncated. The Excel workbooks are
+    only exports: one per theme (themes/), rewritten only for themes edited
+    since they were last written, and transcriptions.xlsx combining them.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.snapshot_path = self.directory / "transcriptions.snapshot.json"
+        self.journal_path = self.directory / "transcriptions.journal.jsonl"
+        self.phrase_data = PhraseIndex()
+        self.stats = TranscriptionStats()
+        self.journal_entries = 0
+        self.dirty_themes = set()  # themes edited since their shard was last taken for writing
+        self._journal = None
+
+    def exists(self):
+        """Whether anything has been persisted to this store yet"""
+        return self.snapshot_path.exists() or self.journal_path.exists()
+
+    def load(self, phrase_data):
+        """Replay the snapshot and then the journal into a PhraseIndex"""
+        self.phrase_data = phrase_data
+        self.dirty_themes = set()
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            self.dirty_themes.update(snapshot.get("dirty_themes", ()))
+            for theme, phrase, occurrence, original, alternatives, *audio in snapshot["records"]:
+                record = phrase_data.edit(phrase_data.lookup(theme, phrase, occurrence))
+                record.original = original
+                for alt_num, text in alternatives:
+                    record.set(alt_num, text)
+                for version, ref in (audio[0] if audio else ()):
+                    record.set_audio(version, ref)
+
+        self.journal_entries = 0
+        if self.journal_path.exists():
+            with open(self.journal_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn final line from an interrupted append
+                        continue
+                    phrase_id = phrase_data.lookup(entry["theme"], entry["phrase"], entry.get("occurrence", 0))
+                    if "audio" in entry:
+                        phrase_data.edit(phrase_id).set_audio(entry["version"], entry["audio"])
+                    else:
+                        self._apply(phrase_id, entry["version"], entry["text"])
+                    self.journal_entries += 1
+        self.dirty_themes |= self.missing_shards()
+        self.stats.rebuild(phrase_data)
+        return phrase_data
+
+    def missing_shards(self):
+        """Themes with transcriptions but no shard written yet"""
+        themes = {self.phrase_data.theme_of(phrase_id)
+                  for phrase_id, record in enumerate(self.phrase_data.records) if record is not None}
+        return {theme for theme in themes if not shard_path(self.directory, theme).exists()}
+
+    def take_dirty_shards(self):
+        """Snapshot rows of each theme edited since the last call, by theme
+
+        The themes stop counting as edited; hand them to mark_dirty if
+        writing the shards fails.
+        """
+        shards = {theme: self.phrase_data.theme_snapshot(theme) for theme in self.dirty_themes}
+        self.dirty_themes = set()
+        return shards
+
+    def mark_dirty(self, themes):
+        self.dirty_themes.update(themes)
+
+    def write_shards(self, shards):
+        """Write shards from take_dirty_shards; safe to call off the Tk thread"""
+        return write_theme_shards(self.directory, shards)
+
+    def record(self, phrase_id, version, text, force=False):
+        """Persist one edit; version is "Original" or an alternative number
+
+        force only matters to SharedStore: a private journal has no other
+        writer to conflict with.
+        """
+        self._apply(phrase_id, version, text)
+        self._append(phrase_id, {"version": version, "text": text})
+
+    def record_many(self, changes):
+        """Persist (phrase_id, version, text) edits in bulk with one compaction
+
+        Returns the edits skipped because another writer changed the version
+        first; a private journal has none, SharedStore may.
+        """
+        for phrase_id, version, text in changes:
+            self._apply(phrase_id, version, text)
+        return self.compact()
+
+    def link_audio(self, phrase_id, version, ref):
+        """Persist linking an audio reference to one version (None unlinks it)"""
+        self.phrase_data.edit(phrase_id).set_audio(version, ref)
+        self._append(phrase_id, {"version": version, "audio": ref})
+
+    def _append(self, phrase_id, change):
+        if self._journal is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            torn = ends_mid_line(self.journal_path)
+            self._journal = open(self.journal_path, "a", encoding="utf-8")
+            if torn:
+                # End the torn line first, or this edit would be appended to it and lost with it
+                self._journal.write("\n")
+        theme, phrase, occurrence = self.phrase_data.key(phrase_id)
+        entry = {"theme": theme, "phrase": phrase, **change}
+        if occurrence:
+            entry["occurrence"] = occurrence
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+        self.journal_entries += 1
+
+        # Compacting once the journal outgrows the corpus keeps edits amortised O(1)
+        if self.journal_entries >= max(STORE_COMPACT_MIN_EDITS, len(self.phrase_data)):
+            self.compact()
+
+    def compact(self):
+        """Fold the journal into a new snapshot and truncate it
+
+        Returns the versions left unwritten because another writer got there
+        first, which for a private journal is none (see SharedStore.compact).
+        """
+        records = []
+        for phrase_id, record in enumerate(self.phrase_data.records):
+            if record is not None and not record.is_empty():
+                theme, phrase, occurrence = self.phrase_data.key(phrase_id)
+                row = [theme, phrase, occurrence, record.original, sorted(record.alternatives().items())]
+                if record.audio:
+                    row.append(list(record.audio.items()))
+                records.append(row)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Edits folded in here leave the journal, so their unwritten shards must be remembered
+        write_json(self.snapshot_path, {"records": records, "dirty_themes": sorted(self.dirty_themes)})
+
+        # The snapshot already holds every journalled edit, so replaying a
+        # journal that survives a crash here is harmless
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        open(self.journal_path, "w", encoding="utf-8").close()
+        self.journal_entries = 0
+        return []
+
+    def snapshot(self):
+        """Copy the store contents so they can be exported off the Tk thread"""
+        return self.phrase_data.snapshot()
+
+    def export_excel(self, excel_path, rows=None, progress=None):
+        """Atomically write the store contents (or a snapshot) as transcriptions.xlsx
+
+        Returns (excel_path, rows written, seconds taken) so callers can keep
+        an eye on how flush cost grows with the corpus.
+        """
+        start = time.perf_counter()
+        rows = self.snapshot() if rows is None else rows
+        if progress:
+            progress(f"Building sheet of {len(rows):,} phrases...")
+        df = phrase_data_to_frame(rows)
+        if progress:
+            progress(f"Writing {len(df):,} rows to {excel_path.name}...")
+        atomic_write(excel_path, lambda tmp_path: df.to_excel(tmp_path, index=False))
+        write_merge_base(merge_base_path(self.directory, excel_path), excel_path, snapshot_texts(rows))
+        return excel_path, len(df), time.perf_counter() - start
+
+    def merge_rows(self, rows, overwrite=True):
+        """Apply (theme, phrase, occurrence, {version: text}) rows in bulk
+
+        Bulk imports skip the per-edit journal and are persisted with one
+        compaction at the end. With overwrite=False only versions that are
+        empty here are filled in; differing texts are counted as conflicts.
+        So are versions another instance of a shared store changed while
+        this one was merging: those are never overwritten.
+        Returns a Counter of rows, filled, overwritten, unchanged and conflicts.
+        """
+        counts = collections.Counter()
+        changes = []
+        outcomes = {}
+        for theme, phrase, occurrence, texts in rows:
+            counts["rows"] += 1
+            phrase_id = self.phrase_data.lookup(theme, phrase, occurrence)
+            current = self.phrase_data[phrase_id]
+            for version, text in texts.items():
+                old_text = current.get(version)
+                if old_text == text:
+                    counts["unchanged"] += 1
+                    continue
+                if old_text and not overwrite:
+                    counts["conflicts"] += 1
+                    continue
+                outcomes[(phrase_id, version)] = "overwritten" if old_text else "filled"
+                changes.append((phrase_id, version, text))
+        for conflict in self.record_many(changes):
+            outcomes[(conflict.phrase_id, conflict.version)] = "conflicts"
+        counts.update(outcomes.values())
+        return counts
+
+    def merge_three_way(self, rows, base):
+        """Merge another copy of the corpus against base, the copy both sides started from
+
+        rows are (theme, phrase, occurrence, {version: text}) as from
+        iter_metadata_rows; base maps (theme, phrase, occurrence, version)
+        to text. A version only they changed is taken, one only changed
+        here is kept, and one changed differently on both sides is kept as
+        it is here and reported as a conflict. Without a base text, theirs
+        only fills versions that are empty here. Versions missing from
+        rows are left alone, so a workbook never deletes transcriptions.
+        A version another instance of a shared store changed meanwhile is
+        a conflict too, with that instance's text as ours.
+
+        Returns (counts, conflicts, theirs): a Counter of rows, filled,
+        overwritten, kept, unchanged and conflicts; (key, ours, theirs,
+        base) for each conflict; and the texts read from rows, keyed like
+        base, to record as the base for the next merge.
+        """
+        counts = collections.Counter()
+        changes = []
+        outcomes = {}
+        conflicts = []
+        theirs = {}
+        for theme, phrase, occurrence, texts in rows:
+            counts["rows"] += 1
+            phrase_id = self.phrase_data.lookup(theme, phrase, occurrence)
+            current = self.phrase_data[phrase_id]
+            for version, text in texts.items():
+                key = (theme, phrase, occurrence, version)
+                theirs[key] = text
+                ours = current.get(version)
+                base_text = base.get(key)
+                if ours == text:
+                    counts["unchanged"] += 1
+                elif base_text is not None and text == base_text:
+                    counts["kept"] += 1
+                elif not ours or ours == base_text:
+                    outcomes[(phrase_id, version)] = "overwritten" if ours else "filled"
+                    changes.append((phrase_id, version, text))
+                else:
+                    counts["conflicts"] += 1
+                    conflicts.append((key, ours, text, base_text))
+        for conflict in self.record_many(changes):
+            outcomes[(conflict.phrase_id, conflict.version)] = "conflicts"
+            key = (*self.phrase_data.key(conflict.phrase_id), conflict.version)
+            conflicts.append((key, conflict.text, theirs[key], base.get(key)))
+        counts.update(outcomes.values())
+        return counts, conflicts, theirs
+
+    def export_xlsx_streaming(self, excel_path):
+        """Write transcriptions.xlsx straight from the records without building a DataFrame"""
+        phrase_data = self.phrase_data
+        max_alternatives = max((max(record.alternative_numbers(), default=0)
+                                for record in phrase_data.records if record is not None), default=0)
+        order = sorted(range(len(phrase_data)), key=phrase_data.key)
+
+        def rows():
+            for phrase_id in order:
+                theme, phrase, _ = phrase_data.key(phrase_id)
+                record = phrase_data[phrase_id]
+                yield theme, phrase, record.original, record.alternatives()
+
+        written = write_metadata_xlsx(excel_path, rows(), max_alternatives)
+        write_merge_base(merge_base_path(self.directory, excel_path), excel_path, snapshot_texts(self.snapshot()))
+        return written
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _apply(self, phrase_id, version, text):
+        record = self.phrase_data.edit(phrase_id)
+        old_text = record.get(version)
+        record.set(version, text)
+        theme = self.phrase_data.theme_of(phrase_id)
+        self.stats.update(theme, version, old_text, text)
+        self.dirty_themes.add(theme)
+
+
+def workbook_texts(workbook):
+    """Non-empty texts of a workbook, keyed like a merge base"""
+    return {(theme, phrase, occurrence, version): text
+            for theme, phrase, occurrence, texts in iter_metadata_rows(workbook)
+            for version, text in texts.items()}
+
+
+def open_store(directory):
+    """The store kept in directory: the shared SQLite one once created, else the journal"""
+    if (Path(directory) / SHARED_STORE_NAME).exists():
+        from .shared import SharedStore
+
+        return SharedStore(directory)
+    return TranscriptionStore(directory)
+
+
+def incoming_workbooks(directory):
+    """Other annotators' workbooks dropped into the store's incoming/ folder"""
+    return sorted(path for path in (Path(directory) / "incoming").glob("*.xlsx")
+                  if not path.name.startswith("~$"))
+
+
+def merge_workbook(store, workbook, seen_before=True):
+    """Three-way merge a workbook into the store if it changed since its last merge or export
+
+    The base is what the workbook held when it was last merged or written
+    by an export, so only edits made to it since then are brought in.
+    Conflicts are appended to merge-conflicts.jsonl in the store directory.
+    Returns (counts, conflicts) as from merge_three_way, or None when the
+    workbook has not changed. A workbook with no recorded base and
+    seen_before set is taken to be the store's own earlier export, and
+    only has its base recorded.
+    """
+    base_path = merge_base_path(store.directory, workbook)
+    fingerprint, base = read_merge_base(base_path)
+    if fingerprint == file_fingerprint(workbook, digest=False):
+        return None
+    if fingerprint is None and seen_before:
+        write_merge_base(base_path, workbook, workbook_texts(workbook))
+        return None
+    counts, conflicts, theirs = store.merge_three_way(iter_metadata_rows(workbook), base)
+    if conflicts:
+        with open(store.directory / "merge-conflicts.jsonl", "a", encoding="utf-8") as f:
+            for (theme, phrase, occurrence, version), ours, text, base_text in conflicts:
+                f.write(json.dumps({"workbook": str(workbook), "theme": theme, "phrase": phrase,
+                                    "occurrence": occurrence, "version": version, "ours": ours,
+                                    "theirs": text, "base": base_text, "at": time.time()},
+                                   ensure_ascii=False) + "\n")
+    write_merge_base(base_path, workbook, theirs)
+    return counts, conflicts
+
+
+def merge_workbooks(store, excel_path, warn):
+    """Bring in edits made to the store's workbook or dropped into incoming/ since last seen"""
+    workbooks = [(excel_path, True)] if excel_path.exists() else []
+    workbooks += [(path, False) for path in incoming_workbooks(store.directory)]
+    for workbook, seen_before in workbooks:
+        try:
+            merged = merge_workbook(store, workbook, seen_before)
+        except Exception as e:
+            warn(f"Error merging {workbook.name}: {e}")
+            continue
+        if merged and merged[0]["conflicts"]:
+            warn(f"{merged[0]['conflicts']:,} versions in {workbook.name} conflict with edits in the store; "
+                 f"kept the store's and listed theirs in merge-conflicts.jsonl")
+
+
+def load_transcriptions(store, phrase_data, excel_path=EXCEL_PATH, warn=None, read_only=False):
+    """Fill phrase_data from the store, seeding the store from Excel on first use
+
+    On later loads, edits made to the workbook outside the app and
+    workbooks in the store's incoming/ folder are three-way merged in (see
+    merge_workbook). With read_only nothing is written: a store not seeded
+    yet is filled from Excel in memory only, and no workbook is merged.
+    Problems are reported through warn(message) rather than raised, so a
+    damaged file never stops the rest of the corpus from loading.
+    """
+    warn = warn or (lambda message: None)
+    if store.exists():
+        try:
+            store.load(phrase_data)
+        except Exception as e:
+            warn(f"Error loading transcription store: {e}")
+            return phrase_data
+        if not read_only:
+            merge_workbooks(store, excel_path, warn)
+        return phrase_data
+
+    if excel_path.exists():
+        try:
+            import pandas as pd
+
+            merge_metadata_frame(pd.read_excel(excel_path), phrase_data)
+        except Exception as e:
+            warn(f"Error loading existing data: {e}")
+    store.load(phrase_data)
+    if read_only:
+        return phrase_data
+    try:
+        store.compact()
+        if excel_path.exists():
+            # Everything in the workbook is in phrase_data now: it is the base of later merges
+            write_merge_base(merge_base_path(store.directory, excel_path), excel_path,
+                             snapshot_texts(phrase_data.snapshot()))
+    except OSError as e:
+        warn(f"Error creating transcription store: {e}")
+    return phrase_data
+
+
+def format_stats(themes, phrases, stats):
+    """Render the Overview statistics as a list of lines"""
+    lines = []
+    lines.append("TRANSCRIPTION STATISTICS\n" + "="*30 + "\n")
+
+    counts = stats.totals
+    total_themes = len(themes)
+    total_phrases = sum(len(phrases.get(theme, ())) for theme in themes)
+    total_originals = counts["originals"]
+    total_alternatives = counts["alternatives"]
+    total_chars = counts["chars"]
+    total_transcriptions = total_originals + total_alternatives
+
+    lines.append(f"Total Themes: {total_themes}")
+    lines.append(f"Total Phrases: {total_phrases}")
+    lines.append(f"Original Transcriptions: {total_originals}")
+    lines.append(f"Alternative Transcriptions: {total_alternatives}")
+    lines.append(f"Total Transcriptions: {total_transcriptions}")
+    lines.append(f"Total Characters: {total_chars:,}")
+
+    if total_transcriptions > 0:
+        lines.append(f"Average Length: {total_chars // total_transcriptions} characters")
+
+    completion_rate = (total_originals / total_phrases * 100) if total_phrases > 0 else 0
+    lines.append(f"Original Completion Rate: {completion_rate:.1f}%")
+
+    lines.append("\n" + "BY THEME" + "\n" + "-"*20)
+    for theme in themes:
+        theme_counts = stats.theme_counts(theme)
+        lines.append(f"{theme}: {theme_counts['originals']}/{len(phrases.get(theme, ()))} original, "
+                     f"{theme_counts['alternatives']} alternatives")
+    return lines
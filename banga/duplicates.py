@@ -0,0 +1,342 @@
+"""Near-duplicate question phrases and transcriptions (MinHash with LSH banding)
+
+Texts are folded as for search (see search.fold) and cut into character
+4-grams. Each distinct text gets a MinHash signature of NUM_PERM 31-bit
+hashes. Signatures are computed in one vectorized pass for a whole batch
+and cached under .cache by the folded text's digest. The signature is split
+into BANDS bands of ROWS hashes, and texts sharing any band land in the same
+bucket. Only texts sharing a bucket are compared, by exact Jaccard
+similarity of their 4-gram sets. Two texts at similarity s share a bucket
+with probability 1 - (1 - s^ROWS)^BANDS: about 0.98 at s = 0.7, 0.64 at
+s = 0.5 and 0.05 at s = 0.3.
+
+Phrases are compared with phrases and transcriptions with transcriptions.
+Each distinct text is indexed once with the documents holding it, so a
+reply repeated a thousand times costs one signature and no pairs. Edits
+re-signature only the text that changed.
+"""
+import collections
+import hashlib
+import itertools
+import zipfile
+import zlib
+
+import numpy as np
+
+from .data import CACHE_DIR, MAX_ALTERNATIVES, atomic_write
+from .search import FIELDS_PER_PHRASE, ORIGINAL_FIELD, PHRASE_FIELD, field_version, fold
+
+SHINGLE = 4
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+PRIME = (1 << 31) - 1
+SIMILARITY = 0.6          # texts at least this similar (Jaccard of their 4-grams) are reported
+MAX_BUCKET_PAIRS = 64     # members of one bucket compared pairwise; the rest only to its first member
+ESTIMATE_SLACK = 0.15     # pairs whose signatures agree on less than threshold - this are not compared
+PREFILTER_BUCKET = 4      # buckets this large prefilter their pairs by signature agreement
+SIGNATURE_CACHE_PATH = CACHE_DIR / f"minhash-v1-{NUM_PERM}.npz"
+
+_params = np.random.default_rng(20240611).integers(1, PRIME, size=(2, NUM_PERM), dtype=np.int64)
+PERM_A, PERM_B = _params[0], _params[1]
+
+
+def doc_kind(doc):
+    return "phrase" if doc % FIELDS_PER_PHRASE == PHRASE_FIELD else "transcription"
+
+
+def doc_location(doc):
+    """(phrase_id, version) of a document; version is None for the question text"""
+    return doc // FIELDS_PER_PHRASE, field_version(doc % FIELDS_PER_PHRASE)
+
+
+def shingles(folded):
+    padded = f" {folded} "
+    if len(padded) <= SHINGLE:
+        return {padded}
+    return {padded[i:i + SHINGLE] for i in range(len(padded) - SHINGLE + 1)}
+
+
+def shingle_hashes(folded):
+    return [zlib.crc32(gram.encode("utf-8")) & PRIME for gram in shingles(folded)]
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def minhash(folded_texts):
+    """Signatures of many folded texts at once: a (len, NUM_PERM) uint32 array
+
+    Every shingle of every text is hashed by each permutation in one
+    vector operation, and each text's minimum taken with reduceat.
+    """
+    hashes = [shingle_hashes(folded) for folded in folded_texts]
+    signatures = np.empty((len(hashes), NUM_PERM), dtype=np.uint32)
+    if not hashes:
+        return signatures
+    lengths = np.fromiter(map(len, hashes), dtype=np.int64, count=len(hashes))
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    flat = np.fromiter(itertools.chain.from_iterable(hashes), dtype=np.int64, count=int(lengths.sum()))
+    for perm in range(NUM_PERM):
+        # Both factors stay below 2**31, so the product fits in int64
+        permuted = (flat * PERM_A[perm] + PERM_B[perm]) % PRIME
+        signatures[:, perm] = np.minimum.reduceat(permuted, starts)
+    return signatures
+
+
+def text_digest(folded):
+    return hashlib.blake2b(folded.encode("utf-8"), digest_size=12).hexdigest()
+
+
+class SignatureCache:
+    """Folded-text digest -> MinHash signature, saved under .cache between runs"""
+
+    def __init__(self, path=SIGNATURE_CACHE_PATH):
+        self.path = path
+        self.dirty = False
+        self.signatures = {}
+        try:
+            with np.load(path) as saved:
+                self.signatures = dict(zip(saved["digests"].tolist(), saved["signatures"]))
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            pass
+
+    def prune(self, keep):
+        """Forget texts no longer in the corpus, so the cache tracks it"""
+        stale = self.signatures.keys() - keep
+        for digest in stale:
+            del self.signatures[digest]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        if not self.dirty:
+            return
+        digests = list(self.signatures)
+        signatures = (np.array([self.signatures[digest] for digest in digests], dtype=np.uint32)
+                      if digests else np.empty((0, NUM_PERM), dtype=np.uint32))
+
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                np.savez(f, digests=np.array(digests, dtype=str), signatures=signatures)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.path, write)
+        self.dirty = False
+
+
+class DuplicateIndex:
+    """LSH buckets over the distinct folded texts of every phrase and version
+
+    Documents are numbered as in SearchIndex. A text key is (kind, folded
+    text); docs_of maps it to the documents holding it.
+    """
+
+    def __init__(self, cache=None):
+        self.cache = cache if cache is not None else SignatureCache()
+        self.text_of = {}                               # document -> folded text
+        self.docs_of = {}                               # text key -> set of documents
+        self.signatures = {}                            # text key -> signature
+        self.buckets = collections.defaultdict(set)     # (kind, band, band bytes) -> text keys
+        self.phrase_count = 0
+
+    @classmethod
+    def build(cls, phrase_data, cache=None):
+        index = cls(cache)
+        index.sync(phrase_data)
+        index.cache.prune({text_digest(folded) for _, folded in index.docs_of})
+        try:
+            index.cache.save()
+        except OSError:
+            # Only costs recomputing the signatures next time
+            pass
+        return index
+
+    def __len__(self):
+        return len(self.text_of)
+
+    def sync(self, phrase_data):
+        """Index phrases added to phrase_data since the last sync"""
+        end = len(phrase_data)
+        self.set_texts(item for phrase_id in range(self.phrase_count, end)
+                       for item in self.phrase_texts(phrase_data, phrase_id))
+        self.phrase_count = end
+
+    def phrase_texts(self, phrase_data, phrase_id):
+        record = phrase_data[phrase_id]
+        base = phrase_id * FIELDS_PER_PHRASE
+        yield base + PHRASE_FIELD, phrase_data.phrase_text[phrase_id]
+        yield base + ORIGINAL_FIELD, record.original
+        for alt_num in range(1, MAX_ALTERNATIVES + 1):
+            yield base + ORIGINAL_FIELD + alt_num, record.get(alt_num) or ""
+
+    def index_phrase(self, phrase_data, phrase_id):
+        """(Re)index the question text and every version of one phrase"""
+        self.set_texts(self.phrase_texts(phrase_data, phrase_id))
+
+    def update(self, phrase_id, version, text):
+        """Reindex one version after an edit; version is "Original" or an alternative number"""
+        field = ORIGINAL_FIELD if version == "Original" else ORIGINAL_FIELD + version
+        self.set_texts([(phrase_id * FIELDS_PER_PHRASE + field, text)])
+
+    def set_texts(self, items):
+        """Index (document, text) pairs, signing all new distinct texts in one batch"""
+        new_keys = {}
+        for doc, text in items:
+            folded = fold(text) if text else ""
+            old = self.text_of.get(doc)
+            if folded == (old or ""):
+                continue
+            kind = doc_kind(doc)
+            if old:
+                self._remove(doc, (kind, old))
+            if not folded:
+                continue
+            self.text_of[doc] = folded
+            key = (kind, folded)
+            docs = self.docs_of.setdefault(key, set())
+            docs.add(doc)
+            if len(docs) == 1 and key not in new_keys:
+                new_keys[key] = text_digest(folded)
+
+        missing = {digest: folded for (_, folded), digest in new_keys.items()
+                   if digest not in self.cache.signatures}
+        if missing:
+            digests = list(missing)
+            self.cache.signatures.update(zip(digests, minhash([missing[digest] for digest in digests])))
+            self.cache.dirty = True
+        for key, digest in new_keys.items():
+            if key in self.docs_of:
+                signature = self.cache.signatures[digest]
+                self.signatures[key] = signature
+                for bucket in self._bucket_keys(key[0], signature):
+                    self.buckets[bucket].add(key)
+
+    def _remove(self, doc, key):
+        del self.text_of[doc]
+        docs = self.docs_of[key]
+        docs.discard(doc)
+        if docs:
+            return
+        del self.docs_of[key]
+        for bucket in self._bucket_keys(key[0], self.signatures.pop(key)):
+            members = self.buckets[bucket]
+            members.discard(key)
+            if not members:
+                del self.buckets[bucket]
+
+    def _bucket_pairs(self, members, estimate):
+        """Pairs of a bucket's text keys worth comparing
+
+        A huge bucket is one family of texts: past MAX_BUCKET_PAIRS members
+        each is only paired with the first, keeping this linear. In larger
+        buckets, pairs whose signatures agree on fewer than `estimate` of
+        their hashes (the MinHash estimate of their similarity) are dropped
+        in one vectorized step.
+        """
+        head, rest = members[:MAX_BUCKET_PAIRS], members[MAX_BUCKET_PAIRS:]
+        if len(head) < PREFILTER_BUCKET:
+            yield from itertools.combinations(head, 2)
+        else:
+            signatures = np.array([self.signatures[key] for key in head])
+            agreement = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+            for i, j in zip(*np.nonzero(np.triu(agreement >= estimate, 1))):
+                yield head[i], head[j]
+        if rest:
+            first = self.signatures[members[0]]
+            agreement = (np.array([self.signatures[key] for key in rest]) == first).mean(axis=1)
+            for i in np.flatnonzero(agreement >= estimate):
+                yield members[0], rest[i]
+
+    @staticmethod
+    def _bucket_keys(kind, signature):
+        return [(kind, band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+    def find(self, threshold=SIMILARITY):
+        """Groups of near-duplicate documents, largest first
+
+        Returns a dict with how many documents and distinct texts there are,
+        how many candidate pairs had to be compared, and "groups": each a dict of kind, docs (sorted),
+        texts and similarity. similarity is the lowest verified similarity
+        that joined the group (1.0 when it is one text repeated). Groups whose
+        documents all belong to one phrase are left out: an alternative close
+        to its own Original is expected.
+        """
+        parent = {}
+
+        def root(key):
+            while parent.get(key, key) != key:
+                parent[key] = parent.get(parent[key], parent[key])
+                key = parent[key]
+            return key
+
+        weakest = {}
+        shingle_sets = {}
+        rejected = set()
+        compared = 0
+        for members in self.buckets.values():
+            if len(members) < 2:
+                continue
+            members = sorted(members)
+            for a, b in self._bucket_pairs(members, threshold - ESTIMATE_SLACK):
+                # Texts already grouped need no comparison; grouping only needs connectivity
+                root_a, root_b = root(a), root(b)
+                if root_a == root_b or (a, b) in rejected:
+                    continue
+                for key in (a, b):
+                    if key not in shingle_sets:
+                        shingle_sets[key] = shingles(key[1])
+                compared += 1
+                similarity = jaccard(shingle_sets[a], shingle_sets[b])
+                if similarity < threshold:
+                    rejected.add((a, b))
+                    continue
+                parent.setdefault(a, a)
+                parent[root_b] = root_a
+                weakest[root_a] = min(similarity, weakest.get(root_a, 1.0), weakest.pop(root_b, 1.0))
+
+        members = collections.defaultdict(list)
+        for key in parent:
+            members[root(key)].append(key)
+        for key, docs in self.docs_of.items():
+            if len(docs) > 1 and key not in parent:
+                members[key].append(key)
+
+        groups = []
+        for group_root, keys in members.items():
+            docs = sorted(doc for key in keys for doc in self.docs_of[key])
+            if len({doc // FIELDS_PER_PHRASE for doc in docs}) < 2:
+                continue
+            groups.append({"kind": keys[0][0], "similarity": weakest.get(group_root, 1.0), "docs": docs,
+                           "texts": sorted(folded for _, folded in keys)})
+        groups.sort(key=lambda group: (-len(group["docs"]), -group["similarity"]))
+        return {"documents": len(self.text_of), "distinct": len(self.docs_of), "compared": compared,
+                "threshold": threshold, "groups": groups}
+
+
+def find_duplicates(index, phrase_data, threshold=SIMILARITY):
+    """(index, report): builds the index on first use, then only indexes phrases added since"""
+    if index is None:
+        index = DuplicateIndex.build(phrase_data)
+    else:
+        index.sync(phrase_data)
+    return index, index.find(threshold)
+
+
+def group_members(group, phrase_data):
+    """(phrase_id, version, text) of each document in a group, text as written"""
+    members = []
+    for doc in group["docs"]:
+        phrase_id, version = doc_location(doc)
+        text = phrase_data.phrase_text[phrase_id] if version is None else phrase_data[phrase_id].get(version)
+        members.append((phrase_id, version, text))
+    return members
+
+
+def format_duplicates(report):
+    """Render a near-duplicate report's totals as a list of lines"""
+    by_kind = collections.Counter(group["kind"] for group in report["groups"])
+    return [f"Near-duplicate groups: {len(report['groups']):,} "
+            f"({by_kind['phrase']:,} of phrases, {by_kind['transcription']:,} of transcriptions)",
+            f"Texts: {report['documents']:,} ({report['distinct']:,} distinct), "
+            f"{report['compared']:,} candidate pairs compared at ≥{report['threshold']:.0%} similarity"]
@@ -0,0 +1,166 @@
+"""Streaming exports for training pipelines: JSONL manifests, Parquet and Arrow
+
+Every exporter walks phrase_data once and writes one row per non-empty
+version (Original or alternative). Rows are never collected into a list:
+the JSONL writer emits each line as it goes, and the columnar writers
+buffer at most chunk_rows rows before handing them to pyarrow as one
+record batch. Memory therefore depends on the chunk size, not on the
+corpus.
+
+pyarrow is only needed for Parquet and Arrow, and is imported when one of
+those is written.
+"""
+import json
+import time
+from pathlib import Path
+
+from .data import atomic_write, parse_audio_ref
+
+CHUNK_ROWS = 50000
+FORMATS = {".jsonl": "jsonl", ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+COLUMNS = ("theme", "phrase", "occurrence", "version", "text", "audio_filepath", "offset", "duration")
+
+
+def export_format(path):
+    """Export format implied by a file name, or None if it is not one of ours"""
+    return FORMATS.get(Path(path).suffix.lower())
+
+
+def clip_duration(path, durations):
+    """Length of a WAV file in seconds (memoized in durations), None if unknown"""
+    if path not in durations:
+        try:
+            from .audio import WavClip
+            clip = WavClip(path)
+        except (ImportError, OSError, ValueError):
+            durations[path] = None
+        else:
+            durations[path] = round(clip.duration, 3)
+            clip.close()
+    return durations[path]
+
+
+def version_rows(phrase_data):
+    """Yield one row per transcribed version, in COLUMNS order
+
+    Versions linked to a segment of a recording carry its offset and
+    duration; versions linked to a whole file carry offset 0 and the file's
+    duration. Untranscribed versions are skipped.
+    """
+    durations = {}
+    for phrase_id in range(len(phrase_data)):
+        record = phrase_data.records[phrase_id]
+        if record is None:
+            continue
+        theme, phrase, occurrence = phrase_data.key(phrase_id)
+        for version in ["Original"] + record.alternative_numbers():
+            text = record.get(version)
+            if not text:
+                continue
+            audio_path = offset = duration = None
+            ref = record.audio_for(version)
+            if ref is not None:
+                path, span = parse_audio_ref(ref)
+                audio_path = str(path)
+                if span is not None:
+                    offset, duration = span[0], round(span[1] - span[0], 3)
+                else:
+                    offset, duration = 0.0, clip_duration(path, durations)
+            yield (theme, phrase, occurrence, "Original" if version == "Original" else f"Alternative {version}",
+                   text, audio_path, offset, duration)
+
+
+def write_jsonl(path, rows):
+    """Write an ASR-style manifest, one JSON object per line; returns rows written"""
+    written = 0
+
+    def write(tmp_path):
+        nonlocal written
+        with open(tmp_path, "w", encoding="utf-8", newline="\n") as f:
+            for row in rows:
+                entry = {column: value for column, value in zip(COLUMNS, row) if value is not None}
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                written += 1
+
+    atomic_write(path, write)
+    return written
+
+
+def arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("theme", pa.string()), ("phrase", pa.string()), ("occurrence", pa.int32()),
+        ("version", pa.string()), ("text", pa.string()), ("audio_filepath", pa.string()),
+        ("offset", pa.float64()), ("duration", pa.float64()),
+    ])
+
+
+def iter_batches(rows, chunk_rows):
+    """Group rows into pyarrow record batches of at most chunk_rows rows"""
+    import pyarrow as pa
+
+    schema = arrow_schema()
+    columns = [[] for _ in COLUMNS]
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+        if len(columns[0]) >= chunk_rows:
+            yield pa.RecordBatch.from_arrays([pa.array(column, type=field.type)
+                                              for column, field in zip(columns, schema)], schema=schema)
+            columns = [[] for _ in COLUMNS]
+    if columns[0]:
+        yield pa.RecordBatch.from_arrays([pa.array(column, type=field.type)
+                                          for column, field in zip(columns, schema)], schema=schema)
+
+
+def write_parquet(path, rows, chunk_rows=CHUNK_ROWS):
+    """Write rows as Parquet, one row group per chunk; returns rows written"""
+    import pyarrow.parquet as pq
+
+    written = 0
+
+    def write(tmp_path):
+        nonlocal written
+        with pq.ParquetWriter(tmp_path, arrow_schema(), compression="zstd") as writer:
+            for batch in iter_batches(rows, chunk_rows):
+                writer.write_batch(batch)
+                written += batch.num_rows
+
+    atomic_write(path, write)
+    return written
+
+
+def write_arrow(path, rows, chunk_rows=CHUNK_ROWS):
+    """Write rows as an Arrow IPC (Feather v2) file; returns rows written"""
+    import pyarrow as pa
+
+    written = 0
+
+    def write(tmp_path):
+        nonlocal written
+        with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, arrow_schema()) as writer:
+            for batch in iter_batches(rows, chunk_rows):
+                writer.write_batch(batch)
+                written += batch.num_rows
+
+    atomic_write(path, write)
+    return written
+
+
+WRITERS = {"jsonl": write_jsonl, "parquet": write_parquet, "arrow": write_arrow}
+
+
+def export_versions(phrase_data, path, fmt=None, chunk_rows=CHUNK_ROWS):
+    """Export every transcribed version to path; returns (rows written, seconds taken)"""
+    start = time.perf_counter()
+    fmt = fmt or export_format(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"unknown export format for {Path(path).name}; use one of {', '.join(FORMATS)}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "jsonl":
+        written = write_jsonl(path, version_rows(phrase_data))
+    else:
+        written = WRITERS[fmt](path, version_rows(phrase_data), chunk_rows)
+    return written, time.perf_counter() - start
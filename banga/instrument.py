@@ -0,0 +1,192 @@
+"""Opt-in latency instrumentation: per-operation histograms and a Tk stall log
+
+Profiling is switched on with ``python -m banga --profile`` or
+BANGA_PROFILE=1. When it is off nothing is wrapped, so it costs nothing.
+When it is on, each timed call costs two perf_counter() reads and one
+bucket increment.
+
+Latencies go into log-scaled histograms: eight buckets per doubling from
+1 µs up. Percentiles are therefore accurate to within one bucket (about
+9%), and a histogram stays a fixed-size list however many calls it sees.
+A heartbeat scheduled on the Tk event loop measures how late it fires.
+Lateness over the stall threshold is logged together with the slowest
+call made on the Tk thread since the previous beat, which is usually the
+culprit.
+"""
+import collections
+import functools
+import logging
+import math
+import os
+import threading
+import time
+
+from .data import CACHE_DIR, write_json
+
+BUCKETS_PER_OCTAVE = 8
+MIN_SECONDS = 1e-6
+BUCKET_COUNT = BUCKETS_PER_OCTAVE * 28  # 1 µs up to about 4.5 minutes
+STALL_MS = 100
+HEARTBEAT_MS = 50
+STALL_LOG_SIZE = 200
+PROFILE_DIR = CACHE_DIR / "profiles"  # where the app leaves a profile on exit
+
+log = logging.getLogger(__name__)
+
+
+def profiling_requested():
+    return os.environ.get("BANGA_PROFILE", "") not in ("", "0")
+
+
+def profile_path():
+    return PROFILE_DIR / f"profile-{time.strftime('%Y%m%d-%H%M%S')}.json"
+
+
+def bucket_bound(bucket):
+    """Upper edge of a bucket, in seconds"""
+    return MIN_SECONDS * 2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE)
+
+
+class LatencyHistogram:
+    """Call count, total, maximum and log-bucketed distribution of one operation's latency"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds <= MIN_SECONDS:
+            bucket = 0
+        else:
+            bucket = min(BUCKET_COUNT - 1, int(math.log2(seconds / MIN_SECONDS) * BUCKETS_PER_OCTAVE))
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """Latency below which a share q (0-1) of the calls fell, in seconds"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bucket_bound(bucket), self.max)
+        return self.max
+
+    def summary(self):
+        return {"count": self.count, "total_ms": round(self.total * 1000, 3),
+                "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+                "p50_ms": round(self.percentile(0.50) * 1000, 3), "p95_ms": round(self.percentile(0.95) * 1000, 3),
+                "p99_ms": round(self.percentile(0.99) * 1000, 3), "max_ms": round(self.max * 1000, 3),
+                # Sparse bucket counts, so runs can be merged or replotted offline
+                "buckets": {bucket: count for bucket, count in enumerate(self.counts) if count}}
+
+
+class Profiler:
+    """Latency histograms by operation name, plus the event-loop stall log
+
+    Safe to record from the Tk thread and the worker at once.
+    """
+
+    def __init__(self, stall_ms=STALL_MS):
+        self.stall_ms = stall_ms
+        self.histograms = collections.defaultdict(LatencyHistogram)
+        self.stalls = collections.deque(maxlen=STALL_LOG_SIZE)
+        self.started = time.time()
+        self.tk_thread = None
+        self._slowest = (None, 0.0)  # slowest Tk-thread call since the last heartbeat
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.histograms[name].record(seconds)
+            if seconds > self._slowest[1] and threading.get_ident() == self.tk_thread:
+                self._slowest = (name, seconds)
+
+    def wrap(self, name, func):
+        """func, timed under name"""
+        perf_counter = time.perf_counter
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, perf_counter() - start)
+        return timed
+
+    def instrument(self, obj, prefix, names=None, skip=()):
+        """Time obj's public methods (or just names) as prefix.method
+
+        The wrappers are set on the instance, so widgets must be bound to
+        the methods after this runs for their callbacks to be timed.
+        """
+        if names is None:
+            names = [name for name in dir(type(obj))
+                     if not name.startswith("_") and name not in skip and callable(getattr(type(obj), name))]
+        for name in names:
+            setattr(obj, name, self.wrap(f"{prefix}.{name}", getattr(obj, name)))
+        return obj
+
+    def watch(self, root, interval_ms=HEARTBEAT_MS):
+        """Measure how late a heartbeat on root's event loop fires, logging stalls"""
+        self.tk_thread = threading.get_ident()
+        interval = interval_ms / 1000
+        expected = time.perf_counter() + interval
+
+        def beat():
+            nonlocal expected
+            now = time.perf_counter()
+            late = max(0.0, now - expected)
+            self.record("tk.heartbeat_lag", late)
+            if late * 1000 >= self.stall_ms:
+                self.note_stall(late)
+            with self._lock:
+                self._slowest = (None, 0.0)
+            expected = now + interval
+            root.after(interval_ms, beat)
+
+        root.after(interval_ms, beat)
+
+    def note_stall(self, seconds):
+        name, slowest = self._slowest
+        self.stalls.append({"at": time.time(), "ms": round(seconds * 1000, 1), "slowest_call": name,
+                            "slowest_call_ms": round(slowest * 1000, 1) if name else None})
+        if name:
+            log.warning("Tk event loop stalled %.0f ms; slowest call: %s (%.0f ms)", seconds * 1000, name,
+                        slowest * 1000)
+        else:
+            log.warning("Tk event loop stalled %.0f ms", seconds * 1000)
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.stalls.clear()
+            self.started = time.time()
+
+    def operations(self):
+        """(name, histogram) pairs, largest total time first"""
+        with self._lock:
+            items = list(self.histograms.items())
+        return sorted(items, key=lambda item: -item[1].total)
+
+    def to_dict(self):
+        return {"started": self.started, "seconds": round(time.time() - self.started, 3),
+                "stall_ms": self.stall_ms,
+                "histogram": {"min_seconds": MIN_SECONDS, "buckets_per_octave": BUCKETS_PER_OCTAVE},
+                "operations": {name: histogram.summary() for name, histogram in self.operations()},
+                "stalls": list(self.stalls)}
+
+    def save(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_json(path, self.to_dict())
+        return path
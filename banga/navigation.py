@@ -0,0 +1,93 @@
+"""Where keyboard navigation goes next: the queue of incomplete phrases
+
+A phrase is incomplete while its Original is empty or one of its
+alternatives has been created but not transcribed. The queue keeps the
+incomplete positions of each listed theme in a sorted array. Finding the
+next one is a binary search in the current theme plus a skip over themes
+with nothing left. An edit moves one phrase in or out of its theme's array.
+"""
+import bisect
+from array import array
+
+
+def is_incomplete(record):
+    return not record.original or "" in record.alternatives().values()
+
+
+class IncompleteQueue:
+    """Positions of incomplete phrases, by theme, kept current edit by edit"""
+
+    def __init__(self, phrase_data):
+        self.phrase_data = phrase_data
+        self.positions = {}  # theme -> sorted array of incomplete positions
+        self.position_of = {}  # listed phrase id -> position in its theme
+        self.total = 0
+
+    @classmethod
+    def build(cls, phrase_data, themes):
+        queue = cls(phrase_data)
+        for theme in themes:
+            queue.add_theme(theme)
+        return queue
+
+    def __len__(self):
+        return self.total
+
+    def add_theme(self, theme):
+        """Queue a theme's listed phrases (again, if its listing changed)"""
+        if not self.phrase_data.is_listed(theme):
+            return
+        self.total -= len(self.positions.get(theme, ()))
+        incomplete = array("l")
+        for position, phrase_id in enumerate(self.phrase_data.theme_phrases(theme)):
+            self.position_of[phrase_id] = position
+            if is_incomplete(self.phrase_data[phrase_id]):
+                incomplete.append(position)
+        self.positions[theme] = incomplete
+        self.total += len(incomplete)
+
+    def update(self, phrase_id):
+        """Move one edited phrase into or out of the queue"""
+        position = self.position_of.get(phrase_id)
+        if position is None:
+            return
+        incomplete = self.positions[self.phrase_data.theme_of(phrase_id)]
+        index = bisect.bisect_left(incomplete, position)
+        queued = index < len(incomplete) and incomplete[index] == position
+        if is_incomplete(self.phrase_data[phrase_id]):
+            if not queued:
+                incomplete.insert(index, position)
+                self.total += 1
+        elif queued:
+            del incomplete[index]
+            self.total -= 1
+
+    def remaining(self, theme):
+        return len(self.positions.get(theme, ()))
+
+    def next(self, themes, theme_index, position, backwards=False):
+        """(theme index, position) of the nearest incomplete phrase after (or before) one, or None
+
+        Goes on into the following (or preceding) themes and wraps around;
+        themes not queued yet are skipped. The phrase itself comes last.
+        """
+        count = len(themes)
+        for step in range(count + 1):
+            index = (theme_index - step if backwards else theme_index + step) % count
+            incomplete = self.positions.get(themes[index])
+            if not incomplete:
+                continue
+            if step == 0:
+                # The rest of this theme first
+                if backwards:
+                    i = bisect.bisect_left(incomplete, position)
+                    if i:
+                        return index, incomplete[i - 1]
+                else:
+                    i = bisect.bisect_right(incomplete, position)
+                    if i < len(incomplete):
+                        return index, incomplete[i]
+            else:
+                # A later theme, or back round to the start (or end) of this one
+                return index, incomplete[-1] if backwards else incomplete[0]
+        return None
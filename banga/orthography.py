@@ -0,0 +1,242 @@
+"""Akan orthography: one normal form for every transcription, and a check of the rest
+
+The same word typed twice can come out as different strings: ɛ́ composed
+or as ɛ plus a combining acute, a Greek ε or Cyrillic о where the Akan
+letter was meant, a no-break space or a zero-width one between words.
+normalize() settles all of these: canonical composition (NFC), the
+look-alike and invisible characters mapped through one replacement table,
+whitespace runs collapsed and the ends trimmed.
+
+Checking only reports: a stored text is brought to its normal form when
+it is saved again, or when the user asks for every version at once. What
+cannot be fixed without a human is reported too, per version: letters
+outside the Akan alphabet, tone marks on a consonant or stacked on another
+mark, and symbols other than common punctuation.
+
+check_many() runs both over a batch at once: the texts are joined into
+one string, so composition, replacement and the problem scan are each a
+single pass in C that mostly just confirms there is nothing to do. Only
+the few problems found are mapped back to their text.
+"""
+import bisect
+import re
+import unicodedata
+
+# The Akan alphabet, plus the ŋ of older spellings
+ALPHABET = "abdeɛfghiklmnoɔprstuwyŋ"
+# Grave, acute, circumflex, tilde, macron and caron
+TONE_MARKS = "\u0300\u0301\u0302\u0303\u0304\u030c"
+# Vowels and the syllabic nasals may carry a tone mark
+MARK_BEARERS = "aeiouɛɔmnŋ"
+PUNCTUATION = " .,;:!?'\"()-…"
+SEPARATOR = "\x00"
+# Texts joined per pass. Normalizing skips text already in normal form, but one
+# text that is not costs a full pass over everything joined with it.
+BATCH = 1024
+
+# Characters typed for the letter they look like, by that letter
+LOOKALIKES = {
+    "ɛ": "εєԑɜ", "Ɛ": "ЄԐ", "ɔ": "ͻↄ", "Ɔ": "ϽↃ",
+    "a": "аα", "c": "с", "d": "ԁ", "e": "е", "h": "һ", "i": "іι", "j": "ј", "k": "κ", "o": "оο",
+    "p": "рρ", "s": "ѕ", "u": "υ", "w": "ԝ", "x": "хχ", "y": "у",
+    "A": "АΑ", "B": "ВΒ", "E": "ЕΕ", "H": "НΗ", "I": "ІΙ", "J": "Ј", "K": "КΚ", "M": "МΜ",
+    "N": "Ν", "O": "ОΟ", "P": "РΡ", "S": "Ѕ", "T": "ТΤ", "X": "ХΧ", "Y": "Υ", "Z": "Ζ",
+    "'": "‘’ʼ", '"': "“”",
+}
+# Soft hyphen, zero-width space, non-joiner and joiner, word joiner, byte order mark
+INVISIBLE = "\u00ad\u200b\u200c\u200d\u2060\ufeff"
+# Every other character str.isspace() accepts (none lie past U+3000)
+WHITESPACE = "".join(char for char in map(chr, range(0x3001)) if char.isspace() and char != " ")
+REPLACEMENTS = {char: letter for letter, chars in LOOKALIKES.items() for char in chars}
+# Composed forms too, such as Greek έ for ɛ́
+REPLACEMENTS.update({unicodedata.normalize("NFC", char + mark): unicodedata.normalize("NFC", letter + mark)
+                     for char, letter in list(REPLACEMENTS.items()) for mark in TONE_MARKS
+                     if len(unicodedata.normalize("NFC", char + mark)) == 1})
+REPLACEMENTS.update(dict.fromkeys(INVISIBLE, ""))
+REPLACEMENTS.update(dict.fromkeys(WHITESPACE, " "))
+# A single character class, so the scan stays fast on text with nothing to replace
+CLEANUP = re.compile(f"[{''.join(REPLACEMENTS)}]")
+SPACE_RUNS = re.compile(" {2,}")
+MARK_BEARERS += MARK_BEARERS.upper()
+# Vowels and nasals with a tone mark that have a composed form (ɛ and ɔ have none)
+TONED = "".join(composed for composed in (unicodedata.normalize("NFC", letter + mark)
+                                          for letter in MARK_BEARERS for mark in TONE_MARKS)
+                if len(composed) == 1)
+_allowed = re.escape(ALPHABET + ALPHABET.upper() + TONED + "0123456789" + PUNCTUATION + SEPARATOR)
+_bearers = re.escape(MARK_BEARERS)
+# On NFC text: anything but letters of the alphabet, digits, punctuation and a tone mark
+# right after a vowel or nasal. The lookbehind only runs once the class has matched, so
+# the scan costs one set lookup per character.
+PROBLEM = re.compile(f"[^{_allowed}](?<![{_bearers}][{TONE_MARKS}])")
+
+PROBLEM_KINDS = {"letter": "letters outside the Akan alphabet", "mark": "misplaced tone marks",
+                 "symbol": "unexpected symbols"}
+UNNORMALIZED = "not in normal form"
+
+
+def problem_kind(char):
+    if unicodedata.combining(char):
+        return "mark"
+    return "letter" if char.isalpha() else "symbol"
+
+
+def _replace(match):
+    return REPLACEMENTS[match.group()]
+
+
+def _clean(text):
+    """NFC text with look-alikes, invisibles and whitespace runs replaced; not trimmed yet"""
+    text, replaced = CLEANUP.subn(_replace, unicodedata.normalize("NFC", text))
+    if "  " in text:
+        text = SPACE_RUNS.sub(" ", text)
+    # A replaced letter may compose with the tone mark after it
+    return unicodedata.normalize("NFC", text) if replaced else text
+
+
+def _problems(chars):
+    """(kind, character) pairs of a text's problem characters, each once, in order"""
+    return tuple(dict.fromkeys((problem_kind(char), char) for char in chars))
+
+
+def normalize(text):
+    """Normal form of a transcription: NFC, look-alikes replaced, single spaces, trimmed"""
+    return _clean(text).strip()
+
+
+def check(text):
+    """(normal form, problems) of one transcription; problems are (kind, character) pairs"""
+    cleaned = _clean(text)
+    return cleaned.strip(), _problems(PROBLEM.findall(cleaned))
+
+
+def check_many(texts):
+    """check() a batch of texts: (normal forms, {index: problems} of the texts with any)"""
+    texts = list(texts)
+    normalized, found = [], {}
+    for offset in range(0, len(texts), BATCH):
+        batch_normalized, batch_found = _check_joined(texts[offset:offset + BATCH])
+        normalized += batch_normalized
+        found.update((offset + index, problems) for index, problems in batch_found.items())
+    return normalized, found
+
+
+def _check_joined(texts):
+    joined = SEPARATOR.join(texts)
+    if joined.count(SEPARATOR) != len(texts) - 1:
+        # A text holds the separator itself: the batch cannot be split back apart
+        checked = [check(text) for text in texts]
+        return [text for text, _ in checked], {i: problems for i, (_, problems) in enumerate(checked) if problems}
+    cleaned = _clean(joined)
+    found = {}
+    matches = [(match.start(), match.group()) for match in PROBLEM.finditer(cleaned)]
+    if matches:
+        starts = [0]
+        position = cleaned.find(SEPARATOR)
+        while position != -1:
+            starts.append(position + 1)
+            position = cleaned.find(SEPARATOR, position + 1)
+        for start, char in matches:
+            found.setdefault(bisect.bisect_right(starts, start) - 1, []).append(char)
+    normalized = [text.strip() for text in cleaned.split(SEPARATOR)]
+    return normalized, {index: _problems(chars) for index, chars in found.items()}
+
+
+def describe(problems, unnormalized=False):
+    """One line naming a version's problems, e.g. "letters outside the Akan alphabet: c, q" """
+    by_kind = {}
+    for kind, char in problems:
+        by_kind.setdefault(kind, []).append("◌" + char if kind == "mark" else char)
+    parts = [f"{PROBLEM_KINDS[kind]}: {', '.join(chars)}" for kind, chars in by_kind.items()]
+    return "; ".join([UNNORMALIZED] + parts if unnormalized else parts)
+
+
+def transcribed_versions(record):
+    """(version, text) of each transcribed version of a phrase record"""
+    versions = [("Original", record.original)] if record.original else []
+    return versions + [(alt_num, text) for alt_num, text in record.alternatives().items() if text]
+
+
+class OrthographyCheck:
+    """Problems of every transcription, by phrase and version, kept current edit by edit
+
+    Nothing is written: changes() lists the normal forms for whoever
+    decides to save them.
+    """
+
+    def __init__(self, phrase_data):
+        self.phrase_data = phrase_data
+        self.problems = {}  # phrase_id -> {version: ((kind, character), ...)}
+        self.unnormalized = {}  # phrase_id -> {version: normal form} of texts stored otherwise
+        self.checked = 0  # transcriptions checked by build()
+
+    @classmethod
+    def build(cls, phrase_data):
+        """Check the whole corpus in one batch"""
+        orthography = cls(phrase_data)
+        keys, texts = [], []
+        for phrase_id, record in enumerate(phrase_data.records):
+            if record is None:
+                continue
+            for version, text in transcribed_versions(record):
+                keys.append((phrase_id, version))
+                texts.append(text)
+        normalized, found = check_many(texts)
+        for index, problems in found.items():
+            phrase_id, version = keys[index]
+            orthography.problems.setdefault(phrase_id, {})[version] = problems
+        for (phrase_id, version), old_text, new_text in zip(keys, texts, normalized):
+            if new_text != old_text:
+                orthography.unnormalized.setdefault(phrase_id, {})[version] = new_text
+        orthography.checked = len(texts)
+        return orthography
+
+    def __len__(self):
+        return sum(map(len, self.problems.values()))
+
+    def unnormalized_count(self):
+        return sum(map(len, self.unnormalized.values()))
+
+    def changes(self):
+        """(phrase_id, version, normal form) of every version stored in another form, for record_many"""
+        return [(phrase_id, version, text)
+                for phrase_id in sorted(self.unnormalized)
+                for version, text in self.unnormalized[phrase_id].items()]
+
+    def update(self, phrase_id):
+        """Recheck one edited phrase"""
+        checked, unnormalized = {}, {}
+        for version, text in transcribed_versions(self.phrase_data[phrase_id]):
+            normal, problems = check(text)
+            if problems:
+                checked[version] = problems
+            if normal != text:
+                unnormalized[version] = normal
+        for found, by_phrase in ((checked, self.problems), (unnormalized, self.unnormalized)):
+            if found:
+                by_phrase[phrase_id] = found
+            else:
+                by_phrase.pop(phrase_id, None)
+
+    def rows(self):
+        """(phrase_id, version, problems, unnormalized) of each version with a problem or not in normal form"""
+        rows = []
+        for phrase_id in sorted(self.problems.keys() | self.unnormalized.keys()):
+            problems = self.problems.get(phrase_id, {})
+            unnormalized = self.unnormalized.get(phrase_id, {})
+            for version in dict.fromkeys([*problems, *unnormalized]):
+                rows.append((phrase_id, version, problems.get(version, ()), version in unnormalized))
+        return rows
+
+
+def format_orthography(orthography):
+    """Render an orthography check's totals as a list of lines"""
+    counts = {}
+    for versions in orthography.problems.values():
+        for problems in versions.values():
+            for kind in dict.fromkeys(kind for kind, _ in problems):
+                counts[kind] = counts.get(kind, 0) + 1
+    lines = [f"Transcriptions checked: {orthography.checked:,} "
+             f"({orthography.unnormalized_count():,} {UNNORMALIZED})",
+             f"With problems: {len(orthography):,} in {len(orthography.problems):,} phrases"]
+    lines += [f"{PROBLEM_KINDS[kind][0].upper()}{PROBLEM_KINDS[kind][1:]}: {count:,}" for kind, count in counts.items()]
+    return lines
@@ -0,0 +1,198 @@
+"""Full-text search over phrases and every transcription version
+
+Texts are folded before indexing: lowercased, stripped of tone marks and
+other diacritics, with ɛ and ɔ read as e and o, so "ɛyɛ", "Ɛyɛ" and "eye"
+all match each other. The index is a character-trigram inverted index;
+a query is answered from the postings of its rarest trigram, each
+candidate confirmed against its folded text, so stale postings left
+behind by edits never surface as hits.
+"""
+import collections
+import re
+import unicodedata
+from array import array
+
+from .data import MAX_ALTERNATIVES
+
+GRAM = 3
+# Fields per phrase: its question text, the Original, then each alternative
+FIELDS_PER_PHRASE = MAX_ALTERNATIVES + 2
+PHRASE_FIELD = 0
+ORIGINAL_FIELD = 1
+SCAN_CHUNK = 8192           # most postings verified per step before checking for enough hits
+FUZZY_SHARE_PERCENT = 60   # share of the query's trigrams a loose hit must contain
+FUZZY_SCAN_BUDGET = 2000   # documents checked at most when looking for loose hits
+
+# After NFD, drop the combining diacritics (tone marks among them) and map the
+# letters NFD does not decompose but Akan writers often type without the hook
+FOLD_TABLE = {mark: None for mark in range(0x0300, 0x0370)}
+FOLD_TABLE.update({ord("ɛ"): "e", ord("ɔ"): "o", ord("ŋ"): "n"})
+NON_WORD = re.compile(r"[\W_]+")
+
+
+def fold(text):
+    """Search form of a text: lowercase, no diacritics, single spaces between words"""
+    text = unicodedata.normalize("NFD", text.casefold()).translate(FOLD_TABLE)
+    return NON_WORD.sub(" ", text).strip()
+
+
+def grams(folded):
+    """Trigrams of a folded text, with word boundaries marked by spaces"""
+    padded = f" {folded} "
+    return {padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)}
+
+
+def field_version(field):
+    """The version a field holds: None for the question text, "Original" or an alternative number"""
+    if field == PHRASE_FIELD:
+        return None
+    return "Original" if field == ORIGINAL_FIELD else field - ORIGINAL_FIELD
+
+
+class SearchIndex:
+    """Trigram inverted index; document = one field of one phrase
+
+    Document IDs are phrase_id * FIELDS_PER_PHRASE + field, so hits map back
+    to phrases without a lookup table. Postings are append-only int arrays.
+    When a text changes only the trigrams it gained are appended; the ones
+    it lost stay behind as stale postings until compact() rebuilds them.
+    """
+
+    def __init__(self):
+        self.postings = collections.defaultdict(lambda: array("l"))
+        self.texts = {}         # document id -> folded text
+        self.phrase_count = 0   # phrases indexed so far; later IDs are picked up by sync
+        self.stale = 0
+
+    @classmethod
+    def build(cls, phrase_data):
+        index = cls()
+        index.sync(phrase_data)
+        return index
+
+    def __len__(self):
+        return len(self.texts)
+
+    def sync(self, phrase_data):
+        """Index phrases added to phrase_data since the last sync"""
+        end = len(phrase_data)
+        for phrase_id in range(self.phrase_count, end):
+            self.index_phrase(phrase_data, phrase_id)
+        self.phrase_count = end
+
+    def index_phrase(self, phrase_data, phrase_id):
+        """(Re)index the question text and every version of one phrase"""
+        record = phrase_data[phrase_id]
+        base = phrase_id * FIELDS_PER_PHRASE
+        self.set_text(base + PHRASE_FIELD, phrase_data.phrase_text[phrase_id])
+        self.set_text(base + ORIGINAL_FIELD, record.original)
+        for alt_num in range(1, MAX_ALTERNATIVES + 1):
+            self.set_text(base + ORIGINAL_FIELD + alt_num, record.get(alt_num) or "")
+
+    def update(self, phrase_id, version, text):
+        """Reindex one version after an edit; version is "Original" or an alternative number"""
+        field = ORIGINAL_FIELD if version == "Original" else ORIGINAL_FIELD + version
+        self.set_text(phrase_id * FIELDS_PER_PHRASE + field, text)
+
+    def set_text(self, doc, text):
+        folded = fold(text) if text else ""
+        old = self.texts.get(doc)
+        if folded == (old or ""):
+            return
+        old_grams = grams(old) if old else set()
+        new_grams = grams(folded) if folded else set()
+        for gram in new_grams - old_grams:
+            self.postings[gram].append(doc)
+        self.stale += len(old_grams - new_grams)
+        if folded:
+            self.texts[doc] = folded
+        else:
+            self.texts.pop(doc, None)
+        if self.stale > 100000 and self.stale > len(self.texts) * 8:
+            self.compact()
+
+    def compact(self):
+        """Rebuild the postings from the current texts, dropping stale entries"""
+        postings = collections.defaultdict(lambda: array("l"))
+        for doc, folded in sorted(self.texts.items()):
+            for gram in grams(folded):
+                postings[gram].append(doc)
+        self.postings = postings
+        self.stale = 0
+
+    def search(self, query, limit=50):
+        """Return up to limit (phrase_id, version) hits, exact matches first
+
+        version is None for a match in the question text itself. Queries of
+        one or two letters match word beginnings only. When exact hits run
+        short, texts sharing most of the query's trigrams fill the rest.
+        Postings are scanned lazily and verified one document at a time, so
+        a common query stops as soon as it has limit hits.
+        """
+        folded = fold(query)
+        if not folded:
+            return []
+        texts = self.texts
+        if len(folded) < GRAM:
+            prefix = f" {folded}"
+            postings = [posting for gram, posting in self.postings.items() if gram.startswith(prefix)]
+            query_grams = ()
+        else:
+            # No boundary padding: the query may start or end mid-word
+            query_grams = {folded[i:i + GRAM] for i in range(len(folded) - GRAM + 1)}
+            postings = [min((self.postings.get(gram, ()) for gram in query_grams), key=len)]
+            prefix = None
+
+        hits = {}  # ordered set: stale re-added postings can repeat a document
+        for posting in postings:
+            start, step = 0, limit * 4
+            while start < len(posting):
+                # Small first steps answer common queries at once; larger ones amortize the rest
+                chunk = posting[start:start + step]
+                start += step
+                step = min(step * 2, SCAN_CHUNK)
+                if prefix is None:
+                    found = [doc for doc in chunk if folded in texts.get(doc, "")]
+                else:
+                    found = [doc for doc in chunk if f" {texts.get(doc, '')}".find(prefix) >= 0]
+                hits.update(dict.fromkeys(found))
+                if len(hits) >= limit:
+                    break
+            if len(hits) >= limit:
+                break
+        hits = list(hits)[:limit]
+        if len(hits) < limit and len(query_grams) >= 2:
+            hits += self._loose(query_grams, set(hits), limit - len(hits))
+        return [(doc // FIELDS_PER_PHRASE, field_version(doc % FIELDS_PER_PHRASE)) for doc in hits]
+
+    def _loose(self, query_grams, exclude, limit):
+        """Documents containing most of the query trigrams, best first
+
+        A document sharing `needed` of k trigrams must contain one of the
+        k - needed + 1 rarest, so only those postings are scanned.
+        """
+        needed = max(2, -(-len(query_grams) * FUZZY_SHARE_PERCENT // 100))
+        if needed > len(query_grams):
+            return []
+        rarest = sorted(query_grams, key=lambda gram: len(self.postings.get(gram, ())))
+        scored = []
+        seen = set(exclude)
+        budget = FUZZY_SCAN_BUDGET
+        for gram in rarest[:len(query_grams) - needed + 1]:
+            for doc in self.postings.get(gram, ()):
+                if doc in seen:
+                    continue
+                seen.add(doc)
+                text = self.texts.get(doc)
+                if text is None:
+                    continue
+                padded = f" {text} "
+                score = sum(query_gram in padded for query_gram in query_grams)
+                if score >= needed:
+                    scored.append((-score, doc))
+                budget -= 1
+                if not budget:
+                    break
+            if not budget:
+                break
+        return [doc for _, doc in sorted(scored)[:limit]]
@@ -0,0 +1,288 @@
+"""Transcription store in SQLite, shared by several app instances at once
+
+The database runs in WAL mode, so readers never wait for the writer and
+every instance sees the others' commits as soon as they land. Each version
+of each phrase is one row carrying a revision number and when and by whom
+it was last changed. An edit only commits if the row is still at the
+revision this instance last saw; otherwise EditConflict is raised with the
+other annotator's text and the caller decides whether to overwrite it.
+Bulk writes (workbook merges, seeding) are checked the same way, and skip
+and report the versions that conflict rather than overwrite them.
+
+Every commit also stamps the rows it touches with the next value of a
+store-wide sequence number, so poll() finds what other instances changed
+with one indexed range query.
+
+Keep the database on a local disk: SQLite's locking is not reliable over
+network file systems.
+"""
+import collections
+import contextlib
+import getpass
+import os
+import sqlite3
+import threading
+import time
+
+from .data import SHARED_STORE_NAME, TranscriptionStore, shard_path
+
+BUSY_TIMEOUT_S = 30  # how long a write waits for another instance's transaction
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    theme TEXT NOT NULL,
+    phrase TEXT NOT NULL,
+    occurrence INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    text TEXT,
+    audio TEXT,
+    revision INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    modified_at REAL NOT NULL,
+    modified_by TEXT NOT NULL,
+    PRIMARY KEY (theme, phrase, occurrence, version)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS versions_seq ON versions (seq);
+"""
+COLUMNS = "theme, phrase, occurrence, version, text, audio, revision, seq, modified_at, modified_by"
+KEY_MATCH = "theme = ? AND phrase = ? AND occurrence = ? AND version = ?"
+
+
+def default_annotator():
+    """Name edits are attributed to: $BANGA_ANNOTATOR, else the login name"""
+    name = os.environ.get("BANGA_ANNOTATOR")
+    if name:
+        return name
+    try:
+        return getpass.getuser()
+    except (OSError, KeyError):
+        return "unknown"
+
+
+def version_column(version):
+    return "Original" if version == "Original" else str(version)
+
+
+def version_key(column):
+    return "Original" if column == "Original" else int(column)
+
+
+class EditConflict(Exception):
+    """Another instance saved this version since this one last saw it"""
+
+    def __init__(self, phrase_id, version, text, modified_by, modified_at):
+        when = time.strftime("%H:%M", time.localtime(modified_at))
+        label = "Original" if version == "Original" else f"Alternative {version}"
+        super().__init__(f"{label} was changed by {modified_by} at {when}")
+        self.phrase_id = phrase_id
+        self.version = version
+        self.text = text
+        self.modified_by = modified_by
+        self.modified_at = modified_at
+
+
+class SharedStore(TranscriptionStore):
+    """TranscriptionStore backed by one SQLite database several instances write to
+
+    Text edits, single or in bulk, are checked against the revision this
+    instance last saw (see record and record_many); audio links are written
+    as they are. poll() brings in what other instances committed since the
+    last call.
+    """
+
+    def __init__(self, directory, annotator=None):
+        super().__init__(directory)
+        self.db_path = self.directory / SHARED_STORE_NAME
+        self.annotator = annotator or default_annotator()
+        self.revisions = {}      # (phrase_id, version) -> revision this instance last saw
+        self.modified = {}       # (phrase_id, version) -> (annotator, time) of the last change
+        self.last_seq = 0        # changes up to here have been loaded or polled
+        self.lock_waits = collections.deque(maxlen=1000)  # seconds each write waited for the lock
+        self._db = None
+        self._lock = threading.Lock()  # the Tk thread and the worker share one connection
+
+    def exists(self):
+        return self.db_path.exists()
+
+    def _connect(self):
+        if self._db is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_S, isolation_level=None,
+                                 check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            # A save reported as done survives a power cut, as with the journal's fsync
+            db.execute("PRAGMA synchronous=FULL")
+            db.executescript(SCHEMA)
+            self._db = db
+        return self._db
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT, timing the wait for the write lock
+
+        sqlite3 errors surface as OSError, like a failed journal write would.
+        """
+        with self._lock:
+            try:
+                db = self._connect()
+                started = time.perf_counter()
+                db.execute("BEGIN IMMEDIATE")
+            except sqlite3.Error as e:
+                raise OSError(f"shared store unavailable: {e}") from e
+            self.lock_waits.append(time.perf_counter() - started)
+            try:
+                yield db
+                db.execute("COMMIT")
+            except BaseException as e:
+                if db.in_transaction:
+                    db.execute("ROLLBACK")
+                if isinstance(e, sqlite3.Error):
+                    raise OSError(f"shared store write failed: {e}") from e
+                raise
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            try:
+                return self._connect().execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                raise OSError(f"shared store unavailable: {e}") from e
+
+    def load(self, phrase_data):
+        """Read every stored version into a PhraseIndex"""
+        self.phrase_data = phrase_data
+        for row in self._query(f"SELECT {COLUMNS} FROM versions"):
+            self._take(row)
+        # Any instance may have written the shards since: only those older than their theme's last edit are dirty
+        self.dirty_themes = set()
+        for theme, modified_at in self._query("SELECT theme, MAX(modified_at) FROM versions "
+                                              "WHERE text IS NOT NULL GROUP BY theme"):
+            path = shard_path(self.directory, theme)
+            if not path.exists() or path.stat().st_mtime < modified_at:
+                self.dirty_themes.add(theme)
+        self.stats.rebuild(phrase_data)
+        return phrase_data
+
+    def poll(self):
+        """Bring in changes committed since the last load or poll; returns the phrase IDs touched
+
+        This instance's own commits come back too, which is harmless: their
+        text is already in memory.
+        """
+        rows = self._query(f"SELECT {COLUMNS} FROM versions WHERE seq > ? ORDER BY seq", (self.last_seq,))
+        return list(dict.fromkeys(self._take(row) for row in rows))
+
+    def _take(self, row):
+        """Copy one database row into phrase_data"""
+        theme, phrase, occurrence, column, text, audio, revision, seq, modified_at, modified_by = row
+        phrase_id = self.phrase_data.lookup(theme, phrase, occurrence)
+        version = version_key(column)
+        if text is not None:
+            self._apply(phrase_id, version, text)
+        if audio is not None or self.phrase_data[phrase_id].audio:
+            self.phrase_data.edit(phrase_id).set_audio(version, audio)
+        self.revisions[(phrase_id, version)] = revision
+        self.modified[(phrase_id, version)] = (modified_by, modified_at)
+        self.last_seq = max(self.last_seq, seq)
+        return phrase_id
+
+    def _commit(self, changes, check=False, skipped=None):
+        """Write (phrase_id, version, column, value) changes in one transaction
+
+        column is "text" or "audio". Text changes bump the row's revision;
+        with check, one whose row moved past the revision this instance last
+        saw raises EditConflict and nothing is written. Given a skipped list,
+        such a change is appended to it as an EditConflict instead and the
+        rest are still written.
+        """
+        now = time.time()
+        written = {}
+        with self._transaction() as db:
+            seq = db.execute("SELECT COALESCE(MAX(seq), 0) FROM versions").fetchone()[0]
+            for phrase_id, version, column, value in changes:
+                key = (*self.phrase_data.key(phrase_id), version_column(version))
+                row = db.execute(f"SELECT text, revision, modified_by, modified_at FROM versions WHERE {KEY_MATCH}",
+                                 key).fetchone()
+                revision = row[1] if row else 0
+                if column == "text":
+                    seen = written.get((phrase_id, version), self.revisions.get((phrase_id, version), 0))
+                    if check and revision != seen:
+                        conflict = EditConflict(phrase_id, version, row[0] or "", row[2], row[3])
+                        if skipped is None:
+                            raise conflict
+                        skipped.append(conflict)
+                        continue
+                    revision += 1
+                    written[(phrase_id, version)] = revision
+                seq += 1
+                if row is None:
+                    text, audio = (value, None) if column == "text" else (None, value)
+                    db.execute(f"INSERT INTO versions ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               (*key, text, audio, revision, seq, now, self.annotator))
+                else:
+                    db.execute(f"UPDATE versions SET {column} = ?, revision = ?, seq = ?, modified_at = ?, "
+                               f"modified_by = ? WHERE {KEY_MATCH}",
+                               (value, revision, seq, now, self.annotator, *key))
+        for key, revision in written.items():
+            self.revisions[key] = revision
+            self.modified[key] = (self.annotator, now)
+
+    def record(self, phrase_id, version, text, force=False):
+        """Persist one edit unless another instance changed the version first
+
+        Raises EditConflict, leaving memory and the database untouched, when
+        the stored revision is not the one this instance last saw; force
+        overwrites it anyway.
+        """
+        self._commit([(phrase_id, version, "text", text)], check=not force)
+        self._apply(phrase_id, version, text)
+
+    def record_many(self, changes):
+        """Persist (phrase_id, version, text) edits in one transaction, checked like record
+
+        An edit to a version another instance changed since this one last saw
+        it is skipped, leaving both memory and the database as they are.
+        Returns the skipped edits as EditConflicts carrying the stored text;
+        poll() brings that text in.
+        """
+        changes = list(changes)
+        skipped = []
+        self._commit([(phrase_id, version, "text", text) for phrase_id, version, text in changes],
+                     check=True, skipped=skipped)
+        conflicted = {(conflict.phrase_id, conflict.version) for conflict in skipped}
+        for phrase_id, version, text in changes:
+            if (phrase_id, version) not in conflicted:
+                self._apply(phrase_id, version, text)
+        return skipped
+
+    def link_audio(self, phrase_id, version, ref):
+        self._commit([(phrase_id, version, "audio", ref)])
+        self.phrase_data.edit(phrase_id).set_audio(version, ref)
+
+    def compact(self):
+        """Write versions held in memory but not in the database yet, then checkpoint the WAL
+
+        Only seeding the store from a workbook or moving a journal store
+        into it leaves such versions behind; edits are written as they happen.
+        A version another instance has stored meanwhile is not overwritten:
+        it is returned as an EditConflict, like record_many's skipped edits.
+        """
+        changes = []
+        for phrase_id, record in enumerate(self.phrase_data.records):
+            if record is None or record.is_empty():
+                continue
+            for version in ["Original"] + record.alternative_numbers():
+                if (phrase_id, version) not in self.revisions and (version != "Original" or record.original):
+                    changes.append((phrase_id, version, "text", record.get(version)))
+            for version, ref in (record.audio or {}).items():
+                if (phrase_id, version) not in self.revisions:
+                    changes.append((phrase_id, version, "audio", ref))
+        skipped = []
+        if changes:
+            self._commit(changes, check=True, skipped=skipped)
+        self._query("PRAGMA wal_checkpoint(PASSIVE)")
+        return skipped
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
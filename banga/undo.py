@@ -0,0 +1,158 @@
+"""Undo and redo of saved transcriptions, as a bounded operation log
+
+Each save is logged as one (phrase_id, version, old text, new text) entry
+rather than a copy of the state, so an entry costs about as much as its two
+texts. Undone entries move to the redo stack; a new save clears it. When
+the entries held outgrow the memory cap, the oldest are dropped first.
+
+The log persists as an append-only JSONL file of do/undo/redo events
+(phrases addressed by theme, phrase and occurrence, as in the store's
+journal). Replaying it applies the same cap, so a long history on disk
+never costs more memory than a short one. Once the file holds far more
+events than there are entries left, it is rewritten with just those.
+"""
+import collections
+import json
+import re
+import sys
+
+from .data import atomic_write, ends_mid_line
+
+UNDO_MEMORY_BYTES = 4 << 20
+UNDO_COMPACT_MIN_EVENTS = 500
+ENTRY_OVERHEAD = 120  # bytes an entry's tuple and deque slot cost besides its two texts
+
+
+def undo_log_path(directory, annotator=None):
+    """Undo log of the store in directory; one per annotator when the store is shared"""
+    if annotator:
+        slug = re.sub(r"[^\w.-]+", "_", annotator)
+        return directory / f"undo.{slug}.jsonl"
+    return directory / "undo.jsonl"
+
+
+def entry_size(entry):
+    _, _, old_text, new_text = entry
+    return sys.getsizeof(old_text) + sys.getsizeof(new_text) + ENTRY_OVERHEAD
+
+
+class EditLog:
+    """Undo and redo stacks of (phrase_id, version, old_text, new_text) entries
+
+    Callers apply an entry themselves, then confirm with undone() or
+    redone(), so an undo that fails to save leaves both stacks as they were.
+    """
+
+    def __init__(self, path, memory_bytes=UNDO_MEMORY_BYTES):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self.phrase_data = None
+        self.undo_stack = collections.deque()
+        self.redo_stack = collections.deque()
+        self.size = 0  # estimated bytes held by both stacks
+        self.evicted = 0
+        self.events = 0  # events in the file on disk
+        self._file = None
+
+    def load(self, phrase_data):
+        """Replay the persisted events against a loaded PhraseIndex"""
+        self.phrase_data = phrase_data
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.size = self.evicted = self.events = 0
+        if not self.path.exists():
+            return self
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # Torn final line from an interrupted append
+                    continue
+                if "do" in event:
+                    theme, phrase, occurrence, version, old_text, new_text = event["do"]
+                    self._clear_redo()
+                    self._push((phrase_data.lookup(theme, phrase, occurrence), version, old_text, new_text))
+                elif "undo" in event and self.undo_stack:
+                    self.redo_stack.append(self.undo_stack.pop())
+                elif "redo" in event and self.redo_stack:
+                    self.undo_stack.append(self.redo_stack.pop())
+                self.events += 1
+        return self
+
+    def record(self, phrase_id, version, old_text, new_text):
+        """Log a save that replaced old_text with new_text; no-op saves are not logged"""
+        if old_text == new_text:
+            return
+        entry = (phrase_id, version, old_text, new_text)
+        self._clear_redo()
+        self._push(entry)
+        theme, phrase, occurrence = self.phrase_data.key(phrase_id)
+        self._append({"do": [theme, phrase, occurrence, version, old_text, new_text]})
+
+    def next_undo(self):
+        """The entry undo would revert (put back its old_text), or None"""
+        return self.undo_stack[-1] if self.undo_stack else None
+
+    def next_redo(self):
+        """The entry redo would reapply (put back its new_text), or None"""
+        return self.redo_stack[-1] if self.redo_stack else None
+
+    def undone(self):
+        """Confirm next_undo() was applied"""
+        self.redo_stack.append(self.undo_stack.pop())
+        self._append({"undo": 1})
+
+    def redone(self):
+        """Confirm next_redo() was applied"""
+        self.undo_stack.append(self.redo_stack.pop())
+        self._append({"redo": 1})
+
+    def _push(self, entry):
+        self.undo_stack.append(entry)
+        self.size += entry_size(entry)
+        # Oldest first: the bottom of the undo stack, then what was undone longest ago
+        while self.size > self.memory_bytes and len(self.undo_stack) + len(self.redo_stack) > 1:
+            victim = self.undo_stack.popleft() if self.undo_stack else self.redo_stack.popleft()
+            self.size -= entry_size(victim)
+            self.evicted += 1
+
+    def _clear_redo(self):
+        for entry in self.redo_stack:
+            self.size -= entry_size(entry)
+        self.redo_stack.clear()
+
+    def _append(self, event):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            torn = ends_mid_line(self.path)
+            self._file = open(self.path, "a", encoding="utf-8")
+            if torn:
+                # End the torn line first, or this event would be appended to it and skipped with it
+                self._file.write("\n")
+        # Flushed but not fsynced: losing the last undo step to a power cut loses no transcription
+        self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.events += 1
+        if self.events >= max(UNDO_COMPACT_MIN_EVENTS, 2 * (len(self.undo_stack) + len(self.redo_stack))):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the file as the events that rebuild just the entries still held"""
+        events = [{"do": [*self.phrase_data.key(phrase_id), version, old_text, new_text]}
+                  for phrase_id, version, old_text, new_text in (*self.undo_stack, *reversed(self.redo_stack))]
+        events += [{"undo": 1}] * len(self.redo_stack)
+
+        def write(tmp_path):
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for event in events:
+                    f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+        self.close()
+        atomic_write(self.path, write)
+        self.events = len(events)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
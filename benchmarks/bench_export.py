@@ -0,0 +1,93 @@
+"""Export throughput: Excel versus the streaming JSONL, Parquet and Arrow writers
+
+Fills a PhraseIndex with a synthetic corpus and times each exporter,
+reporting rows per second, the output size, and the peak Python memory
+allocated while writing (tracemalloc), which shows whether memory grows
+with the corpus.
+
+    python benchmarks/bench_export.py --phrases 50000
+"""
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banga.data import PhraseIndex, TranscriptionStore
+from banga.export import export_versions
+
+WORDS = ["ɛyɛ", "mepa", "wo", "kyɛw", "ɔdɔ", "nsuo", "akwaaba", "me", "din", "de", "ho", "te", "sɛn",
+         "medaase", "ɔkɔm", "afɔre", "nnipa", "sukuu", "adwuma", "ɛhɔ", "kɔ", "ba", "fie", "ɔhene"]
+
+
+def synthetic_store(phrases, directory, themes=12, seed=0):
+    rng = random.Random(seed)
+    per_theme = max(1, phrases // themes)
+    bank = {f"Theme {t}": [f"Question {t}-{i}" for i in range(per_theme)] for t in range(themes)}
+    phrase_data = PhraseIndex.build(list(bank), bank)
+    for phrase_id in range(len(phrase_data)):
+        record = phrase_data.edit(phrase_id)
+        record.original = " ".join(rng.choices(WORDS, k=rng.randint(3, 12)))
+        for alt_num in range(1, rng.randint(0, 3) + 1):
+            record.set(alt_num, " ".join(rng.choices(WORDS, k=rng.randint(3, 12))))
+        if rng.random() < 0.3:
+            start = rng.uniform(0, 3000)
+            record.set_audio("Original", f"recordings/session{phrase_id % 7}.wav#t={start:.3f},{start + 2.5:.3f}")
+    store = TranscriptionStore(directory)
+    store.phrase_data = phrase_data
+    return store
+
+
+def measure(func):
+    """Time one clean run, then repeat it under tracemalloc (which slows it) for the peak"""
+    start = time.perf_counter()
+    rows = func()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--phrases", type=int, default=50000)
+    parser.add_argument("--skip-pandas", action="store_true", help="leave out the DataFrame Excel path")
+    args = parser.parse_args()
+
+    scratch = Path(tempfile.mkdtemp(prefix="banga-export-"))
+    try:
+        store = synthetic_store(args.phrases, scratch / "store")
+        exporters = {
+            "excel_dataframe": (scratch / "frame.xlsx", lambda path: store.export_excel(path)[1]),
+            "excel_streaming": (scratch / "stream.xlsx", store.export_xlsx_streaming),
+            "jsonl": (scratch / "manifest.jsonl", lambda path: export_versions(store.phrase_data, path)[0]),
+            "parquet": (scratch / "versions.parquet", lambda path: export_versions(store.phrase_data, path)[0]),
+            "arrow": (scratch / "versions.arrow", lambda path: export_versions(store.phrase_data, path)[0]),
+        }
+        if args.skip_pandas:
+            del exporters["excel_dataframe"]
+        results = {"phrases": args.phrases}
+        for name, (path, export) in exporters.items():
+            try:
+                rows, seconds, peak = measure(lambda: export(path))
+            except ImportError as e:
+                results[name] = f"skipped: {e}"
+                continue
+            results[name] = {"rows": rows, "seconds": round(seconds, 3),
+                             "rows_per_s": round(rows / seconds), "mb": round(path.stat().st_size / 1e6, 2),
+                             "peak_alloc_mb": round(peak / 1e6, 1)}
+        print(json.dumps(results, indent=2))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
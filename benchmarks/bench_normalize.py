@@ -0,0 +1,88 @@
+"""Throughput of the audio normalization pipeline per worker count
+
+Writes a synthetic set of WAV clips with mixed sample rates, channel counts
+and encodings, then normalizes them into a scratch cache once per worker
+count. Reports clips/sec and audio-seconds/sec for each, plus how long a
+rerun over the already converted set takes.
+
+    python benchmarks/bench_normalize.py --clips 64 --seconds 20 --jobs 1 2 4
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from banga.audio import normalize_corpus
+
+# (sample rate, channels, bytes per sample) as they come off different recorders
+FORMATS = [(48000, 2, 2), (44100, 2, 2), (44100, 1, 2), (22050, 1, 1), (16000, 1, 2), (8000, 1, 2),
+           (48000, 1, 4), (96000, 2, 3)]
+
+
+def write_clip(path, seconds, rate, channels, width, rng):
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * rng.uniform(100, 400) * t) + 0.05 * rng.standard_normal(len(t))
+    frames = np.repeat(signal[:, None], channels, axis=1)
+    if width == 1:
+        data = (frames * 127 + 128).astype(np.uint8).tobytes()
+    elif width == 3:
+        ints = (frames * (2 ** 23 - 1)).astype("<i4")
+        data = ints.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    else:
+        data = (frames * (2 ** (8 * width - 1) - 1)).astype(f"<i{width}").tobytes()
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(width)
+        w.setframerate(rate)
+        w.writeframes(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=20.0, help="length of each clip")
+    parser.add_argument("--jobs", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    scratch = Path(tempfile.mkdtemp(prefix="banga-normalize-"))
+    try:
+        sources = []
+        for i in range(args.clips):
+            path = scratch / "clips" / f"clip{i:04d}.wav"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_clip(path, args.seconds, *FORMATS[i % len(FORMATS)], rng)
+            sources.append(path)
+
+        results = []
+        for jobs in args.jobs:
+            cache_dir = scratch / f"cache-{jobs}"
+            summary = normalize_corpus(sources, jobs=jobs, cache_dir=cache_dir)
+            start = time.perf_counter()
+            rerun = normalize_corpus(sources, jobs=jobs, cache_dir=cache_dir)
+            results.append({
+                "jobs": jobs,
+                "clips_per_s": round(summary["converted"] / summary["elapsed"], 2),
+                "audio_s_per_s": round(summary["converted_seconds"] / summary["elapsed"], 1),
+                "elapsed_s": round(summary["elapsed"], 3),
+                "failed": summary["failed"],
+                "rerun_ms": round((time.perf_counter() - start) * 1000, 1),
+                "rerun_converted": rerun["converted"],
+            })
+        print(json.dumps({"clips": args.clips, "clip_seconds": args.seconds, "results": results}, indent=2))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
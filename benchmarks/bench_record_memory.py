@@ -0,0 +1,75 @@
+"""Measure bytes per phrase for the phrase_data record layouts
+
+Compares the former dict-of-dicts layout ({(theme, phrase): {"Original": str,
+"alternatives": {int: str}}} with a record for every phrase) against
+PhraseIndex with lazily created PhraseRecord slots.
+
+    python benchmarks/bench_record_memory.py --phrases 100000 --transcribed 0.1
+"""
+import argparse
+import gc
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banga.data import PhraseIndex
+
+
+def question_bank(themes, phrases):
+    theme_names = [f"Theme {t}" for t in range(themes)]
+    return theme_names, {theme: [f"{theme} question {p}" for p in range(phrases)] for theme in theme_names}
+
+
+def build_dicts(themes, phrases, transcribed):
+    phrase_data = {}
+    for theme in themes:
+        for phrase in phrases[theme]:
+            phrase_data[(theme, phrase)] = {"Original": "", "alternatives": {}}
+    for theme, phrase in transcribed:
+        phrase_data[(theme, phrase)]["Original"] = "ɛyɛ"
+        phrase_data[(theme, phrase)]["alternatives"][1] = "ɔyɛ"
+    return phrase_data
+
+
+def build_index(themes, phrases, transcribed):
+    index = PhraseIndex.build(themes, phrases)
+    for theme, phrase in transcribed:
+        record = index.edit(index.lookup(theme, phrase))
+        record.original = "ɛyɛ"
+        record.set(1, "ɔyɛ")
+    return index
+
+
+def measure(build, *args):
+    gc.collect()
+    tracemalloc.start()
+    result = build(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--themes", type=int, default=50)
+    parser.add_argument("--phrases", type=int, default=100_000, help="total phrases in the bank")
+    parser.add_argument("--transcribed", type=float, default=0.1, help="fraction of phrases with text")
+    args = parser.parse_args()
+
+    themes, phrases = question_bank(args.themes, max(1, args.phrases // args.themes))
+    every = [(theme, phrase) for theme in themes for phrase in phrases[theme]]
+    step = max(1, round(1 / args.transcribed)) if args.transcribed > 0 else len(every) + 1
+    transcribed = every[::step]
+
+    total = len(every)
+    print(f"phrases={total:,} transcribed={len(transcribed):,}")
+    for name, build in (("dict records", build_dicts), ("PhraseIndex", build_index)):
+        size = measure(build, themes, phrases, transcribed)
+        print(f"{name:14s} {size / total:8.1f} bytes/phrase  ({size / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
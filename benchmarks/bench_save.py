@@ -0,0 +1,58 @@
+"""Save latency against the size of the edit set: per-theme shards versus the combined workbook
+
+Fills a store with a synthetic corpus, writes every shard once, then edits
+phrases in a growing number of themes and times how long writing the dirty
+shards takes, next to rebuilding the combined transcriptions.xlsx.
+
+    python benchmarks/bench_save.py --phrases 20000 --themes 40
+"""
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_export import WORDS, synthetic_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--phrases", type=int, default=20000)
+    parser.add_argument("--themes", type=int, default=40)
+    parser.add_argument("--edited", type=int, nargs="+", default=[1, 2, 5, 10],
+                        help="numbers of themes edited before each save")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    scratch = Path(tempfile.mkdtemp(prefix="banga-save-"))
+    try:
+        store = synthetic_store(args.phrases, scratch / "store", themes=args.themes)
+        store.dirty_themes = set(store.phrase_data.themes)
+        store.write_shards(store.take_dirty_shards())
+        themes = store.phrase_data.themes
+        results = {"phrases": len(store.phrase_data), "themes": len(themes), "saves": []}
+        for edited in args.edited:
+            for theme in rng.sample(themes, min(edited, len(themes))):
+                phrase_id = rng.choice(store.phrase_data.theme_phrases(theme))
+                store.record(phrase_id, "Original", " ".join(rng.choices(WORDS, k=6)))
+            start = time.perf_counter()
+            shards = store.take_dirty_shards()
+            _, rows, _ = store.write_shards(shards)
+            results["saves"].append({"themes_edited": edited, "rows_written": rows,
+                                     "ms": round((time.perf_counter() - start) * 1000, 1)})
+        start = time.perf_counter()
+        rows = store.export_xlsx_streaming(scratch / "combined.xlsx")
+        results["combined"] = {"rows_written": rows, "ms": round((time.perf_counter() - start) * 1000, 1)}
+        store.close()
+        print(json.dumps(results, indent=2))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
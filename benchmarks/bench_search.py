@@ -0,0 +1,114 @@
+"""Query latency of the phrase search index on a synthetic corpus
+
+Builds a PhraseIndex with the requested number of transcriptions spread
+over Originals and alternatives, drawn Zipf-style from a vocabulary of
+common Akan words and made-up Akan-like ones. Indexes it and times a mix of queries:
+whole words, word fragments, diacritic-free spellings of Akan words, short
+prefixes, and misspellings that only loose matching finds. Also times
+incremental updates, as save_transcription makes them.
+
+    python benchmarks/bench_search.py --transcriptions 100000
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banga.data import PhraseIndex
+from banga.search import SearchIndex
+
+SYLLABLES = ["a", "ba", "bɔ", "da", "de", "dwu", "fa", "fi", "hwɛ", "ka", "kɔ", "kyɛ", "ma", "me", "na",
+             "nne", "nsɛ", "nti", "pa", "pɛ", "sa", "sɛ", "su", "ta", "te", "tɔ", "wa", "wo", "ye", "yɛ"]
+COMMON = ["ɛyɛ", "mepa", "wo", "kyɛw", "ɔdɔ", "nsuo", "akwaaba", "me", "din", "de", "ho", "te", "sɛn",
+         "medaase", "ɔkɔm", "afɔre", "nnipa", "sukuu", "adwuma", "ɛhɔ", "kɔ", "ba", "fie", "ɔhene",
+         "abɔfra", "ntoma", "nkwan", "aduane", "ɛnnɛ", "ɔkyena", "nnɛra", "asɛm", "nsɛm", "Kofi", "Ama"]
+
+QUERIES = {
+    "word": ["akwaaba", "medaase", "adwuma", "aduane"],
+    "fragment": ["kwaab", "dwum", "hene", "ntom"],
+    "folded": ["eye", "odo", "sen", "okyena", "abofra"],
+    "prefix": ["a", "ny", "ɔk"],
+    "phrase": ["me din de", "wo ho te sɛn"],
+    "misspelled": ["akwaba", "medase", "adwumma"],
+}
+
+
+def vocabulary(size, rng):
+    """The common words plus made-up words of two to four Akan-like syllables"""
+    words = set(COMMON)
+    while len(words) < size:
+        words.add("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def synthetic_corpus(transcriptions, themes=20, vocabulary_size=8000, seed=0):
+    rng = random.Random(seed)
+    words = vocabulary(vocabulary_size, rng)
+    # Zipf-like frequencies, so a few words are everywhere and most are rare
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    rng.shuffle(weights)
+    for word in COMMON:
+        weights[words.index(word)] = 0.5
+    phrases_per_theme = max(1, transcriptions // (themes * 2))
+    phrases = {f"Theme {t}": [f"Question {t}-{i}: " + " ".join(rng.choices(words, weights, k=5))
+                              for i in range(phrases_per_theme)] for t in range(themes)}
+    phrase_data = PhraseIndex.build(list(phrases), phrases)
+    written = 0
+    while written < transcriptions:
+        record = phrase_data.edit(rng.randrange(len(phrase_data)))
+        sentence = " ".join(rng.choices(words, weights, k=rng.randint(3, 12)))
+        if not record.original:
+            record.original = sentence
+        else:
+            alt_num = rng.randint(1, 3)
+            record.set(alt_num, sentence)
+        written += 1
+    return phrase_data
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcriptions", type=int, default=100000)
+    parser.add_argument("--vocabulary", type=int, default=8000, help="distinct words in the corpus")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    phrase_data = synthetic_corpus(args.transcriptions, vocabulary_size=args.vocabulary)
+    index, build_ms = timed(SearchIndex.build, phrase_data)
+
+    results = {"transcriptions": args.transcriptions, "vocabulary": args.vocabulary, "phrases": len(phrase_data),
+               "documents": len(index), "trigrams": len(index.postings), "build_ms": round(build_ms, 1)}
+    for kind, queries in QUERIES.items():
+        latencies, hits = [], 0
+        for _ in range(args.repeat):
+            for query in queries:
+                found, ms = timed(index.search, query)
+                latencies.append(ms)
+                hits += bool(found)
+        results[kind] = {"median_ms": round(statistics.median(latencies), 3),
+                         "max_ms": round(max(latencies), 3),
+                         "queries_with_hits": f"{hits // args.repeat}/{len(queries)}"}
+
+    rng = random.Random(1)
+    update_ms = []
+    for _ in range(1000):
+        phrase_id = rng.randrange(len(phrase_data))
+        _, ms = timed(index.update, phrase_id, "Original", " ".join(rng.choices(COMMON, k=8)))
+        update_ms.append(ms)
+    results["update_median_ms"] = round(statistics.median(update_ms), 4)
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
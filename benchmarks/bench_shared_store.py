@@ -0,0 +1,145 @@
+"""Shared SQLite store under many writers, and three-way merge throughput
+
+Starts --writers processes, each with its own SharedStore on one database,
+saving random transcriptions as fast as they can (or with --think-ms
+between saves, like a person typing) and polling for the others' edits.
+Reports how long writes waited for the lock, commit latency, total
+commits per second and how many saves hit an edit conflict. Then times a
+three-way merge of a synthetic workbook's rows into both store kinds.
+
+    python benchmarks/bench_shared_store.py --writers 8 --edits 500
+"""
+import argparse
+import json
+import multiprocessing
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banga.data import PhraseIndex, TranscriptionStore
+from banga.shared import EditConflict, SharedStore
+
+WORDS = ["ɛyɛ", "mepa", "wo", "kyɛw", "ɔdɔ", "nsuo", "akwaaba", "me", "din", "de", "ho", "te", "sɛn",
+         "medaase", "ɔkɔm", "afɔre", "nnipa", "sukuu", "adwuma", "ɛhɔ", "kɔ", "ba", "fie", "ɔhene"]
+POLL_EVERY = 20
+
+
+def question_bank(phrases, themes=12):
+    per_theme = max(1, phrases // themes)
+    return {f"Theme {t}": [f"Question {t}-{i}" for i in range(per_theme)] for t in range(themes)}
+
+
+def sentence(rng):
+    return " ".join(rng.choices(WORDS, k=rng.randint(3, 12)))
+
+
+def writer(directory, phrases, edits, think_ms, seed):
+    """One annotator: returns (lock waits, commit latencies, conflicts) in seconds"""
+    rng = random.Random(seed)
+    bank = question_bank(phrases)
+    store = SharedStore(directory, annotator=f"writer-{seed}")
+    store.load(PhraseIndex.build(list(bank), bank))
+    latencies = []
+    conflicts = 0
+    for edit in range(edits):
+        phrase_id = rng.randrange(len(store.phrase_data))
+        version = "Original" if rng.random() < 0.7 else rng.randint(1, 3)
+        text = sentence(rng)
+        start = time.perf_counter()
+        try:
+            store.record(phrase_id, version, text)
+        except EditConflict:
+            conflicts += 1
+            store.record(phrase_id, version, text, force=True)
+        latencies.append(time.perf_counter() - start)
+        if edit % POLL_EVERY == 0:
+            store.poll()
+        if think_ms:
+            time.sleep(rng.uniform(0, 2 * think_ms) / 1000)
+    waits = list(store.lock_waits)
+    store.close()
+    return waits, latencies, conflicts
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    pick = lambda q: values[min(len(values) - 1, int(q * len(values)))] * 1000
+    return {"p50_ms": round(pick(0.5), 3), "p95_ms": round(pick(0.95), 3), "p99_ms": round(pick(0.99), 3),
+            "max_ms": round(values[-1] * 1000, 3)}
+
+
+def load_test(directory, writers, phrases, edits, think_ms):
+    bank = question_bank(phrases)
+    seed_store = SharedStore(directory)
+    seed_store.load(PhraseIndex.build(list(bank), bank))
+    seed_store.close()
+    start = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(writers) as pool:
+        results = pool.starmap(writer, [(directory, phrases, edits, think_ms, seed) for seed in range(writers)])
+    elapsed = time.perf_counter() - start
+    waits = [wait for result in results for wait in result[0]]
+    latencies = [latency for result in results for latency in result[1]]
+    return {"writers": writers, "edits_per_writer": edits, "think_ms": think_ms,
+            "commits_per_s": round(len(latencies) / elapsed), "conflicts": sum(result[2] for result in results),
+            "lock_wait": percentiles(waits), "commit_latency": percentiles(latencies)}
+
+
+def merge_rows(phrases, seed=1):
+    """Workbook rows for a merge plus their base: a third edited on their side, a tenth on ours"""
+    rng = random.Random(seed)
+    bank = question_bank(phrases)
+    phrase_data = PhraseIndex.build(list(bank), bank)
+    base, rows, ours = {}, [], []
+    for phrase_id in range(len(phrase_data)):
+        theme, phrase, occurrence = phrase_data.key(phrase_id)
+        text = sentence(rng)
+        base[(theme, phrase, occurrence, "Original")] = text
+        theirs = sentence(rng) if rng.random() < 0.33 else text
+        rows.append((theme, phrase, occurrence, {"Original": theirs}))
+        ours.append(sentence(rng) if rng.random() < 0.1 else text)
+    return bank, base, rows, ours
+
+
+def time_merge(store, bank, base, rows, ours):
+    phrase_data = PhraseIndex.build(list(bank), bank)
+    for phrase_id, text in enumerate(ours):
+        phrase_data.edit(phrase_id).original = text
+    store.load(phrase_data)
+    store.compact()
+    start = time.perf_counter()
+    counts, _, _ = store.merge_three_way(rows, base)
+    seconds = time.perf_counter() - start
+    store.close()
+    return {"rows": counts["rows"], "seconds": round(seconds, 3), "rows_per_s": round(counts["rows"] / seconds),
+            "taken": counts["overwritten"] + counts["filled"], "kept": counts["kept"],
+            "conflicts": counts["conflicts"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--edits", type=int, default=500, help="saves per writer")
+    parser.add_argument("--think-ms", type=float, default=0, help="mean pause between a writer's saves")
+    parser.add_argument("--phrases", type=int, default=20000)
+    args = parser.parse_args()
+
+    scratch = Path(tempfile.mkdtemp(prefix="banga-shared-"))
+    try:
+        results = {"load_test": load_test(scratch / "load", args.writers, args.phrases, args.edits, args.think_ms)}
+        bank, base, rows, ours = merge_rows(args.phrases)
+        results["merge_journal"] = time_merge(TranscriptionStore(scratch / "journal"), bank, base, rows, ours)
+        results["merge_shared"] = time_merge(SharedStore(scratch / "shared"), bank, base, rows, ours)
+        print(json.dumps(results, indent=2))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
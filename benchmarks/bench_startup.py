@@ -0,0 +1,94 @@
+"""Measure import time and time-to-first-paint of the transcription app
+
+Each measurement runs in a fresh interpreter so import caches do not leak
+between runs. Reports, in milliseconds:
+
+- import: importing banga.app (and whether pandas/openpyxl got pulled in)
+- first_paint: process start until the window has been drawn
+- first_theme: until the first theme is selectable
+- all_themes: until every theme's sheet has been parsed
+
+The window timings need a display; without one they are reported as null.
+
+    python benchmarks/bench_startup.py --runs 5 [--cold]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import banga.app
+print(json.dumps({"import": (time.perf_counter() - start) * 1000,
+                  "pandas_loaded": "pandas" in sys.modules,
+                  "openpyxl_loaded": "openpyxl" in sys.modules}))
+"""
+
+WINDOW_PROBE = """
+import json, time
+start = time.perf_counter()
+import tkinter as tk
+from banga.app import TranscriptionApp
+result = {"first_paint": None, "first_theme": None, "all_themes": None}
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print(json.dumps(result))
+    raise SystemExit
+app = TranscriptionApp(root, autosave_delay_ms=0)
+root.update()
+result["first_paint"] = (time.perf_counter() - start) * 1000
+while not app.data_loaded:
+    root.update()
+    time.sleep(0.001)
+result["first_theme"] = (time.perf_counter() - start) * 1000
+while app.remaining_themes or not app.worker.is_idle():
+    root.update()
+    time.sleep(0.001)
+root.update()
+result["all_themes"] = (time.perf_counter() - start) * 1000
+app.worker.shutdown()
+root.destroy()
+print(json.dumps(result))
+"""
+
+
+def probe(code):
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--cold", action="store_true",
+                        help="drop the parsed question-bank cache before every run")
+    args = parser.parse_args()
+
+    from banga.data import PHRASES_CACHE_PATH
+
+    samples = []
+    for _ in range(args.runs):
+        if args.cold:
+            PHRASES_CACHE_PATH.unlink(missing_ok=True)
+        samples.append({**probe(IMPORT_PROBE), **probe(WINDOW_PROBE)})
+
+    summary = {"runs": args.runs, "cold": args.cold,
+               "pandas_loaded": samples[-1]["pandas_loaded"],
+               "openpyxl_loaded": samples[-1]["openpyxl_loaded"]}
+    for metric in ("import", "first_paint", "first_theme", "all_themes"):
+        values = [sample[metric] for sample in samples if sample[metric] is not None]
+        summary[f"{metric}_ms"] = round(statistics.median(values), 1) if values else None
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(ROOT))
+    main()
@@ -0,0 +1,303 @@
+"""Time the app's load, save and redraw paths on a synthetic corpus, without a display
+
+Generates a corpus with synthetic_corpus.py, then drives TranscriptionApp
+methods on an instance whose Tk widgets are replaced by headless stand-ins
+and whose background worker runs jobs inline, so every timing covers the
+whole operation. Each benchmark runs --repeat times after untimed setup;
+the medians go to stdout (and --output) as JSON tagged with the commit,
+so runs on different commits can be compared with --compare.
+
+    python benchmarks/bench_suite.py --themes 20 --phrases 500 --output results.json
+    python benchmarks/bench_suite.py --themes 20 --phrases 500 --compare results.json
+"""
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from banga.app import TranscriptionApp, VirtualTreeRows
+from banga.data import finish_question_bank, open_store
+from banga.navigation import IncompleteQueue
+from banga.orthography import OrthographyCheck
+from synthetic_corpus import WORDS, add_arguments, corpus_options, generate, text
+
+KEYPRESSES = 100
+
+
+class Stub:
+    """Accepts any widget call and does nothing"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class HeadlessCombo(Stub):
+    """Keeps the values and selected position a Combobox would"""
+
+    def __init__(self):
+        self.options = {"values": ()}
+        self.position = -1
+
+    def __getitem__(self, option):
+        return self.options[option]
+
+    def __setitem__(self, option, value):
+        self.options[option] = tuple(value)
+
+    def current(self, position=None):
+        if position is None:
+            return self.position
+        self.position = position
+
+
+class HeadlessNotebook(Stub):
+    def select(self):
+        return "overview"
+
+
+class HeadlessVar:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class HeadlessTree(Stub):
+    """The part of ttk.Treeview VirtualTreeRows uses, kept in plain lists"""
+
+    def __init__(self, height=20):
+        self.height = height
+        self.items = []
+        self.values = {}
+        self.created = 0
+
+    def winfo_height(self):
+        return 0
+
+    def cget(self, option):
+        return self.height
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def insert(self, parent, index, values):
+        self.created += 1
+        item = f"I{self.created:03d}"
+        self.items.append(item)
+        self.values[item] = values
+        return item
+
+    def item(self, item, values):
+        self.values[item] = values
+
+    def delete(self, *items):
+        for item in items:
+            self.items.remove(item)
+            del self.values[item]
+
+    def index(self, item):
+        return self.items.index(item)
+
+
+class InlineWorker:
+    """BackgroundWorker stand-in that runs each job at once; errors propagate"""
+
+    def submit(self, key, func, *args, on_done=None, on_error=None, on_progress=None):
+        result = func(*args, **({"progress": on_progress} if on_progress else {}))
+        if on_done:
+            on_done(result)
+        return False
+
+    def is_idle(self):
+        return True
+
+
+def headless_app(questions_path, metadata_dir, cache_path):
+    """A TranscriptionApp with the app's own state but headless stand-ins for its widgets"""
+    app = TranscriptionApp.__new__(TranscriptionApp)
+    app.init_state(InlineWorker(), autosave_delay_ms=0, phrases_path=questions_path, metadata_dir=metadata_dir,
+                   phrases_cache_path=cache_path)
+    app.root = app.status_label = app.stats_text = Stub()
+    app.current_phrase_label = app.queue_label = app.transcription_text = Stub()
+    app.audio_label = app.waveform_canvas = Stub()
+    app.theme_combo, app.phrase_combo = HeadlessCombo(), HeadlessCombo()
+    app.version_combo, app.segment_combo = HeadlessCombo(), HeadlessCombo()
+    app.version_var = HeadlessVar("Original")
+    app.notebook = HeadlessNotebook()
+    app.overview_tab = "overview"
+    app.history_all_var = HeadlessVar(True)
+    app.history_rows = VirtualTreeRows(HeadlessTree(), Stub())
+    app.orthography_label = Stub()
+    app.orthography_rows = VirtualTreeRows(HeadlessTree(), Stub())
+    app.data_loaded = True
+    return app
+
+
+def timed(func, setup=None, repeat=5):
+    seconds = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    return {"runs": repeat, "median_ms": round(statistics.median(seconds) * 1000, 2),
+            "min_ms": round(min(seconds) * 1000, 2), "max_ms": round(max(seconds) * 1000, 2)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(scratch, options, repeat):
+    questions_path, excel_path = generate(scratch, **options)
+    metadata_dir = excel_path.parent
+    # A scratch phrase cache keeps the real one untouched
+    cache_path = scratch / "phrases-cache.json"
+    app = headless_app(questions_path, metadata_dir, cache_path)
+    rng = random.Random(options["seed"])
+    results = {}
+
+    def forget_cache():
+        cache_path.unlink(missing_ok=True)
+
+    results["load_themes_and_phrases_cold"] = timed(app.load_themes_and_phrases, forget_cache, repeat)
+    results["finish_question_bank"] = timed(
+        lambda: finish_question_bank(questions_path, app.themes, app.phrases, app.remaining_themes, cache_path),
+        lambda: (forget_cache(), app.load_themes_and_phrases()), repeat)
+    results["load_themes_and_phrases_cached"] = timed(app.load_themes_and_phrases, repeat=repeat)
+
+    def empty_store():
+        for path in metadata_dir.iterdir():
+            if path != excel_path:
+                shutil.rmtree(path) if path.is_dir() else path.unlink()
+        app.store.close()
+        app.store = open_store(metadata_dir)
+        app.initialize_phrase_data()
+
+    def reopen_store():
+        app.store.close()
+        app.store = open_store(metadata_dir)
+        app.initialize_phrase_data()
+
+    results["load_existing_metadata_seed"] = timed(app.load_existing_metadata, empty_store, repeat)
+    results["load_existing_metadata"] = timed(app.load_existing_metadata, reopen_store, repeat)
+
+    def everything_dirty():
+        app.store.mark_dirty(app.themes)
+        app.workbook_stale = True
+
+    def one_edit():
+        phrase_id = rng.choice(app.phrase_data.theme_phrases(rng.choice(app.themes)))
+        app.store.record(phrase_id, "Original", text(rng, options["words"], WORDS))
+
+    results["save_to_excel_full"] = timed(lambda: app.save_to_excel(quiet=True, combined=True),
+                                          everything_dirty, repeat)
+    results["save_to_excel_one_edit"] = timed(lambda: app.save_to_excel(quiet=True), one_edit, repeat)
+    results["update_stats"] = timed(app.update_stats, repeat=repeat)
+    results["check_orthography"] = timed(lambda: OrthographyCheck.build(app.phrase_data), repeat=repeat)
+
+    def select_theme():
+        app.theme_index = rng.randrange(len(app.themes))
+        app.phrase_index = 0
+        app.current_phrase_id = app.phrase_data.phrase_id(app.themes[app.theme_index], 0)
+
+    app.history_all_var.set(True)
+    results["update_history_theme"] = timed(app.update_history, select_theme, repeat)
+    app.history_all_var.set(False)
+    results["update_history_phrase"] = timed(app.update_history, select_theme, repeat)
+
+    # A burst of key presses; each includes the idle-time prefetch that follows it
+    app.incomplete = IncompleteQueue.build(app.phrase_data, app.themes)
+    app.history_all_var.set(True)
+
+    def keypresses(navigate, presses=KEYPRESSES):
+        def run():
+            for _ in range(presses):
+                navigate()
+                app.prefetch()
+        return run
+
+    def first_phrase():
+        app.theme_index = -1
+        app.show_phrase(0, 0)
+
+    results[f"next_phrase_x{KEYPRESSES}"] = timed(keypresses(lambda: app.step_phrase(1)), first_phrase, repeat)
+    results[f"next_incomplete_x{KEYPRESSES}"] = timed(keypresses(app.next_incomplete), first_phrase, repeat)
+    app.store.close()
+    return results
+
+
+def compare(results, baseline, tolerance, noise_ms):
+    """Print median ratios against a baseline run; returns the benchmarks slower than tolerance allows
+
+    Medians that moved by less than noise_ms are never flagged: at
+    sub-millisecond scale the ratio is mostly timer noise.
+    """
+    slower = []
+    print(f"{'benchmark':<34} {'baseline':>10} {'now':>10} {'ratio':>7}", file=sys.stderr)
+    for name, result in results["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        ratio = result["median_ms"] / max(before["median_ms"], 1e-6)
+        regressed = ratio > tolerance and result["median_ms"] - before["median_ms"] > noise_ms
+        flag = "  <-- slower" if regressed else ""
+        print(f"{name:<34} {before['median_ms']:>10.2f} {result['median_ms']:>10.2f} {ratio:>7.2f}{flag}",
+              file=sys.stderr)
+        if regressed:
+            slower.append(name)
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--output", type=Path, help="also write the results to this file")
+    parser.add_argument("--compare", type=Path, help="results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="with --compare, exit 1 if a median grows past this ratio (default: %(default)s)")
+    parser.add_argument("--noise-ms", type=float, default=1.0,
+                        help="with --compare, ignore medians that moved by less than this (default: %(default)s)")
+    args = parser.parse_args()
+
+    options = corpus_options(args)
+    scratch = Path(tempfile.mkdtemp(prefix="banga-suite-"))
+    try:
+        results = {"commit": git_commit(), "python": platform.python_version(), "platform": platform.platform(),
+                   "corpus": options, "results": run_suite(scratch, options, args.repeat)}
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    print(json.dumps(results, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if baseline.get("corpus") != options:
+            print("warning: the baseline was run on a different corpus", file=sys.stderr)
+        if compare(results, baseline, args.tolerance, args.noise_ms):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
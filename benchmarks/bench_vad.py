@@ -0,0 +1,100 @@
+"""Real-time factor of voice-activity segmentation on CPU
+
+Synthesizes a long recording of speech-like bursts separated by pauses,
+over background noise, and times segment_clip on it. Reports the real-time
+factor (processing time / audio duration, lower is better) and how well
+the proposed segments cover the bursts that were actually written.
+
+    python benchmarks/bench_vad.py --minutes 30 --rate 48000 --channels 2
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from banga.audio import segment_clip
+
+
+def write_session(path, minutes, rate, channels, rng, chunk_seconds=30):
+    """Write the recording chunk by chunk; returns the ground-truth bursts"""
+    bursts = []
+    t = 0.0
+    total = minutes * 60
+    while t < total:
+        t += rng.uniform(0.6, 3.0)
+        length = rng.uniform(0.5, 6.0)
+        bursts.append((t, min(t + length, total)))
+        t += length
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        for chunk_start in np.arange(0, total, chunk_seconds):
+            n = int(min(chunk_seconds, total - chunk_start) * rate)
+            times = chunk_start + np.arange(n) / rate
+            signal = 0.003 * rng.standard_normal(n)
+            for start, end in bursts:
+                if end <= chunk_start or start >= chunk_start + chunk_seconds:
+                    continue
+                inside = (times >= start) & (times < end)
+                # A voiced tone with a syllable-rate envelope
+                envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * times[inside]) ** 2
+                signal[inside] += 0.2 * envelope * np.sin(2 * np.pi * 180 * times[inside])
+            frames = np.repeat((signal * 32767).astype("<i2")[:, None], channels, axis=1)
+            w.writeframes(frames.tobytes())
+    return bursts
+
+
+def coverage(bursts, segments, total, step=0.01):
+    grid = np.arange(0, total, step)
+    truth = np.zeros(len(grid), dtype=bool)
+    found = np.zeros(len(grid), dtype=bool)
+    for start, end in bursts:
+        truth[(grid >= start) & (grid < end)] = True
+    for start, end in segments:
+        found[(grid >= start) & (grid < end)] = True
+    return (float((truth & found).sum() / max(found.sum(), 1)),
+            float((truth & found).sum() / max(truth.sum(), 1)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--rate", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    scratch = Path(tempfile.mkdtemp(prefix="banga-vad-"))
+    try:
+        path = scratch / "session.wav"
+        bursts = write_session(path, args.minutes, args.rate, args.channels, np.random.default_rng(0))
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            segments = segment_clip(path)
+            timings.append(time.perf_counter() - start)
+        seconds = args.minutes * 60
+        precision, recall = coverage(bursts, segments, seconds)
+        best = min(timings)
+        print(json.dumps({
+            "audio_seconds": seconds, "rate": args.rate, "channels": args.channels,
+            "bursts": len(bursts), "segments": len(segments),
+            "best_s": round(best, 3), "real_time_factor": round(best / seconds, 5),
+            "x_real_time": round(seconds / best, 1),
+            "precision": round(precision, 3), "recall": round(recall, 3),
+        }, indent=2))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
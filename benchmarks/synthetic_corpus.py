@@ -0,0 +1,103 @@
+"""Generate a synthetic question bank and transcriptions workbook of any size
+
+Writes the same layouts the app reads: a question bank with one sheet per
+theme (a header cell, then one phrase per row in column A) and a
+metadata/transcriptions.xlsx with Theme, Phrase, Original_Transcription and
+Alternative_N_Transcription columns. Texts are drawn from a fixed Akan
+word list, so a given seed always produces the same files.
+
+    python benchmarks/synthetic_corpus.py out/ --themes 20 --phrases 250 --alternatives 3 --words 10
+"""
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from banga.data import write_metadata_xlsx
+
+WORDS = ["ɛyɛ", "mepa", "wo", "kyɛw", "ɔdɔ", "nsuo", "akwaaba", "me", "din", "de", "ho", "te", "sɛn",
+         "medaase", "ɔkɔm", "afɔre", "nnipa", "sukuu", "adwuma", "ɛhɔ", "kɔ", "ba", "fie", "ɔhene",
+         "abofra", "ɔbaa", "ɔbarima", "aduane", "nkwa", "yareɛ", "ayaresabea", "ɛnnɛ", "ɔkyena", "nnɛra"]
+QUESTION_WORDS = ["should", "I", "eat", "after", "birth", "the", "baby", "bath", "water", "clinic", "mother",
+                  "is", "it", "true", "that", "can", "avoid", "days", "breastfeed", "rest", "visit", "sleep"]
+
+
+def text(rng, words, vocabulary=WORDS):
+    """Between half and one and a half times `words` words"""
+    return " ".join(rng.choices(vocabulary, k=rng.randint(max(1, words // 2), max(1, words * 3 // 2))))
+
+
+def question_bank(themes, phrases, words=12, seed=0):
+    """{theme: [phrase, ...]} with `phrases` phrases per theme"""
+    rng = random.Random(seed)
+    return {f"Theme_{t:03d}": [f"Q{t}.{i} {text(rng, words, QUESTION_WORDS)}?" for i in range(phrases)]
+            for t in range(themes)}
+
+
+def transcription_rows(bank, alternatives=3, words=10, filled=0.8, seed=0):
+    """(theme, phrase, original, {alt_num: text}) rows for a share `filled` of the phrases
+
+    Each transcribed phrase gets between 0 and `alternatives` alternatives.
+    """
+    rng = random.Random(seed + 1)
+    for theme, phrases in bank.items():
+        for phrase in phrases:
+            if rng.random() >= filled:
+                continue
+            yield theme, phrase, text(rng, words), {alt_num: text(rng, words)
+                                                   for alt_num in range(1, rng.randint(0, alternatives) + 1)}
+
+
+def write_question_bank(path, bank):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for theme, phrases in bank.items():
+        sheet = workbook.create_sheet(theme[:31])
+        # pandas reads the first row as the column name
+        sheet.append(["Question"])
+        for phrase in phrases:
+            sheet.append([phrase])
+    workbook.save(path)
+
+
+def generate(directory, themes=20, phrases=250, alternatives=3, words=10, filled=0.8, seed=0):
+    """Write questions.xlsx and metadata/transcriptions.xlsx under directory; returns their paths"""
+    directory = Path(directory)
+    (directory / "metadata").mkdir(parents=True, exist_ok=True)
+    bank = question_bank(themes, phrases, seed=seed)
+    questions_path = directory / "questions.xlsx"
+    write_question_bank(questions_path, bank)
+    excel_path = directory / "metadata" / "transcriptions.xlsx"
+    write_metadata_xlsx(excel_path, transcription_rows(bank, alternatives, words, filled, seed), alternatives)
+    return questions_path, excel_path
+
+
+def add_arguments(parser):
+    parser.add_argument("--themes", type=int, default=20)
+    parser.add_argument("--phrases", type=int, default=250, help="phrases per theme")
+    parser.add_argument("--alternatives", type=int, default=3, help="most alternatives per phrase")
+    parser.add_argument("--words", type=int, default=10, help="typical words per transcription")
+    parser.add_argument("--filled", type=float, default=0.8, help="share of phrases transcribed")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def corpus_options(args):
+    return {name: getattr(args, name) for name in ("themes", "phrases", "alternatives", "words", "filled", "seed")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", type=Path)
+    add_arguments(parser)
+    args = parser.parse_args()
+    questions_path, excel_path = generate(args.directory, **corpus_options(args))
+    print(json.dumps({"questions": str(questions_path), "transcriptions": str(excel_path),
+                      **corpus_options(args)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Character and word error rates of alternatives against the Original"""
+import random
+
+import pytest
+
+from banga.agreement import AgreementCache, compare, compute_agreement, edit_distance
+
+
+def reference_distance(a, b):
+    """Textbook dynamic-programming Levenshtein distance"""
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+def test_bit_parallel_distance_matches_the_textbook_one():
+    rng = random.Random(0)
+    for _ in range(300):
+        a = "".join(rng.choice("aɛɔbw ") for _ in range(rng.randrange(0, 30)))
+        b = "".join(rng.choice("aɛɔbw ") for _ in range(rng.randrange(0, 30)))
+        assert edit_distance(a, b) == reference_distance(a, b)
+    assert edit_distance("Wo ho te sɛn".split(), "Wo ho yɛ".split()) == 2
+
+
+def test_compare_counts_chars_and_words_after_normalizing():
+    # Case and spacing do not count; the tone mark does
+    assert compare("Wo  ho te sɛn", "wo ho te sɛn") == (0, 12, 0, 4)
+    assert compare("Wo ho te sɛn", "Wo ho te sɛ́n") == (1, 12, 1, 4)
+
+
+def test_report_rates_flags_and_cache(tmp_path):
+    rows = [(("Greetings", "How are you?", 0), "Wo ho te sɛn?", {1: "Wo ho te sɛn?", 2: "Ɛte sɛn?"}),
+            (("Health", "Are you hungry?", 0), "Ɔkɔm de wo?", {1: "Ɔkɔm de wo anaa?"}),
+            # No Original, or an empty alternative: nothing to compare
+            (("Health", "Where does it hurt?", 0), "", {1: "Ɛhe na ɛyɛ wo yaw?"}),
+            (("Health", "Did you sleep well?", 0), "Wodae yiye?", {1: " "})]
+    cache = AgreementCache(tmp_path / "agreement.json")
+    report = compute_agreement(rows, cache=cache)
+    assert (report["pairs"], report["computed"]) == (3, 3)
+    assert report["by_theme"]["Greetings"]["pairs"] == 2
+    assert report["by_theme"]["Health"]["wer"] == pytest.approx(1 / 3)
+    assert [(row, alt_num) for row, alt_num, _, _ in report["flagged"]] == [(0, 2), (1, 1)]
+
+    again = compute_agreement(rows, cache=AgreementCache(tmp_path / "agreement.json"))
+    assert again["computed"] == 0
+    assert again["cer"] == report["cer"]
@@ -0,0 +1,36 @@
+"""atomic_write: the target is either the old file or the complete new one"""
+import json
+
+import pytest
+
+from banga.data import atomic_write, write_json
+
+
+def test_replaces_the_target_and_leaves_no_temp_file(tmp_path):
+    path = tmp_path / "transcriptions.xlsx"
+    path.write_text("old", encoding="utf-8")
+    atomic_write(path, lambda tmp_path: tmp_path.write_text("new", encoding="utf-8"))
+    assert path.read_text(encoding="utf-8") == "new"
+    assert [p.name for p in tmp_path.iterdir()] == ["transcriptions.xlsx"]
+
+
+def test_failed_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / "transcriptions.xlsx"
+    path.write_text("old", encoding="utf-8")
+
+    def write(tmp_path):
+        tmp_path.write_text("half of it", encoding="utf-8")
+        raise OSError("disk full")
+
+    with pytest.raises(OSError, match="disk full"):
+        atomic_write(path, write)
+    assert path.read_text(encoding="utf-8") == "old"
+    assert [p.name for p in tmp_path.iterdir()] == ["transcriptions.xlsx"]
+
+
+def test_write_json(tmp_path):
+    path = tmp_path / "snapshot.json"
+    write_json(path, {"records": [["Greetings", "Welcome", "Akwaaba", []]]})
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"records": [["Greetings", "Welcome", "Akwaaba", []]]}
+    assert "Akwaaba" in path.read_text(encoding="utf-8")
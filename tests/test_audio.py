@@ -0,0 +1,83 @@
+"""WAV headers, memory-mapped samples and the peak envelope"""
+import struct
+import wave
+
+import numpy as np
+import pytest
+
+from banga import audio
+from banga.audio import PEAK_BLOCK, WavClip, WaveformPeaks, load_peaks
+
+
+def write_wav(path, samples, sample_rate=8000):
+    """16-bit mono WAV written by the standard library"""
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+    return path
+
+
+def append_chunk(path, chunk_id, payload):
+    """Add a chunk after the audio and fix up the RIFF size, as tagging tools do"""
+    with open(path, "r+b") as f:
+        f.seek(0, 2)
+        f.write(struct.pack("<4sI", chunk_id, len(payload)) + payload)
+        size = f.tell() - 8
+        f.seek(4)
+        f.write(struct.pack("<I", size))
+
+
+def test_samples_are_read_as_floats(tmp_path):
+    clip = WavClip(write_wav(tmp_path / "clip.wav", [0, 16384, -32768, 32767]))
+    try:
+        assert (clip.frames, clip.channels, clip.sample_rate) == (4, 1, 8000)
+        assert clip.read()[:, 0].tolist() == pytest.approx([0.0, 0.5, -1.0, 32767 / 32768])
+    finally:
+        clip.close()
+
+
+def test_chunks_after_the_audio_are_not_samples(tmp_path):
+    path = write_wav(tmp_path / "clip.wav", [1000] * 10)
+    append_chunk(path, b"LIST", b"INFOISFT\x06\x00\x00\x00banga\x00")
+    clip = WavClip(path)
+    try:
+        assert clip.frames == 10
+    finally:
+        clip.close()
+
+
+def test_streamed_data_size_falls_back_to_the_file_size(tmp_path):
+    path = write_wav(tmp_path / "clip.wav", [1000] * 10)
+    with open(path, "r+b") as f:
+        f.seek(40)
+        f.write(struct.pack("<I", 0xFFFFFFFF))
+    clip = WavClip(path)
+    try:
+        assert clip.frames == 10
+    finally:
+        clip.close()
+
+
+def test_not_a_wav_file(tmp_path):
+    path = tmp_path / "clip.wav"
+    path.write_bytes(b"ID3" + bytes(64))
+    with pytest.raises(ValueError):
+        WavClip(path)
+
+
+def test_peaks_bound_each_block_and_survive_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio, "PEAKS_CACHE_DIR", tmp_path / "peaks")
+    samples = np.zeros(PEAK_BLOCK * 3, dtype=np.int16)
+    samples[PEAK_BLOCK + 5] = 16384
+    samples[2 * PEAK_BLOCK + 7] = -16384
+    path = write_wav(tmp_path / "clip.wav", samples)
+
+    peaks = load_peaks(path)
+    mins, maxs = peaks.levels[0]
+    assert maxs.tolist() == [0.0, 0.5, 0.0]
+    assert mins.tolist() == [0.0, 0.0, -0.5]
+    cached = WaveformPeaks.load(audio.peaks_cache_path(path))
+    assert [level[1].tolist() for level in cached.levels] == [level[1].tolist() for level in peaks.levels]
+    assert [len(column) for column in peaks.overview(2)] == [2, 2]
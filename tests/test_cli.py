@@ -0,0 +1,43 @@
+"""The headless commands, run on a question bank and store in a temporary folder"""
+import pandas as pd
+
+from banga.__main__ import main
+
+
+def corpus(tmp_path):
+    """A question bank and a metadata folder holding only transcriptions.xlsx"""
+    questions = tmp_path / "questions.xlsx"
+    with pd.ExcelWriter(questions) as writer:
+        pd.DataFrame({"Question": ["Welcome", "How are you?"]}).to_excel(writer, sheet_name="Greetings", index=False)
+    metadata_dir = tmp_path / "metadata"
+    metadata_dir.mkdir()
+    pd.DataFrame({"Theme": ["Greetings"], "Phrase": ["Welcome"], "Original_Transcription": ["Akwaaba"],
+                  "Alternative_1_Transcription": ["Akwaaba o"]}).to_excel(
+        metadata_dir / "transcriptions.xlsx", index=False)
+    return ["--questions", str(questions), "--metadata-dir", str(metadata_dir)], metadata_dir
+
+
+def test_stats_reads_without_seeding_the_store(tmp_path, capsys):
+    options, metadata_dir = corpus(tmp_path)
+    main(options + ["stats"])
+    output = capsys.readouterr().out
+    assert "Original Transcriptions: 1" in output
+    assert "Alternative Transcriptions: 1" in output
+    assert sorted(path.name for path in metadata_dir.iterdir()) == ["transcriptions.xlsx"]
+
+
+def test_export_seeds_the_store_and_writes_the_workbook(tmp_path, capsys):
+    options, metadata_dir = corpus(tmp_path)
+    output = tmp_path / "out.xlsx"
+    main(options + ["export", "-o", str(output)])
+    assert "wrote 2 rows" in capsys.readouterr().out
+    assert (metadata_dir / "transcriptions.snapshot.json").exists()
+    exported = pd.read_excel(output).set_index("Phrase")
+    assert exported.loc["Welcome", "Original_Transcription"] == "Akwaaba"
+
+
+def test_manifest_export_only_reads(tmp_path, capsys):
+    options, metadata_dir = corpus(tmp_path)
+    main(options + ["export", "-o", str(tmp_path / "manifest.jsonl")])
+    assert "wrote 2 versions" in capsys.readouterr().out
+    assert sorted(path.name for path in metadata_dir.iterdir()) == ["transcriptions.xlsx"]
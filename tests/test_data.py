@@ -0,0 +1,82 @@
+"""The vectorized transcriptions.xlsx importer against the row-by-row original"""
+import pandas as pd
+import pytest
+
+from banga.data import MAX_ALTERNATIVES, PhraseIndex, merge_metadata_frame, merge_metadata_frame_iterrows
+
+ROWS = [
+    # Theme, Phrase, Original, Alternative 1, 2, 3
+    ("Greetings", "How are you?", "Wo ho te sɛn?", "Wo ho yɛ?", None, None),
+    ("Greetings", "Welcome", "Akwaaba", None, "", None),
+    # Padding around keys is stripped
+    (" Health ", " Did you sleep well? ", "Wodae yiye?", "", "Wo dae yie?", None),
+    # Nothing transcribed: the phrase is still indexed
+    ("Health", "Are you hungry?", None, None, None, None),
+    ("Health", "Where does it hurt?", "nan", "Ɛhe na ɛyɛ wo yaw?", None, "Ɛhe na ɛyɛ yaw?"),
+]
+# A question asked twice in a theme: the second row is its second occurrence
+REPEATED = ("Greetings", "How are you?", "Ɛte sɛn?", None, None, "Wo ho te dɛn?")
+COLUMNS = ["Theme", "Phrase", "Original_Transcription"] + [
+    f"Alternative_{alt_num}_Transcription" for alt_num in range(1, MAX_ALTERNATIVES + 1)]
+
+
+def read_back(tmp_path, rows, columns=COLUMNS):
+    """rows written to a workbook and read back the way the app reads transcriptions.xlsx"""
+    path = tmp_path / "transcriptions.xlsx"
+    pd.DataFrame(rows, columns=columns).to_excel(path, index=False)
+    return pd.read_excel(path)
+
+
+@pytest.fixture
+def workbook_frame(tmp_path):
+    return read_back(tmp_path, ROWS)
+
+
+def test_vectorized_matches_iterrows(workbook_frame):
+    vectorized = merge_metadata_frame(workbook_frame, PhraseIndex())
+    reference = merge_metadata_frame_iterrows(workbook_frame, PhraseIndex())
+    assert vectorized.snapshot() == reference.snapshot()
+    assert [record is None for record in vectorized.records] == [record is None for record in reference.records]
+
+
+def test_vectorized_merge_into_existing_index(workbook_frame):
+    """Both paths reuse IDs already handed out by the question bank"""
+    themes = ["Greetings", "Health"]
+    phrases = {"Greetings": ["Welcome", "How are you?"], "Health": ["Are you hungry?"]}
+    vectorized = merge_metadata_frame(workbook_frame, PhraseIndex.build(themes, phrases))
+    reference = merge_metadata_frame_iterrows(workbook_frame, PhraseIndex.build(themes, phrases))
+    assert vectorized.snapshot() == reference.snapshot()
+    assert vectorized.key(0) == ("Greetings", "Welcome", 0)
+
+
+def test_vectorized_contents(workbook_frame):
+    phrase_data = merge_metadata_frame(workbook_frame, PhraseIndex())
+    how = phrase_data[phrase_data.lookup("Greetings", "How are you?", create=False)]
+    assert (how.original, how.alternatives()) == ("Wo ho te sɛn?", {1: "Wo ho yɛ?"})
+    # Blank cells create no alternative slot
+    welcome = phrase_data[phrase_data.lookup("Greetings", "Welcome", create=False)]
+    assert (welcome.original, welcome.alternative_numbers()) == ("Akwaaba", [])
+    sleep = phrase_data[phrase_data.lookup("Health", "Did you sleep well?", create=False)]
+    assert sleep.alternatives() == {2: "Wo dae yie?"}
+    # Nothing transcribed: no record is created
+    assert phrase_data.records[phrase_data.lookup("Health", "Are you hungry?", create=False)] is None
+    # A literal "nan" is read as a missing value
+    hurt = phrase_data[phrase_data.lookup("Health", "Where does it hurt?", create=False)]
+    assert (hurt.original, hurt.alternatives()) == ("", {1: "Ɛhe na ɛyɛ wo yaw?", 3: "Ɛhe na ɛyɛ yaw?"})
+
+
+def test_vectorized_repeated_row_is_the_next_occurrence(tmp_path):
+    phrase_data = merge_metadata_frame(read_back(tmp_path, ROWS + [REPEATED]), PhraseIndex())
+    first = phrase_data[phrase_data.lookup("Greetings", "How are you?", 0, create=False)]
+    second = phrase_data[phrase_data.lookup("Greetings", "How are you?", 1, create=False)]
+    assert (first.original, first.alternatives()) == ("Wo ho te sɛn?", {1: "Wo ho yɛ?"})
+    assert (second.original, second.alternatives()) == ("Ɛte sɛn?", {3: "Wo ho te dɛn?"})
+
+
+def test_vectorized_ignores_alternatives_past_the_slots(tmp_path):
+    columns = COLUMNS + [f"Alternative_{MAX_ALTERNATIVES + 1}_Transcription"]
+    frame = read_back(tmp_path, [("Greetings", "Welcome", "Akwaaba", None, None, "Akwaaba o", "ignored")], columns)
+    phrase_data = merge_metadata_frame(frame, PhraseIndex())
+    assert phrase_data[0].alternatives() == {MAX_ALTERNATIVES: "Akwaaba o"}
+    with pytest.raises(ValueError):
+        merge_metadata_frame_iterrows(frame, PhraseIndex())
@@ -0,0 +1,100 @@
+"""Near-duplicate groups: MinHash signatures, LSH buckets and the signature cache"""
+import numpy as np
+import pytest
+
+from banga.data import PhraseIndex
+from banga.duplicates import (NUM_PERM, DuplicateIndex, SignatureCache, doc_location, find_duplicates, jaccard,
+                              minhash, shingles, text_digest)
+from banga.search import fold
+
+THEMES = ["Greetings", "Health", "Market"]
+PHRASES = {"Greetings": ["How are you?", "Welcome"],
+           "Health": ["How are you today?", "Where does it hurt?"],
+           "Market": ["How much is this?", "Welcome"]}
+
+
+@pytest.fixture
+def phrase_data():
+    phrase_data = PhraseIndex.build(THEMES, PHRASES)
+    texts = {("Greetings", 0): "Wo ho te sɛn?", ("Health", 0): "Wo ho te sen nnɛ?",
+             ("Health", 1): "Ɛhe na ɛyɛ wo yaw?", ("Market", 0): "Ɛyɛ sɛn?"}
+    for (theme, position), text in texts.items():
+        phrase_data.edit(phrase_data.phrase_id(theme, position)).original = text
+    return phrase_data
+
+
+def build(phrase_data, tmp_path):
+    return DuplicateIndex.build(phrase_data, SignatureCache(tmp_path / "minhash.npz"))
+
+
+def groups_by_kind(report, phrase_data):
+    """kind -> list of groups, each the sorted (theme, phrase, version) of its members"""
+    grouped = {}
+    for group in report["groups"]:
+        members = []
+        for doc in group["docs"]:
+            phrase_id, version = doc_location(doc)
+            members.append((phrase_data.theme_of(phrase_id), phrase_data.phrase_text[phrase_id], version))
+        grouped.setdefault(group["kind"], []).append(sorted(members, key=str))
+    return grouped
+
+
+def test_signature_agreement_estimates_jaccard():
+    a, b = fold("Wo ho te sɛn? Me ho yɛ"), fold("Wo ho te sen? Me ho yɛ paa")
+    signatures = minhash([a, b, a])
+    assert signatures.shape == (3, NUM_PERM)
+    assert (signatures[0] == signatures[2]).all()
+    agreement = (signatures[0] == signatures[1]).mean()
+    assert agreement == pytest.approx(jaccard(shingles(a), shingles(b)), abs=0.2)
+
+
+def test_similar_texts_group_across_themes(phrase_data, tmp_path):
+    report = build(phrase_data, tmp_path).find(0.5)
+    grouped = groups_by_kind(report, phrase_data)
+    # "Welcome" is asked in two themes: the same text, similarity 1
+    assert [("Greetings", "Welcome", None), ("Market", "Welcome", None)] in grouped["phrase"]
+    assert grouped["transcription"] == [[("Greetings", "How are you?", "Original"),
+                                         ("Health", "How are you today?", "Original")]]
+    # Every reported pair really is that similar
+    for group in report["groups"]:
+        assert group["similarity"] >= 0.5
+
+
+def test_an_alternative_close_to_its_own_original_is_not_reported(phrase_data, tmp_path):
+    phrase_data.edit(phrase_data.phrase_id("Health", 1)).set(1, "Ɛhe na ɛyɛ wo yaw paa?")
+    report = build(phrase_data, tmp_path).find(0.5)
+    assert all(("Health", "Where does it hurt?", 1) not in group
+               for group in groups_by_kind(report, phrase_data)["transcription"])
+
+
+def test_edits_move_texts_between_groups(phrase_data, tmp_path):
+    index = build(phrase_data, tmp_path)
+    hurt = phrase_data.phrase_id("Health", 1)
+    phrase_data.edit(hurt).original = "Wo ho te sɛn?"
+    index.update(hurt, "Original", "Wo ho te sɛn?")
+    grouped = groups_by_kind(index.find(0.5), phrase_data)["transcription"]
+    assert [len(group) for group in grouped] == [3]
+    phrase_data.edit(hurt).original = ""
+    index.update(hurt, "Original", "")
+    assert [len(group) for group in groups_by_kind(index.find(0.5), phrase_data)["transcription"]] == [2]
+    # The index matches one built from scratch
+    rebuilt = build(phrase_data, tmp_path)
+    assert rebuilt.docs_of == index.docs_of
+    assert set(rebuilt.buckets) == set(index.buckets)
+
+
+def test_signatures_are_cached_by_text(phrase_data, tmp_path):
+    index = build(phrase_data, tmp_path)
+    cached = SignatureCache(tmp_path / "minhash.npz")
+    assert set(cached.signatures) == {text_digest(folded) for _, folded in index.docs_of}
+    digest = text_digest(fold("Wo ho te sɛn?"))
+    assert np.array_equal(cached.signatures[digest], index.signatures[("transcription", fold("Wo ho te sɛn?"))])
+
+
+def test_find_duplicates_indexes_phrases_listed_since(phrase_data, tmp_path):
+    index = build(phrase_data, tmp_path)
+    phrase_data.list_theme("Farming", ["Where does it hurt?"])
+    index, report = find_duplicates(index, phrase_data, 0.5)
+    assert index.phrase_count == len(phrase_data)
+    assert [("Farming", "Where does it hurt?", None), ("Health", "Where does it hurt?", None)] in \
+        groups_by_kind(report, phrase_data)["phrase"]
@@ -0,0 +1,73 @@
+"""Streaming JSONL, Parquet and Arrow exports, one row per transcribed version"""
+import json
+import wave
+
+import pytest
+
+from banga.data import PhraseIndex
+from banga.export import COLUMNS, export_format, export_versions, version_rows
+
+THEMES = ["Greetings"]
+PHRASES = {"Greetings": ["Welcome", "How are you?", "Goodbye"]}
+
+
+def corpus(tmp_path):
+    clip = tmp_path / "session.wav"
+    with wave.open(str(clip), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(bytes(2 * 8000 * 2))
+    phrase_data = PhraseIndex.build(THEMES, PHRASES)
+    welcome = phrase_data.edit(0)
+    welcome.original = "Akwaaba"
+    welcome.set(2, "Akwaaba o")
+    welcome.set(3, "")
+    welcome.audio = {"Original": str(clip), 2: f"{clip}#t=0.500,1.250"}
+    phrase_data.edit(1).original = "Wo ho te sɛn?"
+    return phrase_data, clip
+
+
+def test_one_row_per_transcribed_version(tmp_path):
+    phrase_data, clip = corpus(tmp_path)
+    assert list(version_rows(phrase_data)) == [
+        ("Greetings", "Welcome", 0, "Original", "Akwaaba", str(clip), 0.0, 2.0),
+        ("Greetings", "Welcome", 0, "Alternative 2", "Akwaaba o", str(clip), 0.5, 0.75),
+        ("Greetings", "How are you?", 0, "Original", "Wo ho te sɛn?", None, None, None),
+    ]
+
+
+def test_jsonl_manifest_leaves_out_missing_fields(tmp_path):
+    phrase_data, clip = corpus(tmp_path)
+    rows, _ = export_versions(phrase_data, tmp_path / "out" / "manifest.jsonl")
+    lines = (tmp_path / "out" / "manifest.jsonl").read_text(encoding="utf-8").splitlines()
+    assert rows == len(lines) == 3
+    assert json.loads(lines[1]) == {"theme": "Greetings", "phrase": "Welcome", "occurrence": 0,
+                                    "version": "Alternative 2", "text": "Akwaaba o",
+                                    "audio_filepath": str(clip), "offset": 0.5, "duration": 0.75}
+    assert json.loads(lines[2]) == {"theme": "Greetings", "phrase": "How are you?", "occurrence": 0,
+                                    "version": "Original", "text": "Wo ho te sɛn?"}
+
+
+@pytest.mark.parametrize("name", ["versions.parquet", "versions.arrow"])
+def test_columnar_exports_hold_every_row_across_chunks(tmp_path, name):
+    pa = pytest.importorskip("pyarrow")
+    phrase_data, _ = corpus(tmp_path)
+    path = tmp_path / name
+    rows, _ = export_versions(phrase_data, path, chunk_rows=2)
+    if export_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(path)
+        assert pq.ParquetFile(path).num_row_groups == 2
+    else:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+    assert rows == table.num_rows == 3
+    assert tuple(table.column_names) == COLUMNS
+    assert table.to_pylist()[1]["duration"] == 0.75
+
+
+def test_unknown_format(tmp_path):
+    phrase_data, _ = corpus(tmp_path)
+    with pytest.raises(ValueError):
+        export_versions(phrase_data, tmp_path / "versions.csv")
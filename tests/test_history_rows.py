@@ -0,0 +1,113 @@
+"""VirtualTreeRows: a window of the History rows, redrawn by diff"""
+from banga.app import VirtualTreeRows, history_display
+
+
+class FakeTree:
+    """Records the Treeview calls VirtualTreeRows makes"""
+
+    def __init__(self, height=5):
+        self.height = height
+        self.items = []  # [item id, values]
+        self.writes = 0
+        self.next_id = 0
+
+    def configure(self, **options):
+        pass
+
+    def bind(self, sequence, callback):
+        pass
+
+    def winfo_height(self):
+        return 1
+
+    def cget(self, option):
+        return self.height
+
+    def get_children(self):
+        return tuple(item for item, _ in self.items)
+
+    def insert(self, parent, index, values):
+        self.next_id += 1
+        self.items.append([f"I{self.next_id}", values])
+        self.writes += 1
+
+    def item(self, item, values):
+        self.items[self.index(item)][1] = values
+        self.writes += 1
+
+    def delete(self, *items):
+        self.items = [entry for entry in self.items if entry[0] not in items]
+
+    def index(self, item):
+        return self.get_children().index(item)
+
+    def selection_set(self, items):
+        pass
+
+    def shown(self):
+        return [values for _, values in self.items]
+
+
+class FakeScrollbar:
+    def configure(self, **options):
+        pass
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+def history_rows(count, changed=None):
+    return [(("Original", n), (f"Phrase {n}", "changed" if n == changed else f"Text {n}")) for n in range(count)]
+
+
+def test_only_the_visible_window_is_inserted():
+    tree, scrollbar = FakeTree(), FakeScrollbar()
+    rows = VirtualTreeRows(tree, scrollbar)
+    rows.set_rows(history_rows(1000))
+    assert tree.shown() == [values for _, values in history_rows(5)]
+    assert scrollbar.position == (0, 5 / 1000)
+    assert rows.key_for(tree.get_children()[2]) == ("Original", 2)
+
+
+def test_redraw_rewrites_only_rows_that_changed():
+    tree = FakeTree()
+    rows = VirtualTreeRows(tree, FakeScrollbar())
+    rows.set_rows(history_rows(1000))
+    tree.writes = 0
+    rows.set_rows(history_rows(1000, changed=3))
+    assert tree.writes == 1
+    rows.set_rows(history_rows(1000, changed=3))
+    assert tree.writes == 1
+
+
+def test_scrolling_moves_the_window():
+    tree, scrollbar = FakeTree(), FakeScrollbar()
+    rows = VirtualTreeRows(tree, scrollbar)
+    rows.set_rows(history_rows(20))
+    rows.scroll(3)
+    assert rows.keys == [("Original", n) for n in range(3, 8)]
+    rows.yview("moveto", "1.0")
+    assert rows.offset == 15
+    rows.yview("scroll", "-1", "pages")
+    assert rows.offset == 10
+    # Asking to show a row off screen scrolls to it
+    rows.set_rows(history_rows(20), show_index=2)
+    assert rows.keys[0] == ("Original", 2)
+
+
+def test_shorter_list_deletes_the_rows_left_over():
+    tree = FakeTree()
+    rows = VirtualTreeRows(tree, FakeScrollbar())
+    rows.set_rows(history_rows(20))
+    rows.scroll(10)
+    rows.set_rows(history_rows(2))
+    assert tree.shown() == [values for _, values in history_rows(2)]
+    assert rows.offset == 0
+    rows.set_rows([])
+    assert tree.shown() == []
+
+
+def test_history_display():
+    assert history_display("") == "No transcription"
+    assert history_display("Akwaaba") == "Akwaaba"
+    assert history_display("ɛ" * 60, 50) == "ɛ" * 50 + "..."
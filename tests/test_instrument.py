@@ -0,0 +1,78 @@
+"""Latency histograms, method wrapping and the Tk stall log"""
+import json
+import threading
+
+import pytest
+
+from banga.instrument import BUCKETS_PER_OCTAVE, LatencyHistogram, Profiler, bucket_bound
+
+
+class Store:
+    def save(self, value):
+        return value * 2
+
+    def load(self):
+        return "loaded"
+
+    def _private(self):
+        return "untimed"
+
+
+def test_percentiles_are_within_a_bucket():
+    histogram = LatencyHistogram()
+    for millis in range(1, 101):
+        histogram.record(millis / 1000)
+    assert histogram.count == 100
+    assert histogram.max == pytest.approx(0.1)
+    step = 2 ** (1 / BUCKETS_PER_OCTAVE)
+    for q, exact in [(0.5, 0.050), (0.95, 0.095), (0.99, 0.099)]:
+        assert exact <= histogram.percentile(q) <= exact * step
+    # The top percentile never passes the slowest call
+    assert histogram.percentile(1.0) == pytest.approx(0.1)
+
+
+def test_out_of_range_latencies_land_in_the_end_buckets():
+    histogram = LatencyHistogram()
+    histogram.record(0.0)
+    histogram.record(1e6)
+    assert histogram.counts[0] == 1 and histogram.counts[-1] == 1
+    assert LatencyHistogram().percentile(0.5) == 0.0
+    assert bucket_bound(BUCKETS_PER_OCTAVE - 1) == pytest.approx(2e-6)
+
+
+def test_instrument_times_public_methods_only():
+    profiler = Profiler()
+    store = profiler.instrument(Store(), "store", skip=("load",))
+    assert store.save(2) == 4
+    assert store.load() == "loaded"
+    assert store._private() == "untimed"
+    assert [name for name, _ in profiler.operations()] == ["store.save"]
+    assert profiler.histograms["store.save"].count == 1
+
+
+def test_a_raising_call_is_still_timed():
+    profiler = Profiler()
+    failing = profiler.wrap("job", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        failing()
+    assert profiler.histograms["job"].count == 1
+
+
+def test_stalls_name_the_slowest_tk_call(caplog):
+    profiler = Profiler(stall_ms=100)
+    profiler.tk_thread = threading.get_ident()
+    profiler.record("app.update_stats", 0.3)
+    profiler.record("app.save_to_excel", 0.02)
+    profiler.note_stall(0.35)
+    assert list(profiler.stalls)[0]["slowest_call"] == "app.update_stats"
+    assert "app.update_stats" in caplog.text
+
+
+def test_profile_saves_as_json_and_resets(tmp_path):
+    profiler = Profiler()
+    profiler.record("store.compact", 0.004)
+    path = profiler.save(tmp_path / "profiles" / "profile.json")
+    saved = json.loads(path.read_text())
+    assert saved["operations"]["store.compact"]["count"] == 1
+    profiler.reset()
+    assert profiler.operations() == [] and not profiler.stalls
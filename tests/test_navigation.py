@@ -0,0 +1,73 @@
+"""The queue of incomplete phrases keyboard navigation steps through"""
+from banga.data import PhraseIndex
+from banga.navigation import IncompleteQueue, is_incomplete
+
+THEMES = ["Greetings", "Health", "Market"]
+PHRASES = {"Greetings": ["Welcome", "How are you?", "Goodbye"],
+           "Health": ["Are you hungry?", "Where does it hurt?"],
+           "Market": ["How much is it?", "Too expensive"]}
+
+
+def transcribed(*done):
+    """A PhraseIndex with the Original of each (theme, position) in done filled in"""
+    phrase_data = PhraseIndex.build(THEMES, PHRASES)
+    for theme, position in done:
+        phrase_data.edit(phrase_data.phrase_id(theme, position)).original = "..."
+    return phrase_data
+
+
+def test_an_empty_alternative_keeps_a_phrase_incomplete():
+    phrase_data = transcribed(("Greetings", 0))
+    welcome = phrase_data.edit(phrase_data.phrase_id("Greetings", 0))
+    assert not is_incomplete(welcome)
+    welcome.set(1, "")
+    assert is_incomplete(welcome)
+    welcome.set(1, "Akwaaba o")
+    assert not is_incomplete(welcome)
+
+
+def test_next_continues_into_later_themes_and_wraps():
+    phrase_data = transcribed(("Greetings", 0), ("Greetings", 2), ("Health", 0), ("Health", 1), ("Market", 1))
+    queue = IncompleteQueue.build(phrase_data, THEMES)
+    assert (len(queue), queue.remaining("Greetings"), queue.remaining("Health")) == (2, 1, 0)
+    assert queue.next(THEMES, 0, 0) == (0, 1)
+    # Health has nothing left, so it is skipped
+    assert queue.next(THEMES, 0, 1) == (2, 0)
+    assert queue.next(THEMES, 2, 0) == (0, 1)
+    assert queue.next(THEMES, 2, 1, backwards=True) == (2, 0)
+    assert queue.next(THEMES, 2, 0, backwards=True) == (0, 1)
+
+
+def test_the_only_incomplete_phrase_comes_last():
+    phrase_data = transcribed(("Greetings", 0), ("Greetings", 2), ("Health", 0), ("Health", 1),
+                              ("Market", 0), ("Market", 1))
+    queue = IncompleteQueue.build(phrase_data, THEMES)
+    assert queue.next(THEMES, 0, 1) == (0, 1)
+    phrase_data.edit(phrase_data.phrase_id("Greetings", 1)).original = "..."
+    queue.update(phrase_data.phrase_id("Greetings", 1))
+    assert len(queue) == 0
+    assert queue.next(THEMES, 0, 1) is None
+
+
+def test_update_moves_a_phrase_in_and_out():
+    phrase_data = transcribed()
+    queue = IncompleteQueue.build(phrase_data, THEMES)
+    hurt = phrase_data.phrase_id("Health", 1)
+    phrase_data.edit(hurt).original = "Ɛhe na ɛyɛ wo yaw?"
+    queue.update(hurt)
+    queue.update(hurt)  # updating twice changes nothing
+    assert (list(queue.positions["Health"]), len(queue)) == ([0], 6)
+    phrase_data.edit(hurt).original = ""
+    queue.update(hurt)
+    assert (list(queue.positions["Health"]), len(queue)) == ([0, 1], 7)
+
+
+def test_themes_not_listed_yet_are_skipped_until_added():
+    phrase_data = PhraseIndex.build(THEMES[:1], {"Greetings": PHRASES["Greetings"]})
+    queue = IncompleteQueue.build(phrase_data, THEMES)
+    assert len(queue) == 3
+    assert queue.next(THEMES, 0, 2) == (0, 0)
+    phrase_data.list_theme("Health", PHRASES["Health"])
+    queue.add_theme("Health")
+    assert len(queue) == 5
+    assert queue.next(THEMES, 0, 2) == (1, 0)
@@ -0,0 +1,88 @@
+"""Batch conversion to 16 kHz mono: the streaming resampler and the process pool"""
+import multiprocessing
+import os
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from banga import audio
+from banga.audio import TARGET_RATE, StreamResampler, WavClip, load_peaks, normalize_clip, normalize_corpus
+
+
+def write_wav(path, samples, sample_rate):
+    """16-bit WAV of a (frames, channels) float array"""
+    samples = np.asarray(samples, dtype=np.float64).reshape(len(samples), -1)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(samples.shape[1])
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((samples * 32767).round().astype("<i2").tobytes())
+    return path
+
+
+def tone(seconds, sample_rate, channels=1):
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return np.repeat((0.5 * np.sin(2 * np.pi * 440 * t))[:, None], channels, axis=1)
+
+
+def normalize_or_die(source, cache_dir):
+    """normalize_clip, except the worker dies on a clip named crash.wav"""
+    if Path(source).name == "crash.wav":
+        os._exit(1)
+    return normalize_clip(source, cache_dir)
+
+
+@pytest.mark.parametrize("in_rate", [8000, 44100, 48000])
+def test_chunked_resampling_matches_one_shot(in_rate):
+    signal = np.random.default_rng(0).uniform(-1, 1, in_rate // 2).astype(np.float32)
+    whole = StreamResampler(in_rate, TARGET_RATE)
+    expected = np.concatenate([whole.feed(signal), whole.flush()])
+    chunked = StreamResampler(in_rate, TARGET_RATE)
+    parts = [chunked.feed(signal[start:start + 997]) for start in range(0, len(signal), 997)]
+    result = np.concatenate(parts + [chunked.flush()])
+    assert len(expected) == -(-len(signal) * TARGET_RATE // in_rate)
+    np.testing.assert_allclose(result, expected, atol=1e-6)
+
+
+def test_normalized_clip_is_16k_mono_and_cached_by_content(tmp_path):
+    source = write_wav(tmp_path / "clip.wav", tone(0.5, 44100, channels=2), 44100)
+    copy = write_wav(tmp_path / "copy.wav", tone(0.5, 44100, channels=2), 44100)
+    summary = normalize_corpus([source, copy], jobs=1, cache_dir=tmp_path / "normalized")
+    assert (summary["converted"], summary["cached"], summary["failed"]) == (1, 1, 0)
+    output = audio.NormalizedIndex(tmp_path / "normalized").lookup(source)
+    clip = WavClip(output)
+    try:
+        assert (clip.sample_rate, clip.channels, clip.frames) == (TARGET_RATE, 1, TARGET_RATE // 2)
+    finally:
+        clip.close()
+    # A rerun converts nothing
+    assert normalize_corpus([source, copy], jobs=1, cache_dir=tmp_path / "normalized")["cached"] == 2
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork",
+                    reason="workers must inherit the patched normalize_clip")
+def test_a_dead_worker_fails_only_its_clip(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio, "normalize_clip", normalize_or_die)
+    sources = [write_wav(tmp_path / f"clip{n}.wav", tone(0.1 * (n + 1), 22050), 22050) for n in range(4)]
+    sources.insert(1, write_wav(tmp_path / "crash.wav", tone(0.1, 22050), 22050))
+    reported = {}
+    summary = normalize_corpus(sources, jobs=2, cache_dir=tmp_path / "normalized",
+                               progress=lambda done, total, source, error: reported.update({source.name: error}))
+    assert (summary["clips"], summary["converted"], summary["failed"]) == (5, 4, 1)
+    assert sorted(reported) == sorted(source.name for source in sources)
+    assert [name for name, error in reported.items() if error is not None] == ["crash.wav"]
+    # What was converted is kept
+    index = audio.NormalizedIndex(tmp_path / "normalized")
+    assert all(index.lookup(source) for source in sources if source.name != "crash.wav")
+
+
+def test_peaks_are_drawn_from_the_normalized_copy(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio, "PEAKS_CACHE_DIR", tmp_path / "peaks")
+    source = write_wav(tmp_path / "clip.wav", tone(0.5, 48000, channels=2), 48000)
+    assert load_peaks(source, tmp_path / "normalized").sample_rate == 48000
+    normalize_corpus([source], jobs=1, cache_dir=tmp_path / "normalized")
+    peaks = load_peaks(source, tmp_path / "normalized")
+    assert peaks.sample_rate == TARGET_RATE
+    assert peaks.duration == pytest.approx(0.5)
@@ -0,0 +1,126 @@
+"""Akan orthography: normal forms, the batched check, and fixing only when asked"""
+import json
+import unicodedata
+
+import pandas as pd
+import pytest
+
+from banga import orthography
+from banga.__main__ import main
+from banga.data import PhraseIndex, TranscriptionStore
+from banga.orthography import SEPARATOR, OrthographyCheck, check, check_many, describe, normalize
+from banga.undo import EditLog, undo_log_path
+
+TEXTS = [
+    "Wo ho te sɛn?",
+    "Wo ho te s\u03b5n?",  # Greek epsilon for ɛ
+    "  Akwaaba\u00a0 o\u200b ",  # no-break and zero-width spaces
+    unicodedata.normalize("NFD", "Mé ho yɛ"),
+    "Ɛhe na \u0454yɛ wo yaw?",  # Cyrillic є
+    "Quick fix",  # q and x are not Akan letters
+    "\u025b\u0301 n\u0301 b\u0301",  # a tone mark on b
+    "Mepa wo kyɛw \u263a",
+    "",
+    f"Two{SEPARATOR}parts",
+]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Wo ho te s\u03b5n?", "Wo ho te sɛn?"),
+    ("  Akwaaba\u00a0 o\u200b ", "Akwaaba o"),
+    (unicodedata.normalize("NFD", "Mé ho yɛ"), "Mé ho yɛ"),
+    ("\u039fdo", "Odo"),
+])
+def test_normal_forms(text, expected):
+    assert normalize(text) == expected
+    assert normalize(expected) == expected
+
+
+def test_problems_are_named_by_kind():
+    _, problems = check("Quick fix \u263a b\u0301")
+    assert problems == (("letter", "Q"), ("letter", "c"), ("letter", "x"), ("symbol", "\u263a"), ("mark", "\u0301"))
+    assert describe(problems) == ("letters outside the Akan alphabet: Q, c, x; unexpected symbols: \u263a; "
+                                  "misplaced tone marks: \u25cc\u0301")
+    assert describe((), unnormalized=True) == "not in normal form"
+    assert check("Ɛ́nnɛ yɛ dá pa")[1] == ()
+
+
+@pytest.mark.parametrize("batch", [1, 3, 1024])
+def test_check_many_matches_check(monkeypatch, batch):
+    monkeypatch.setattr(orthography, "BATCH", batch)
+    normalized, found = check_many(TEXTS)
+    expected = [check(text) for text in TEXTS]
+    assert normalized == [text for text, _ in expected]
+    assert found == {index: problems for index, (_, problems) in enumerate(expected) if problems}
+
+
+def bank():
+    phrase_data = PhraseIndex.build(["Greetings"], {"Greetings": ["How are you?", "Welcome", "Goodbye"]})
+    phrase_data.edit(0).original = "Wo ho te s\u03b5n?"
+    phrase_data.edit(0).set(1, "Wo ho yɛ?")
+    phrase_data.edit(1).original = "Akwaaba"
+    phrase_data.edit(2).original = "Quick  bye"
+    return phrase_data
+
+
+def test_the_check_only_reports():
+    phrase_data = bank()
+    before = phrase_data.snapshot()
+    check = OrthographyCheck.build(phrase_data)
+    assert phrase_data.snapshot() == before
+    assert check.checked == 4
+    assert check.changes() == [(0, "Original", "Wo ho te sɛn?"), (2, "Original", "Quick bye")]
+    assert check.rows() == [(0, "Original", (), True), (2, "Original", (("letter", "Q"), ("letter", "c")), True)]
+
+
+def test_an_edit_moves_a_version_out_of_the_report():
+    phrase_data = bank()
+    check = OrthographyCheck.build(phrase_data)
+    phrase_data.edit(0).original = "Wo ho te sɛn?"
+    check.update(0)
+    assert check.changes() == [(2, "Original", "Quick bye")]
+    phrase_data.edit(1).set(2, "Akwaaba\u200b")
+    check.update(1)
+    assert check.changes() == [(1, 2, "Akwaaba"), (2, "Original", "Quick bye")]
+
+
+def corpus(tmp_path):
+    """A question bank and a store holding transcriptions typed before normalization"""
+    questions = tmp_path / "questions.xlsx"
+    with pd.ExcelWriter(questions) as writer:
+        pd.DataFrame({"Question": ["How are you?", "Welcome"]}).to_excel(writer, sheet_name="Greetings", index=False)
+    metadata_dir = tmp_path / "metadata"
+    store = TranscriptionStore(metadata_dir)
+    phrase_data = store.load(PhraseIndex.build(["Greetings"], {"Greetings": ["How are you?", "Welcome"]}))
+    phrase_data.edit(0).original = "Wo ho te s\u03b5n?"
+    phrase_data.edit(1).original = "Akwaaba"
+    store.compact()
+    store.close()
+    return ["--questions", str(questions), "--metadata-dir", str(metadata_dir)], metadata_dir
+
+
+def stored_texts(metadata_dir):
+    phrase_data = TranscriptionStore(metadata_dir).load(
+        PhraseIndex.build(["Greetings"], {"Greetings": ["How are you?", "Welcome"]}))
+    return [phrase_data[0].original, phrase_data[1].original], phrase_data
+
+
+def test_the_command_only_reads_without_fix(tmp_path, capsys):
+    options, metadata_dir = corpus(tmp_path)
+    files = sorted(path.name for path in metadata_dir.iterdir())
+    main(options + ["orthography", "--json"])
+    report = json.loads(capsys.readouterr().out)
+    assert (report["unnormalized"], report["fixed"]) == (1, 0)
+    assert report["problems"][0]["unnormalized"] is True
+    assert sorted(path.name for path in metadata_dir.iterdir()) == files
+    assert stored_texts(metadata_dir)[0] == ["Wo ho te s\u03b5n?", "Akwaaba"]
+
+
+def test_fix_saves_normal_forms_as_undoable_edits(tmp_path, capsys):
+    options, metadata_dir = corpus(tmp_path)
+    main(options + ["orthography", "--fix"])
+    assert "Saved in normal form: 1" in capsys.readouterr().out
+    texts, phrase_data = stored_texts(metadata_dir)
+    assert texts == ["Wo ho te sɛn?", "Akwaaba"]
+    edit_log = EditLog(undo_log_path(metadata_dir)).load(phrase_data)
+    assert edit_log.next_undo() == (0, "Original", "Wo ho te s\u03b5n?", "Wo ho te sɛn?")
@@ -0,0 +1,61 @@
+"""PhraseIndex: stable IDs in question-bank order, one per occurrence of a phrase"""
+from banga.data import PhraseIndex
+
+THEMES = ["Greetings", "Health"]
+PHRASES = {"Greetings": ["Welcome", "How are you?", "Welcome"], "Health": ["Are you hungry?"]}
+
+
+def test_ids_follow_the_question_bank():
+    index = PhraseIndex.build(THEMES, PHRASES)
+    assert len(index) == 4
+    assert [index.key(phrase_id) for phrase_id in range(len(index))] == [
+        ("Greetings", "Welcome", 0), ("Greetings", "How are you?", 0), ("Greetings", "Welcome", 1),
+        ("Health", "Are you hungry?", 0)]
+    assert [index.phrase_id("Greetings", position) for position in range(3)] == [0, 1, 2]
+    assert index.phrase_id("Health", 0) == 3
+    assert index.theme_of(3) == "Health"
+
+
+def test_lookup_finds_each_occurrence():
+    index = PhraseIndex.build(THEMES, PHRASES)
+    assert index.lookup("Greetings", "Welcome") == 0
+    assert index.lookup("Greetings", "Welcome", 1) == 2
+    assert index.lookup("Greetings", "Welcome", 2, create=False) is None
+    assert index.lookup("Unknown", "Welcome", create=False) is None
+    assert len(index) == 4
+
+
+def test_phrases_only_in_saved_data_are_indexed_but_not_listed():
+    index = PhraseIndex.build(THEMES, PHRASES)
+    # Asking for a third occurrence indexes it, and any missing one before it
+    phrase_id = index.lookup("Health", "Where does it hurt?", 1)
+    assert phrase_id == 5
+    assert index.key(4) == ("Health", "Where does it hurt?", 0)
+    assert list(index.theme_phrase_ids[1]) == [3]
+    new_theme = index.lookup("Farming", "Did it rain?")
+    assert index.theme_of(new_theme) == "Farming"
+    assert list(index.theme_phrase_ids[index.theme_ids["Farming"]]) == []
+
+
+def test_snapshot_is_a_copy():
+    index = PhraseIndex.build(THEMES, PHRASES)
+    index.edit(0).original = "Akwaaba"
+    index.edit(0).set(1, "Akwaaba o")
+    rows = index.snapshot()
+    assert rows[0] == (("Greetings", "Welcome", 0), "Akwaaba", {1: "Akwaaba o"})
+    assert rows[1] == (("Greetings", "How are you?", 0), "", {})
+    index.edit(0).set(1, "changed")
+    assert rows[0][2] == {1: "Akwaaba o"}
+
+
+def test_copy_is_independent():
+    index = PhraseIndex.build(THEMES, PHRASES)
+    index.edit(0).original = "Akwaaba"
+    index.edit(0).audio = {"Original": "clips/welcome.wav"}
+    copy = index.copy()
+    index.edit(0).original = "Akwaaba o"
+    index.edit(0).audio["Original"] = "clips/other.wav"
+    index.lookup("Health", "Where does it hurt?")
+    assert (copy[0].original, copy[0].audio) == ("Akwaaba", {"Original": "clips/welcome.wav"})
+    assert len(copy) == 4
+    assert copy.key(3) == ("Health", "Are you hungry?", 0)
@@ -0,0 +1,45 @@
+"""Lazy question-bank loading: the first theme up front, the rest later, then from the cache"""
+import pandas as pd
+import pytest
+
+from banga import data
+from banga.data import PhraseIndex, finish_question_bank, open_question_bank
+
+SHEETS = {"Greetings": ["Welcome", "How are you?"], "Health": ["Are you hungry?", "Welcome"]}
+
+
+@pytest.fixture
+def question_bank(tmp_path, monkeypatch):
+    monkeypatch.setattr(data, "PHRASES_CACHE_PATH", tmp_path / "cache" / "phrases.json")
+    path = tmp_path / "questions.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        for theme, phrases in SHEETS.items():
+            pd.DataFrame({"Question": phrases}).to_excel(writer, sheet_name=theme, index=False)
+    return path
+
+
+def test_first_theme_then_the_rest(question_bank):
+    themes, phrases, remaining = open_question_bank(question_bank)
+    assert themes == ["Greetings", "Health"]
+    assert phrases == {"Greetings": SHEETS["Greetings"]}
+    assert remaining == ["Health"]
+
+    parsed = finish_question_bank(question_bank, themes, phrases, remaining)
+    assert parsed == {"Health": SHEETS["Health"]}
+    assert phrases == {"Greetings": SHEETS["Greetings"]}
+    # The next start is served whole from the cache
+    assert open_question_bank(question_bank) == (themes, SHEETS, [])
+
+
+def test_listing_a_theme_later_adopts_ids_indexed_from_saved_data(question_bank):
+    themes, phrases, remaining = open_question_bank(question_bank)
+    index = PhraseIndex.build(themes, phrases)
+    assert index.is_listed("Greetings") and not index.is_listed("Health")
+    # Saved transcriptions can reach a theme before its sheet is parsed
+    hungry = index.lookup("Health", "Are you hungry?")
+    index.edit(hungry).original = "Ɔkɔm de wo?"
+
+    index.list_theme("Health", finish_question_bank(question_bank, themes, phrases, remaining)["Health"])
+    assert index.phrase_id("Health", 0) == hungry
+    assert index[index.phrase_id("Health", 0)].original == "Ɔkɔm de wo?"
+    assert index.key(index.phrase_id("Health", 1)) == ("Health", "Welcome", 0)
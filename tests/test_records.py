@@ -0,0 +1,32 @@
+"""PhraseRecord slots and the records PhraseIndex creates on first write"""
+import pytest
+
+from banga.data import EMPTY_RECORD, MAX_ALTERNATIVES, PhraseIndex, PhraseRecord
+
+
+def test_alternative_slots():
+    record = PhraseRecord()
+    assert record.is_empty()
+    record.set(2, "")
+    # An alternative created but not transcribed yet exists; one never created does not
+    assert record.alternative_numbers() == [2]
+    assert (record.get(1), record.get(2)) == ("", "")
+    assert not record.is_empty()
+    record.set("Original", "Akwaaba")
+    record.set(MAX_ALTERNATIVES, "Akwaaba o")
+    assert record.get("Original") == "Akwaaba"
+    assert record.alternatives() == {2: "", MAX_ALTERNATIVES: "Akwaaba o"}
+    with pytest.raises(ValueError):
+        record.set(MAX_ALTERNATIVES + 1, "one too many")
+    with pytest.raises(AttributeError):
+        record.notes = "slotted records take no other attributes"
+
+
+def test_records_are_created_on_first_write():
+    index = PhraseIndex.build(["Greetings"], {"Greetings": ["Welcome", "How are you?"]})
+    assert index.records == [None, None]
+    assert index[0] is EMPTY_RECORD and index[1] is EMPTY_RECORD
+    index.edit(1).set("Original", "Wo ho te sɛn?")
+    assert index.records[0] is None
+    assert index[1] is index.edit(1) is not EMPTY_RECORD
+    assert EMPTY_RECORD.is_empty()
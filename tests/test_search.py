@@ -0,0 +1,70 @@
+"""Trigram search: folding, stale postings after edits, and compaction"""
+from banga.data import PhraseIndex
+from banga.search import SearchIndex, fold
+
+THEMES = ["Greetings", "Health"]
+PHRASES = {"Greetings": ["Welcome", "How are you?"], "Health": ["Are you hungry?"]}
+
+
+def corpus():
+    phrase_data = PhraseIndex.build(THEMES, PHRASES)
+    phrase_data.edit(0).original = "Akwaaba"
+    phrase_data.edit(1).original = "Wo ho te sɛn?"
+    phrase_data.edit(1).set(1, "Ɛte sɛn?")
+    return phrase_data
+
+
+def test_fold_ignores_case_tone_marks_and_open_vowels():
+    assert fold("Ɛyɛ̀ FÉ!") == fold("eye fe") == "eye fe"
+
+
+def test_hits_name_the_phrase_and_version():
+    index = SearchIndex.build(corpus())
+    assert index.search("akwaaba") == [(0, "Original")]
+    # The exact hit comes first, then the Original as a loose one
+    assert index.search("ete sen") == [(1, 1), (1, "Original")]
+    assert index.search("hungry") == [(2, None)]
+    # Short queries match word beginnings only
+    assert index.search("ak") == [(0, "Original")]
+    assert index.search("wa") == []
+
+
+def test_stale_postings_never_surface_after_edits():
+    phrase_data = corpus()
+    index = SearchIndex.build(phrase_data)
+    phrase_data.edit(0).original = "Akwaaba o"
+    index.update(0, "Original", "Akwaaba o")
+    phrase_data.edit(1).original = "Wo ho yɛ?"
+    index.update(1, "Original", "Wo ho yɛ?")
+    assert index.stale > 0
+    assert index.search("ho te") == []
+    assert index.search("ho ye") == [(1, "Original")]
+    # Changing a text back re-adds postings the document still has; it is still one hit
+    index.update(1, "Original", "Wo ho te sɛn?")
+    assert index.search("wo ho") == [(1, "Original")]
+    index.update(0, "Original", "")
+    assert index.search("akwaaba") == []
+
+
+def test_compact_drops_stale_postings_and_keeps_hits():
+    index = SearchIndex.build(corpus())
+    index.update(1, "Original", "Wo ho yɛ?")
+    before = {query: index.search(query) for query in ("wo ho", "sen", "welcome", "ye")}
+    index.compact()
+    assert index.stale == 0
+    assert {query: index.search(query) for query in before} == before
+    assert all(index.texts.get(doc) for posting in index.postings.values() for doc in posting)
+
+
+def test_loose_hits_fill_in_after_exact_ones():
+    index = SearchIndex.build(corpus())
+    assert index.search("akwaabu") == [(0, "Original")]
+
+
+def test_phrases_added_later_are_picked_up_by_sync():
+    phrase_data = corpus()
+    index = SearchIndex.build(phrase_data)
+    phrase_id = phrase_data.lookup("Health", "Did you sleep well?")
+    phrase_data.edit(phrase_id).original = "Wodae yiye?"
+    index.sync(phrase_data)
+    assert index.search("wodae") == [(phrase_id, "Original")]
@@ -0,0 +1,60 @@
+"""Energy-based speech segments, from frame energies and from WAV files"""
+import wave
+
+import numpy as np
+
+from banga import audio
+from banga.audio import VAD_PAD, WavClip, detect_segments, frame_energies, load_segments
+
+FRAME = 0.02
+
+
+def energies(*spans):
+    """Per-frame dBFS: -60 by default, with (start s, end s, level) spans"""
+    levels = np.full(int(10 / FRAME), -60.0, dtype=np.float32)
+    for start, end, level in spans:
+        levels[int(start / FRAME):int(end / FRAME)] = level
+    return levels
+
+
+def test_speech_above_the_noise_floor_is_padded():
+    assert detect_segments(energies((2.0, 3.0, -20.0)), FRAME) == [(2.0 - VAD_PAD, 3.0 + VAD_PAD)]
+
+
+def test_silence_has_no_segments():
+    assert detect_segments(energies(), FRAME) == []
+    assert detect_segments(np.zeros(0, dtype=np.float32), FRAME) == []
+
+
+def test_short_pauses_are_bridged_and_short_bursts_dropped():
+    segments = detect_segments(energies((1.0, 2.0, -20.0), (2.2, 3.0, -20.0), (6.0, 6.1, -20.0)), FRAME)
+    assert segments == [(1.0 - VAD_PAD, 3.0 + VAD_PAD)]
+
+
+def test_hysteresis_keeps_speech_on_between_the_levels():
+    # Starts loud, then dips to a level between the stop and start thresholds
+    segments = detect_segments(energies((1.0, 1.5, -20.0), (1.5, 3.0, -52.0)), FRAME)
+    assert segments == [(1.0 - VAD_PAD, 3.0 + VAD_PAD)]
+
+
+def test_segments_of_a_wav_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio, "SEGMENTS_CACHE_DIR", tmp_path / "segments")
+    rate = 8000
+    samples = np.zeros(rate * 4, dtype=np.float64)
+    t = np.arange(rate) / rate
+    samples[rate:2 * rate] = 0.5 * np.sin(2 * np.pi * 300 * t)
+    path = tmp_path / "session.wav"
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes((samples * 32767).round().astype("<i2").tobytes())
+
+    clip = WavClip(path)
+    try:
+        levels, frame_seconds = frame_energies(clip, frames_per_block=7)
+        assert len(levels) == 200 and frame_seconds == FRAME
+    finally:
+        clip.close()
+    assert load_segments(path, tmp_path / "normalized") == [(1.0 - VAD_PAD, 2.0 + VAD_PAD)]
+    assert list(audio.SEGMENTS_CACHE_DIR.iterdir())
@@ -0,0 +1,63 @@
+"""Per-theme shards: only themes edited since the last save are written"""
+import pandas as pd
+
+from banga.data import PhraseIndex, TranscriptionStore, shard_path
+
+THEMES = ["Greetings", "Health", "Farming"]
+PHRASES = {"Greetings": ["Welcome", "How are you?"], "Health": ["Are you hungry?"], "Farming": ["Did it rain?"]}
+
+
+def open_store(directory):
+    store = TranscriptionStore(directory)
+    store.load(PhraseIndex.build(THEMES, PHRASES))
+    return store
+
+
+def test_only_edited_themes_are_taken(tmp_path):
+    store = open_store(tmp_path)
+    assert store.take_dirty_shards() == {}
+    store.record(0, "Original", "Akwaaba")
+    store.record(1, "Original", "Wo ho te sɛn?")
+    store.record(2, "Original", "Ɔkɔm de wo?")
+    shards = store.take_dirty_shards()
+    assert sorted(shards) == ["Greetings", "Health"]
+    assert shards["Greetings"] == [(("Greetings", "How are you?", 0), "Wo ho te sɛn?", {}),
+                                   (("Greetings", "Welcome", 0), "Akwaaba", {})]
+    assert store.take_dirty_shards() == {}
+    # A failed write hands the themes back
+    store.mark_dirty(shards)
+    assert sorted(store.take_dirty_shards()) == ["Greetings", "Health"]
+
+
+def test_shards_are_written_with_their_own_alternative_columns(tmp_path):
+    store = open_store(tmp_path)
+    store.record(0, "Original", "Akwaaba")
+    store.record(0, 2, "Akwaaba o")
+    store.record(2, "Original", "Ɔkɔm de wo?")
+    themes, rows, _ = store.write_shards(store.take_dirty_shards())
+    assert (themes, rows) == (2, 3)
+    greetings = pd.read_excel(shard_path(tmp_path, "Greetings"))
+    assert list(greetings.columns) == ["Theme", "Phrase", "Original_Transcription",
+                                       "Alternative_1_Transcription", "Alternative_2_Transcription"]
+    assert greetings.set_index("Phrase").loc["Welcome", "Alternative_2_Transcription"] == "Akwaaba o"
+    health = pd.read_excel(shard_path(tmp_path, "Health"))
+    assert list(health.columns) == ["Theme", "Phrase", "Original_Transcription"]
+
+
+def test_unwritten_shards_survive_a_restart(tmp_path):
+    store = open_store(tmp_path)
+    store.record(0, "Original", "Akwaaba")
+    store.record(3, "Original", "Osu tɔe?")
+    store.write_shards({theme: rows for theme, rows in store.take_dirty_shards().items() if theme == "Farming"})
+    store.record(2, "Original", "Ɔkɔm de wo?")
+    # Folding the journal into the snapshot keeps the themes still to write
+    store.compact()
+    store.close()
+    assert open_store(tmp_path).dirty_themes == {"Greetings", "Health"}
+
+
+def test_shard_names_are_safe_and_distinct(tmp_path):
+    first, second = shard_path(tmp_path, "Health / Body"), shard_path(tmp_path, "Health: Body")
+    assert first != second
+    assert first.parent == tmp_path / "themes"
+    assert first.name.startswith("Health_Body-") and first.suffix == ".xlsx"
@@ -0,0 +1,94 @@
+"""Three-way workbook merges, and the SQLite store several instances write to at once"""
+import pytest
+
+from banga.data import PhraseIndex, TranscriptionStore
+from banga.shared import EditConflict, SharedStore
+
+THEMES = ["Greetings"]
+PHRASES = {"Greetings": ["Welcome", "How are you?", "Goodbye"]}
+BASE = {("Greetings", "Welcome", 0, "Original"): "Akwaaba",
+        ("Greetings", "How are you?", 0, "Original"): "Wo ho te sɛn?",
+        ("Greetings", "Goodbye", 0, "Original"): "Nante yie"}
+
+
+def open_shared(directory, annotator):
+    store = SharedStore(directory, annotator=annotator)
+    store.load(PhraseIndex.build(THEMES, PHRASES))
+    return store
+
+
+def seeded_journal(tmp_path):
+    store = TranscriptionStore(tmp_path)
+    phrase_data = store.load(PhraseIndex.build(THEMES, PHRASES))
+    for (_, phrase, _, version), text in BASE.items():
+        phrase_data.edit(phrase_data.lookup("Greetings", phrase)).set(version, text)
+    store.compact()
+    return store
+
+
+def test_three_way_takes_theirs_keeps_ours_and_reports_conflicts(tmp_path):
+    store = seeded_journal(tmp_path)
+    store.record(1, "Original", "Wo ho yɛ?")     # changed here only
+    store.record(2, "Original", "Nante yiye")    # changed on both sides
+    rows = [("Greetings", "Welcome", 0, {"Original": "Akwaaba o", 1: "Akwaaba"}),
+            ("Greetings", "How are you?", 0, {"Original": "Wo ho te sɛn?"}),
+            ("Greetings", "Goodbye", 0, {"Original": "Nante yie o"})]
+    counts, conflicts, theirs = store.merge_three_way(rows, BASE)
+    assert (counts["overwritten"], counts["filled"], counts["kept"], counts["conflicts"]) == (1, 1, 1, 1)
+    assert conflicts == [(("Greetings", "Goodbye", 0, "Original"), "Nante yiye", "Nante yie o", "Nante yie")]
+    assert [store.phrase_data[phrase_id].original for phrase_id in range(3)] == [
+        "Akwaaba o", "Wo ho yɛ?", "Nante yiye"]
+    assert store.phrase_data[0].get(1) == "Akwaaba"
+    assert theirs[("Greetings", "Welcome", 0, 1)] == "Akwaaba"
+    # The merge is persisted
+    assert TranscriptionStore(tmp_path).load(PhraseIndex.build(THEMES, PHRASES))[0].original == "Akwaaba o"
+
+
+def test_three_way_without_a_base_only_fills_empty_versions(tmp_path):
+    store = seeded_journal(tmp_path)
+    rows = [("Greetings", "Welcome", 0, {"Original": "Akwaaba o", 2: "Akwaaba"})]
+    counts, conflicts, _ = store.merge_three_way(rows, {})
+    assert (counts["filled"], counts["conflicts"]) == (1, 1)
+    assert store.phrase_data[0].original == "Akwaaba"
+
+
+def test_a_stale_edit_conflicts_until_forced(tmp_path):
+    ama, kofi = open_shared(tmp_path, "ama"), open_shared(tmp_path, "kofi")
+    ama.record(0, "Original", "Akwaaba")
+    with pytest.raises(EditConflict) as conflict:
+        kofi.record(0, "Original", "Akwaaba o")
+    assert (conflict.value.text, conflict.value.modified_by) == ("Akwaaba", "ama")
+    assert kofi.phrase_data[0].original == ""
+    assert kofi.poll() == [0]
+    assert kofi.phrase_data[0].original == "Akwaaba"
+    kofi.record(0, "Original", "Akwaaba o")
+    ama.record(0, "Original", "Akwaaba!", force=True)
+    assert open_shared(tmp_path, "yaw").phrase_data[0].original == "Akwaaba!"
+
+
+def test_a_merge_in_one_instance_does_not_clobber_an_edit_in_another(tmp_path):
+    ama, kofi = open_shared(tmp_path, "ama"), open_shared(tmp_path, "kofi")
+    ama.record(0, "Original", "Akwaaba")
+    # Kofi has not seen Ama's edit when a workbook changing the same version arrives
+    rows = [("Greetings", "Welcome", 0, {"Original": "Akwaaba o"}),
+            ("Greetings", "How are you?", 0, {"Original": "Wo ho te sɛn?"})]
+    counts, conflicts, _ = kofi.merge_three_way(rows, {})
+    assert (counts["filled"], counts["conflicts"]) == (1, 1)
+    assert conflicts == [(("Greetings", "Welcome", 0, "Original"), "Akwaaba", "Akwaaba o", None)]
+    stored = open_shared(tmp_path, "yaw").phrase_data
+    assert (stored[0].original, stored[1].original) == ("Akwaaba", "Wo ho te sɛn?")
+
+    counts = kofi.merge_rows([("Greetings", "Welcome", 0, {"Original": "Akwaaba o"})], overwrite=True)
+    assert counts["conflicts"] == 1
+    assert open_shared(tmp_path, "yaw").phrase_data[0].original == "Akwaaba"
+
+
+def test_compact_leaves_versions_stored_meanwhile_alone(tmp_path):
+    ama, kofi = open_shared(tmp_path, "ama"), open_shared(tmp_path, "kofi")
+    kofi.phrase_data.edit(0).original = "Akwaaba o"
+    kofi.phrase_data.edit(1).original = "Wo ho te sɛn?"
+    ama.record(0, "Original", "Akwaaba")
+    skipped = kofi.compact()
+    assert [(conflict.phrase_id, conflict.text) for conflict in skipped] == [(0, "Akwaaba")]
+    stored = open_shared(tmp_path, "yaw").phrase_data
+    assert (stored[0].original, stored[1].original) == ("Akwaaba", "Wo ho te sɛn?")
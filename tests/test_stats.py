@@ -0,0 +1,44 @@
+"""TranscriptionStats: counters kept edit by edit match a recount from scratch"""
+from banga.data import PhraseIndex, TranscriptionStats, TranscriptionStore
+
+
+def recount(phrase_data):
+    stats = TranscriptionStats()
+    stats.rebuild(phrase_data)
+    return stats
+
+
+def test_running_counters_match_a_recount(tmp_path):
+    store = TranscriptionStore(tmp_path)
+    store.load(PhraseIndex())
+    edits = [
+        ("Greetings", "Welcome", "Original", "Akwaaba"),
+        ("Greetings", "Welcome", 1, "Akwaaba o"),
+        ("Greetings", "Welcome", "Original", "Akwaaba!"),  # longer text, same count
+        ("Health", "Are you hungry?", "Original", "Ɔkɔm de wo?"),
+        ("Health", "Are you hungry?", 2, ""),  # an alternative created empty
+        ("Greetings", "Welcome", 1, ""),  # cleared
+    ]
+    for theme, phrase, version, text in edits:
+        store.record(store.phrase_data.lookup(theme, phrase), version, text)
+        expected = recount(store.phrase_data)
+        assert store.stats.totals == expected.totals
+        for theme in ("Greetings", "Health"):
+            assert store.stats.theme_counts(theme) == expected.theme_counts(theme)
+
+    assert store.stats.totals == {"originals": 2, "alternatives": 0, "chars": len("Akwaaba!") + len("Ɔkɔm de wo?")}
+    assert store.stats.theme_counts("Health")["originals"] == 1
+    assert store.stats.theme_counts("Unknown theme") == {}
+    store.close()
+
+
+def test_counters_are_rebuilt_on_load(tmp_path):
+    store = TranscriptionStore(tmp_path)
+    store.load(PhraseIndex())
+    store.record(store.phrase_data.lookup("Greetings", "Welcome"), "Original", "Akwaaba")
+    store.record(store.phrase_data.lookup("Greetings", "Welcome"), 1, "Akwaaba o")
+    store.close()
+
+    reloaded = TranscriptionStore(tmp_path)
+    reloaded.load(PhraseIndex())
+    assert reloaded.stats.totals == {"originals": 1, "alternatives": 1, "chars": 16}
@@ -0,0 +1,77 @@
+"""TranscriptionStore: journal replay, torn appends and compaction"""
+import json
+
+from banga.data import PhraseIndex, TranscriptionStore
+
+
+def reopen(directory):
+    store = TranscriptionStore(directory)
+    store.load(PhraseIndex())
+    return store
+
+
+def record(store, theme, phrase, version, text, occurrence=0):
+    store.record(store.phrase_data.lookup(theme, phrase, occurrence), version, text)
+
+
+def texts(store):
+    return {key: (original, alternatives) for key, original, alternatives in store.phrase_data.snapshot()}
+
+
+def test_journal_replays_edits_in_order(tmp_path):
+    store = reopen(tmp_path)
+    record(store, "Greetings", "Welcome", "Original", "Akwaba")
+    record(store, "Greetings", "Welcome", "Original", "Akwaaba")
+    record(store, "Greetings", "Welcome", 2, "Akwaaba o")
+    # The second occurrence of a repeated question is kept apart from the first
+    record(store, "Greetings", "Welcome", "Original", "Akwaaba bio", occurrence=1)
+    store.close()
+
+    assert texts(reopen(tmp_path)) == {("Greetings", "Welcome", 0): ("Akwaaba", {2: "Akwaaba o"}),
+                                       ("Greetings", "Welcome", 1): ("Akwaaba bio", {})}
+
+
+def test_torn_final_line_is_skipped_and_not_appended_to(tmp_path):
+    store = reopen(tmp_path)
+    record(store, "Greetings", "Welcome", "Original", "Akwaaba")
+    store.close()
+    # An append interrupted halfway through its line
+    with open(store.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"theme": "Greetings", "phrase": "Wel')
+
+    store = reopen(tmp_path)
+    assert texts(store) == {("Greetings", "Welcome", 0): ("Akwaaba", {})}
+    record(store, "Health", "Are you hungry?", "Original", "Ɔkɔm de wo?")
+    store.close()
+
+    assert texts(reopen(tmp_path)) == {("Greetings", "Welcome", 0): ("Akwaaba", {}),
+                                       ("Health", "Are you hungry?", 0): ("Ɔkɔm de wo?", {})}
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(tmp_path):
+    store = reopen(tmp_path)
+    record(store, "Greetings", "Welcome", "Original", "Akwaaba")
+    record(store, "Greetings", "How are you?", 1, "Wo ho te sɛn?")
+    with open(store.journal_path, "a", encoding="utf-8") as f:
+        f.write('{"theme": "Greet')
+    store.close()
+
+    store = reopen(tmp_path)
+    store.compact()
+    store.close()
+    assert store.journal_path.read_text(encoding="utf-8") == ""
+    with open(store.snapshot_path, encoding="utf-8") as f:
+        assert len(json.load(f)["records"]) == 2
+    assert texts(reopen(tmp_path)) == texts(store)
+
+
+def test_journal_is_compacted_once_it_outgrows_the_corpus(tmp_path, monkeypatch):
+    monkeypatch.setattr("banga.data.STORE_COMPACT_MIN_EDITS", 3)
+    store = reopen(tmp_path)
+    for text in ("a", "b", "c"):
+        record(store, "Greetings", "Welcome", "Original", text)
+    assert store.journal_entries == 0
+    assert store.journal_path.read_text(encoding="utf-8") == ""
+    record(store, "Greetings", "Welcome", "Original", "d")
+    store.close()
+    assert texts(reopen(tmp_path)) == {("Greetings", "Welcome", 0): ("d", {})}
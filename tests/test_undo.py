@@ -0,0 +1,103 @@
+"""The bounded undo/redo log: stacks, eviction, replay and compaction"""
+import json
+
+import pytest
+
+from banga import undo
+from banga.data import PhraseIndex
+from banga.undo import EditLog, entry_size, undo_log_path
+
+THEMES = ["Greetings"]
+PHRASES = {"Greetings": ["Welcome", "How are you?", "Goodbye"]}
+
+
+def open_log(path, memory_bytes=undo.UNDO_MEMORY_BYTES):
+    return EditLog(path, memory_bytes).load(PhraseIndex.build(THEMES, PHRASES))
+
+
+def stacks(log):
+    return list(log.undo_stack), list(log.redo_stack)
+
+
+def test_undo_redo_and_a_new_save_clearing_redo(tmp_path):
+    log = open_log(tmp_path / "undo.jsonl")
+    log.record(0, "Original", "", "Akwaaba")
+    log.record(0, "Original", "Akwaaba", "Akwaaba o")
+    log.record(1, 1, "", "Wo ho yɛ?")
+    log.record(1, 1, "Wo ho yɛ?", "Wo ho yɛ?")  # no-op saves are not logged
+    assert log.next_undo() == (1, 1, "", "Wo ho yɛ?")
+    log.undone()
+    log.undone()
+    assert log.next_redo() == (0, "Original", "Akwaaba", "Akwaaba o")
+    log.redone()
+    assert log.next_redo() == (1, 1, "", "Wo ho yɛ?")
+    log.record(2, "Original", "", "Nante yie")
+    assert log.next_redo() is None
+    assert [entry[0] for entry in log.undo_stack] == [0, 0, 2]
+
+
+def test_replay_rebuilds_both_stacks(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    log = open_log(path)
+    log.record(0, "Original", "", "Akwaaba")
+    log.record(1, "Original", "", "Wo ho te sɛn?")
+    log.record(2, 2, "", "Nante yie")
+    log.undone()
+    log.close()
+    assert stacks(open_log(path)) == stacks(log)
+
+
+def test_oldest_entries_are_evicted_first(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    entries = [(phrase_id, "Original", "", text) for phrase_id, text in
+               enumerate(["Akwaaba", "Wo ho te sɛn?", "Nante yie"])]
+    cap = entry_size(entries[1]) + entry_size(entries[2])
+    log = open_log(path, cap)
+    for entry in entries:
+        log.record(*entry)
+    assert (list(log.undo_stack), log.evicted) == (entries[1:], 1)
+    assert log.size <= cap
+    log.close()
+    # Replay applies the same cap
+    assert list(open_log(path, cap).undo_stack) == entries[1:]
+
+
+def test_one_entry_is_kept_however_large(tmp_path):
+    log = open_log(tmp_path / "undo.jsonl", memory_bytes=1)
+    log.record(0, "Original", "", "Akwaaba")
+    log.record(1, "Original", "", "Wo ho te sɛn?")
+    assert list(log.undo_stack) == [(1, "Original", "", "Wo ho te sɛn?")]
+
+
+def test_compaction_keeps_only_the_surviving_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(undo, "UNDO_COMPACT_MIN_EVENTS", 4)
+    path = tmp_path / "undo.jsonl"
+    log = open_log(path)
+    log.record(0, "Original", "", "Akwaaba")
+    log.undone()
+    log.redone()
+    log.undone()  # the fourth event compacts
+    assert log.events == 2
+    assert [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()] == [
+        {"do": ["Greetings", "Welcome", 0, "Original", "", "Akwaaba"]}, {"undo": 1}]
+    log.close()
+    assert stacks(open_log(path)) == stacks(log)
+
+
+def test_a_torn_last_line_loses_only_itself(tmp_path):
+    path = tmp_path / "undo.jsonl"
+    log = open_log(path)
+    log.record(0, "Original", "", "Akwaaba")
+    log.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"do": ["Greetings", "Good')
+    log = open_log(path)
+    assert len(log.undo_stack) == 1
+    log.record(1, "Original", "", "Wo ho te sɛn?")
+    log.close()
+    assert [entry[0] for entry in open_log(path).undo_stack] == [0, 1]
+
+
+@pytest.mark.parametrize("annotator, name", [(None, "undo.jsonl"), ("Ama K.", "undo.Ama_K..jsonl")])
+def test_one_log_per_annotator(tmp_path, annotator, name):
+    assert undo_log_path(tmp_path, annotator) == tmp_path / name
@@ -0,0 +1,62 @@
+"""BackgroundWorker: jobs run off the calling thread, callbacks come back through root.after"""
+import threading
+
+from banga.app import BackgroundWorker
+
+
+class FakeRoot:
+    """Stands in for Tk: after() callbacks run when the test calls update()"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def update(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for callback in scheduled:
+            callback()
+
+
+def test_results_progress_and_errors_reach_the_callbacks():
+    root = FakeRoot()
+    worker = BackgroundWorker(root)
+    seen = []
+
+    def load(progress):
+        progress("halfway")
+        return threading.current_thread().name
+
+    def fail():
+        raise ValueError("damaged workbook")
+
+    worker.submit("load", load, on_done=lambda name: seen.append(("done", name)),
+                  on_progress=lambda message: seen.append(("progress", message)))
+    worker.submit("save", fail, on_error=lambda e: seen.append(("error", str(e))))
+    worker.shutdown(timeout=5)
+    # Nothing runs on this thread until Tk polls
+    assert seen == []
+    root.update()
+    assert seen == [("progress", "halfway"), ("done", "banga-worker"), ("error", "damaged workbook")]
+
+
+def test_a_queued_job_is_replaced_by_one_under_the_same_key():
+    root = FakeRoot()
+    worker = BackgroundWorker(root)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    worker.submit("load", block)
+    started.wait(5)
+    assert not worker.is_idle()
+    assert worker.submit("save", ran.append, "first") is False
+    assert worker.submit("save", ran.append, "second") is True
+    release.set()
+    worker.shutdown(timeout=5)
+    assert ran == ["second"]
+    assert worker.is_idle()